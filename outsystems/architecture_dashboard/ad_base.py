@@ -1,9 +1,10 @@
-# Python Modules
-import requests
-
 # Custom Modules
 # Exceptions
 from outsystems.exceptions.invalid_json_response import InvalidJsonResponseError
+# Variables
+from outsystems.vars.http_vars import AD_HTTP_SESSION
+# Functions
+from outsystems.http_helpers.http_retry import send_http_request
 
 
 # Method that builds the endpoint for Architecture Dashboard API and returns it
@@ -17,7 +18,7 @@ def send_get_request(request_string: str, activation_code: str, api_key: str, ur
     headers = {'x-api-key': api_key,
                'x-activation-code': activation_code}
 
-    response = requests.get(request_string, params=url_params, headers=headers)
+    response = send_http_request(AD_HTTP_SESSION, "GET", request_string, params=url_params, headers=headers)
     response_obj = {"http_status": response.status_code, "response": {}}
     if len(response.text) > 0:
         try:
@@ -1,12 +1,11 @@
-# Python Modules
-import requests
-
 # Custom Modules
 # Exceptions
 from outsystems.exceptions.invalid_json_response import InvalidJsonResponseError
 # Variables
-from outsystems.vars.bdd_vars import BDD_TEST_RUNNER_ENDPOINT, BDD_API_SSL_CERT_VERIFY
+from outsystems.vars.bdd_vars import BDD_TEST_RUNNER_ENDPOINT, BDD_API_SSL_CERT_VERIFY, BDD_TEST_TIMEOUT_IN_SECS
+from outsystems.vars.http_vars import BDD_HTTP_SESSION, HTTP_CONNECT_TIMEOUT_IN_SECS
 # Functions
+from outsystems.http_helpers.http_retry import send_http_request
 from outsystems.vars.vars_base import get_configuration_value
 
 
@@ -30,9 +29,14 @@ def send_bdd_get_request(bdd_api: str, bdd_endpoint: str, url_params: str):
 
 
 # Runs the test on the BDD Framework app
+# The request runs the whole test suite on the server, so it is not resent on timeouts or server errors (failed tests are retried
+# by evaluate_test_results --max_retries) and the wait for the response is only limited by BDD_TEST_TIMEOUT_IN_SECS
 def send_bdd_get_run_request(test_endpoint: str, url_params: str):
+    timeout = (get_configuration_value("HTTP_CONNECT_TIMEOUT_IN_SECS", HTTP_CONNECT_TIMEOUT_IN_SECS),
+               get_configuration_value("BDD_TEST_TIMEOUT_IN_SECS", BDD_TEST_TIMEOUT_IN_SECS))
     # Send the request
-    response = requests.get(test_endpoint, params=url_params, verify=get_configuration_value("BDD_API_SSL_CERT_VERIFY", BDD_API_SSL_CERT_VERIFY))
+    response = send_http_request(BDD_HTTP_SESSION, "GET", test_endpoint, retry_safe=False, params=url_params, timeout=timeout,
+                                 verify=get_configuration_value("BDD_API_SSL_CERT_VERIFY", BDD_API_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     if len(response.text) > 0:
         try:
@@ -0,0 +1,61 @@
+# Python Modules
+import os
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_FLAKINESS_FILE
+from outsystems.vars.bdd_vars import BDD_TEST_FLAKINESS_HISTORY_WEIGHT
+from outsystems.bdd_framework.bdd_parallel_runner import BDD_TEST_PASSED
+# Functions
+from outsystems.file_helpers.file import load_data, store_data, check_file
+from outsystems.vars.vars_base import get_configuration_value
+
+
+# Returns the flakiness of each BDD test, by test name, from previous runs on the same workspace,
+# i.e. {test name: {"Runs": runs, "FlakyRuns": runs where it passed after failing, "Score": moving average of the flaky runs (0 to 1)}}
+def load_flakiness_scores(artifact_dir: str):
+    filename = os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_FLAKINESS_FILE)
+    if not check_file(artifact_dir, filename):
+        return {}
+    try:
+        return load_data(artifact_dir, filename)
+    except ValueError:
+        return {}
+
+
+# Records whether each test of a finished run (as returned by run_bdd_tests) was flaky, and returns the updated flakiness scores
+def update_flakiness_scores(artifact_dir: str, test_results: list):
+    scores = load_flakiness_scores(artifact_dir)
+    weight = float(get_configuration_value("BDD_TEST_FLAKINESS_HISTORY_WEIGHT", BDD_TEST_FLAKINESS_HISTORY_WEIGHT))
+    for test_result in test_results:
+        flaky = 1 if test_result.get("Flaky") else 0
+        score = scores.get(test_result["TestName"], {"Runs": 0, "FlakyRuns": 0, "Score": 0.0})
+        scores[test_result["TestName"]] = {"Runs": score["Runs"] + 1, "FlakyRuns": score["FlakyRuns"] + flaky,
+                                           "Score": round((1 - weight) * score["Score"] + weight * flaky, 4)}
+    store_data(artifact_dir, os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_FLAKINESS_FILE), scores)
+    return scores
+
+
+# Loads the quarantine list: a JSON file with a list of test names (e.g. "test_MyTests__MyScreen") and/or test suite names (e.g. "MyTests")
+def load_quarantine(quarantine_file: str):
+    folder, filename = os.path.split(quarantine_file)
+    return load_data(folder, filename)
+
+
+# Flags the results of the tests in the quarantine list (by test name or test suite), which run but do not fail the build
+def apply_quarantine(test_results: list, quarantine: list):
+    quarantine = set(quarantine or [])
+    for test_result in test_results:
+        test_result["Quarantined"] = test_result["TestName"] in quarantine or test_result.get("TestSuite") in quarantine
+    return test_results
+
+
+# Returns the tests that fail the build (did not pass and are not quarantined), after reporting the flaky and quarantined tests
+def get_failed_tests(test_results: list):
+    flaky_tests = [test_result["TestName"] for test_result in test_results if test_result.get("Flaky")]
+    if flaky_tests:
+        print("Flaky tests (passed after a retry): {}".format(flaky_tests), flush=True)
+    quarantined_tests = [test_result["TestName"] for test_result in test_results if test_result["Outcome"] != BDD_TEST_PASSED and test_result.get("Quarantined")]
+    if quarantined_tests:
+        print("Quarantined tests that did not pass (not failing the build): {}".format(quarantined_tests), flush=True)
+    return [test_result for test_result in test_results if test_result["Outcome"] != BDD_TEST_PASSED and not test_result.get("Quarantined")]
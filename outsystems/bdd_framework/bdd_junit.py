@@ -0,0 +1,102 @@
+# Python Modules
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+# Custom Modules
+# Variables
+from outsystems.bdd_framework.bdd_parallel_runner import BDD_TEST_PASSED, BDD_TEST_FAILED, BDD_TEST_ERROR
+
+# Class name of the BDD test cases in the JUnit report (kept from the unittest based runner, since reports are parsed by it)
+BDD_JUNIT_CLASS_NAME = "BDDTestRunner"
+
+
+# Writes the results of a BDD test run (as returned by run_bdd_tests) to a JUnit XML file, with a test case per BDD test.
+# duration is the total time of the run (in seconds). If not set, it is the sum of the duration of every test.
+# Quarantined tests that did not pass are reported as skipped. Tests run more than once, flaky or quarantined also have
+# properties with their attempts (outcome and duration of each one), and whether they are flaky or quarantined.
+def write_junit_results(file_path: str, test_results: list, duration: float = None):
+    timestamps = [test_result["Timestamp"] for test_result in test_results]
+    started_on = min(timestamps) if timestamps else datetime.now().replace(microsecond=0).isoformat()
+    if duration is None:
+        duration = sum(test_result["Duration"] for test_result in test_results)
+
+    def count(outcome: str):
+        return sum(1 for test_result in test_results if test_result["Outcome"] == outcome and not test_result.get("Quarantined"))
+
+    testsuites = ET.Element("testsuites")
+    testsuite = ET.SubElement(testsuites, "testsuite", {
+        "name": "{}-{}".format(BDD_JUNIT_CLASS_NAME, started_on.replace("-", "").replace(":", "").replace("T", "")),
+        "tests": str(len(test_results)),
+        "time": "{:.3f}".format(duration),
+        "timestamp": started_on,
+        "failures": str(count(BDD_TEST_FAILED)),
+        "errors": str(count(BDD_TEST_ERROR)),
+        "skipped": str(sum(1 for test_result in test_results if test_result["Outcome"] != BDD_TEST_PASSED and test_result.get("Quarantined")))})
+
+    for test_result in test_results:
+        testcase = ET.SubElement(testsuite, "testcase", {
+            "classname": BDD_JUNIT_CLASS_NAME,
+            "name": test_result["TestName"],
+            "time": "{:.3f}".format(test_result["Duration"]),
+            "timestamp": test_result["Timestamp"]})
+        _add_properties(testcase, test_result)
+        if test_result["Outcome"] != BDD_TEST_PASSED and test_result.get("Quarantined"):
+            skipped = ET.SubElement(testcase, "skipped", {"type": "Quarantined", "message": "Quarantined test {}: {}".format(
+                "failed" if test_result["Outcome"] == BDD_TEST_FAILED else "error", (test_result["Message"] or "").strip())})
+            skipped.text = test_result["Details"]
+        elif test_result["Outcome"] == BDD_TEST_FAILED:
+            failure = ET.SubElement(testcase, "failure", {"type": "AssertionError", "message": test_result["Message"] or ""})
+            failure.text = test_result["Details"]
+        elif test_result["Outcome"] == BDD_TEST_ERROR:
+            error = ET.SubElement(testcase, "error", {"type": test_result.get("ErrorType") or "Exception", "message": test_result["Message"] or ""})
+            error.text = test_result["Details"]
+
+    ET.indent(testsuites, space="\t")
+    ET.ElementTree(testsuites).write(file_path, encoding="UTF-8", xml_declaration=True)
+
+
+# Loads the results of a BDD test run from a JUnit XML file (written by write_junit_results), in the same format as returned by run_bdd_tests
+def load_junit_results(file_path: str):
+    test_results = []
+    for testcase in ET.parse(file_path).getroot().iter("testcase"):
+        properties = {test_property.get("name"): test_property.get("value") for test_property in testcase.iterfind("properties/property")}
+        test_result = {"TestName": testcase.get("name"), "Timestamp": testcase.get("timestamp"), "Duration": float(testcase.get("time", 0)),
+                       "Outcome": properties.get("outcome", BDD_TEST_PASSED), "Message": None, "Details": None,
+                       "Flaky": properties.get("flaky") == "true", "Quarantined": properties.get("quarantined") == "true"}
+        failure = testcase.find("failure")
+        error = testcase.find("error")
+        skipped = testcase.find("skipped")
+        if failure is not None:
+            test_result.update({"Outcome": BDD_TEST_FAILED, "Message": failure.get("message"), "Details": failure.text})
+        elif error is not None:
+            test_result.update({"Outcome": BDD_TEST_ERROR, "Message": error.get("message"), "ErrorType": error.get("type"), "Details": error.text})
+        elif skipped is not None:
+            test_result.update({"Message": skipped.get("message"), "Details": skipped.text})
+        if "attempts" in properties:
+            test_result["Attempts"] = [{"Outcome": properties.get("attempt.{}.outcome".format(attempt)),
+                                        "Duration": float(properties.get("attempt.{}.duration".format(attempt), 0)),
+                                        "Timestamp": properties.get("attempt.{}.timestamp".format(attempt))}
+                                       for attempt in range(1, int(properties["attempts"]) + 1)]
+        test_results.append(test_result)
+    return test_results
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Adds the properties of a test that ran more than once, is flaky or is quarantined to its test case
+def _add_properties(testcase: ET.Element, test_result: dict):
+    attempts = test_result.get("Attempts") or []
+    if len(attempts) <= 1 and not test_result.get("Flaky") and not test_result.get("Quarantined"):
+        return
+    properties = ET.SubElement(testcase, "properties")
+
+    def add_property(name: str, value: str):
+        ET.SubElement(properties, "property", {"name": name, "value": value})
+
+    add_property("outcome", test_result["Outcome"])
+    add_property("attempts", str(len(attempts)))
+    for attempt, attempt_result in enumerate(attempts, start=1):
+        add_property("attempt.{}.outcome".format(attempt), attempt_result["Outcome"])
+        add_property("attempt.{}.duration".format(attempt), "{:.3f}".format(attempt_result["Duration"]))
+        add_property("attempt.{}.timestamp".format(attempt), attempt_result["Timestamp"])
+    add_property("flaky", "true" if test_result.get("Flaky") else "false")
+    add_property("quarantined", "true" if test_result.get("Quarantined") else "false")
@@ -0,0 +1,95 @@
+# Python Modules
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import monotonic
+
+# Custom Modules
+# Functions
+from outsystems.bdd_framework.bdd_runner import run_bdd_test, format_error_report
+
+# Outcomes of a BDD test
+BDD_TEST_PASSED = "passed"
+BDD_TEST_FAILED = "failure"
+BDD_TEST_ERROR = "error"
+
+
+# Returns the name of the test case of a BDD test endpoint (dict with TestSuite and Name), e.g. test_MyTests__MyScreen
+def get_bdd_test_name(test_endpoint: dict):
+    return "test_{}__{}".format(test_endpoint["TestSuite"], test_endpoint["Name"])
+
+
+# Runs a single BDD test endpoint and returns its result, i.e. a dict with the test name, its outcome (passed, failure or error),
+# the failure report or error message, the error details, when it started and how long it took (in seconds)
+def run_bdd_test_endpoint(test_endpoint: dict):
+    test_result = {"TestName": get_bdd_test_name(test_endpoint), "TestSuite": test_endpoint["TestSuite"], "Name": test_endpoint["Name"],
+                   "URL": test_endpoint["URL"], "Timestamp": datetime.now().replace(microsecond=0).isoformat()}
+    started_on = monotonic()
+    try:
+        json_obj = run_bdd_test(test_endpoint["URL"])
+        if json_obj["SuiteSuccess"]:
+            test_result.update({"Outcome": BDD_TEST_PASSED, "Message": None, "Details": None})
+        else:
+            error_report = format_error_report(json_obj)
+            test_result.update({"Outcome": BDD_TEST_FAILED, "Message": error_report, "Details": error_report})
+    except Exception as error:
+        test_result.update({"Outcome": BDD_TEST_ERROR, "Message": str(error), "ErrorType": type(error).__name__, "Details": traceback.format_exc()})
+    test_result["Duration"] = monotonic() - started_on
+    return test_result
+
+
+# Runs the BDD test endpoints (dicts with TestSuite, Name and URL) using up to max_workers threads.
+# The tests of the test suites in serialized_suites (e.g. suites that share data) run one at a time, in their original order.
+# The tests that did not pass are run again (only those), up to max_retries times. Each result keeps its attempts (outcome, duration
+# and start time of each one) and whether the test is flaky (passed after failing). Its duration is the total of its attempts.
+# on_test_finished (if set) is called with the result of each attempt as soon as it finishes.
+# Returns the results of the tests, in the same order as the test endpoints.
+def run_bdd_tests(test_endpoints: list, max_workers: int, serialized_suites: list = None, on_test_finished: callable = None, max_retries: int = 0):
+    test_results = [None] * len(test_endpoints)
+    pending_positions = list(range(len(test_endpoints)))
+    for attempt in range(max(max_retries, 0) + 1):
+        if not pending_positions:
+            break
+        if attempt > 0:
+            print("Retrying {} BDD test(s) that did not pass (retry {} of {})...".format(len(pending_positions), attempt, max_retries), flush=True)
+        attempt_results = _run_bdd_tests_once([test_endpoints[position] for position in pending_positions], max_workers, serialized_suites, on_test_finished)
+        for position, attempt_result in zip(pending_positions, attempt_results):
+            attempts = (test_results[position]["Attempts"] if test_results[position] else []) + \
+                [{"Outcome": attempt_result["Outcome"], "Duration": attempt_result["Duration"], "Timestamp": attempt_result["Timestamp"]}]
+            attempt_result.update({"Attempts": attempts, "Duration": sum(attempt["Duration"] for attempt in attempts), "Timestamp": attempts[0]["Timestamp"],
+                                   "Flaky": attempt_result["Outcome"] == BDD_TEST_PASSED and len(attempts) > 1})
+            test_results[position] = attempt_result
+        pending_positions = [position for position in pending_positions if test_results[position]["Outcome"] != BDD_TEST_PASSED]
+
+    return test_results
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Runs each of the BDD test endpoints once
+def _run_bdd_tests_once(test_endpoints: list, max_workers: int, serialized_suites: list, on_test_finished: callable):
+    serialized_suites = set(serialized_suites or [])
+    test_results = [None] * len(test_endpoints)
+
+    # Each job is a list of (position, test endpoint) that runs sequentially: a job per serialized test suite, and a job per test otherwise
+    jobs = []
+    suite_jobs = {}
+    for position, test_endpoint in enumerate(test_endpoints):
+        if test_endpoint["TestSuite"] in serialized_suites:
+            if test_endpoint["TestSuite"] not in suite_jobs:
+                suite_jobs[test_endpoint["TestSuite"]] = []
+                jobs.append(suite_jobs[test_endpoint["TestSuite"]])
+            suite_jobs[test_endpoint["TestSuite"]].append((position, test_endpoint))
+        else:
+            jobs.append([(position, test_endpoint)])
+
+    def run_job(job: list):
+        for position, test_endpoint in job:
+            test_results[position] = run_bdd_test_endpoint(test_endpoint)
+            if on_test_finished:
+                on_test_finished(test_results[position])
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for future in [executor.submit(run_job, job) for job in jobs]:
+            future.result()
+
+    return test_results
@@ -15,3 +15,15 @@ def run_bdd_test(test_url: str):
     else:
         raise NotImplementedError(
             "There was an error. Response from server: {}".format(response))
+
+
+# Formats the report of a BDD test that did not succeed (failed scenarios or error message)
+def format_error_report(error_obj: dict):
+    description = ""
+    if not error_obj["ErrorMessage"]:
+        description += "\nBDD Test Suite failed {} scenarios (in {})\n".format(error_obj["FailedScenarios"], error_obj["FailedScenarios"] + error_obj["SuccessfulScenarios"])
+        for failure in error_obj["FailureReports"]:
+            description += failure
+    else:
+        description += "\nAn error was found in the unit test.\nError: {}".format(error_obj["ErrorMessage"])
+    return description
@@ -0,0 +1,85 @@
+# Python Modules
+import heapq
+import os
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_DURATIONS_FILE
+from outsystems.vars.bdd_vars import BDD_TEST_DEFAULT_DURATION_IN_SECS, BDD_TEST_DURATION_HISTORY_WEIGHT
+# Functions
+from outsystems.bdd_framework.bdd_parallel_runner import get_bdd_test_name
+from outsystems.file_helpers.file import load_data, store_data, check_file
+from outsystems.vars.vars_base import get_configuration_value
+
+
+# Returns the usual duration (in seconds) of each BDD test, by test name, from previous runs.
+# The history is read from durations_file if set (e.g. a file shared by every agent), or from the artifacts folder otherwise.
+def load_test_durations(artifact_dir: str, durations_file: str = None):
+    folder, filename = _get_durations_file(artifact_dir, durations_file)
+    if not check_file(folder, filename.replace(" ", "_")):
+        return {}
+    try:
+        return load_data(folder, filename)
+    except ValueError:
+        return {}
+
+
+# Records the duration of the tests of a finished run (as returned by run_bdd_tests), keeping a moving average per test.
+# Only the last attempt of a retried test is recorded, so retries do not inflate the expected duration of a single run.
+def update_test_durations(artifact_dir: str, test_results: list, durations_file: str = None):
+    durations = load_test_durations(artifact_dir, durations_file)
+    weight = float(get_configuration_value("BDD_TEST_DURATION_HISTORY_WEIGHT", BDD_TEST_DURATION_HISTORY_WEIGHT))
+    for test_result in test_results:
+        duration = test_result["Attempts"][-1]["Duration"] if test_result.get("Attempts") else test_result["Duration"]
+        previous_duration = durations.get(test_result["TestName"])
+        durations[test_result["TestName"]] = duration if previous_duration is None else \
+            (1 - weight) * previous_duration + weight * duration
+    folder, filename = _get_durations_file(artifact_dir, durations_file)
+    store_data(folder, filename, durations)
+
+
+# Splits the test endpoints in shard_count shards with similar total durations (longest processing time first: the longest tests are
+# assigned first, each to the shard with the lowest total so far) and returns the endpoints of shard shard_index (1 to shard_count).
+# The tests of the test suites in grouped_suites (e.g. suites that share data) are kept in the same shard.
+# Tests with no duration history are expected to take the average duration of the known tests.
+# The split only depends on the endpoints and the durations, so every shard must use the same duration history.
+def get_test_shard(test_endpoints: list, shard_index: int, shard_count: int, durations: dict, grouped_suites: list = None):
+    grouped_suites = set(grouped_suites or [])
+    test_names = [get_bdd_test_name(test_endpoint) for test_endpoint in test_endpoints]
+    known_durations = [durations[test_name] for test_name in test_names if test_name in durations]
+    default_duration = sum(known_durations) / len(known_durations) if known_durations else \
+        get_configuration_value("BDD_TEST_DEFAULT_DURATION_IN_SECS", BDD_TEST_DEFAULT_DURATION_IN_SECS)
+
+    # Each unit is a list of positions assigned to the same shard: a unit per grouped test suite, and a unit per test otherwise
+    units = []
+    suite_units = {}
+    for position, test_endpoint in enumerate(test_endpoints):
+        if test_endpoint["TestSuite"] in grouped_suites:
+            if test_endpoint["TestSuite"] not in suite_units:
+                suite_units[test_endpoint["TestSuite"]] = []
+                units.append(suite_units[test_endpoint["TestSuite"]])
+            suite_units[test_endpoint["TestSuite"]].append(position)
+        else:
+            units.append([position])
+    unit_durations = [sum(durations.get(test_names[position], default_duration) for position in unit) for unit in units]
+
+    # Longest units first (ties broken by name, so the split does not depend on the order of the endpoints)
+    unit_order = sorted(range(len(units)), key=lambda unit_index: (-unit_durations[unit_index], test_names[units[unit_index][0]], unit_index))
+    # Heap of (total duration, shard index) with the least loaded shard on top
+    shard_loads = [(0.0, index) for index in range(1, shard_count + 1)]
+    shard_positions = {index: [] for index in range(1, shard_count + 1)}
+    for unit_index in unit_order:
+        shard_load, index = heapq.heappop(shard_loads)
+        shard_positions[index].extend(units[unit_index])
+        heapq.heappush(shard_loads, (shard_load + unit_durations[unit_index], index))
+
+    # The tests of the shard keep their original order
+    return [test_endpoints[position] for position in sorted(shard_positions[shard_index])]
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Returns the (folder, file name) of the duration history
+def _get_durations_file(artifact_dir: str, durations_file: str):
+    if durations_file:
+        return os.path.split(durations_file)
+    return artifact_dir, os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_DURATIONS_FILE)
@@ -0,0 +1,80 @@
+# Python Modules
+import os
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_VERSIONS_FILE
+from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_KEY, MANIFEST_APPLICATION_NAME, MANIFEST_APPLICATION_VERSION_KEY, \
+    MANIFEST_APPLICATION_VERSION_NUMBER, MANIFEST_FLAG_IS_TEST_APPLICATION
+# Functions
+from outsystems.cicd_probe.cicd_dependencies import get_apps_dependencies
+from outsystems.file_helpers.file import load_data, store_data, check_file, clear_cache
+
+
+# Returns the application versions last tested in an environment, i.e. {app key: version key}
+def load_tested_versions(tested_versions_file: str, environment: str):
+    folder, filename = os.path.split(tested_versions_file)
+    if not check_file(folder, filename.replace(" ", "_")):
+        return {}
+    try:
+        return load_data(folder, filename).get(environment, {})
+    except ValueError:
+        return {}
+
+
+# Returns the names of the test applications of the manifest application versions that may be affected by the applications whose
+# version differs from the last tested one, i.e. the changed test applications and the test applications that consume
+# (directly, or through other applications of the manifest) a changed application.
+def get_affected_test_apps(artifact_dir: str, probe_endpoint: str, api_key: str, app_versions: list, tested_versions: dict):
+    changed_app_keys = {app_version[MANIFEST_APPLICATION_KEY] for app_version in app_versions
+                        if tested_versions.get(app_version[MANIFEST_APPLICATION_KEY]) != app_version[MANIFEST_APPLICATION_VERSION_KEY]}
+    print("{} of {} application(s) changed since the last tested versions.".format(len(changed_app_keys), len(app_versions)), flush=True)
+
+    # Producers of each application version (from the CICD Probe), turned into the consumers of each application
+    dependencies = get_apps_dependencies(artifact_dir, probe_endpoint, api_key,
+                                         [{"VersionKey": app_version[MANIFEST_APPLICATION_VERSION_KEY], "Name": app_version[MANIFEST_APPLICATION_NAME],
+                                           "Version": app_version[MANIFEST_APPLICATION_VERSION_NUMBER]} for app_version in app_versions])
+    consumers = {}
+    for app_version, producers in zip(app_versions, dependencies):
+        for producer in producers:
+            consumers.setdefault(producer, set()).add(app_version[MANIFEST_APPLICATION_KEY])
+
+    # Every application reachable from the changed applications through their consumers
+    affected_app_keys = set(changed_app_keys)
+    pending_app_keys = list(changed_app_keys)
+    while pending_app_keys:
+        for consumer in consumers.get(pending_app_keys.pop(), set()):
+            if consumer not in affected_app_keys:
+                affected_app_keys.add(consumer)
+                pending_app_keys.append(consumer)
+
+    return [app_version[MANIFEST_APPLICATION_NAME] for app_version in app_versions
+            if app_version[MANIFEST_FLAG_IS_TEST_APPLICATION] and app_version[MANIFEST_APPLICATION_KEY] in affected_app_keys]
+
+
+# Stores the application versions under test, to be recorded as tested in the environment once the tests pass (see record_tested_versions)
+def store_versions_under_test(artifact_dir: str, tested_versions_file: str, environment: str, app_versions: list):
+    versions_under_test = {"TestedVersionsFile": os.path.abspath(tested_versions_file), "Environment": environment,
+                           "ApplicationVersions": {app_version[MANIFEST_APPLICATION_KEY]: app_version[MANIFEST_APPLICATION_VERSION_KEY] for app_version in app_versions}}
+    store_data(artifact_dir, os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_VERSIONS_FILE), versions_under_test)
+
+
+# Forgets the application versions under test stored by a previous run (if any)
+def clear_versions_under_test(artifact_dir: str):
+    clear_cache(artifact_dir, os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_VERSIONS_FILE))
+
+
+# Records the application versions under test (if any) as the last tested versions in the environment. Called when every test passed.
+def record_tested_versions(artifact_dir: str):
+    filename = os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_VERSIONS_FILE)
+    if not check_file(artifact_dir, filename):
+        return
+    versions_under_test = load_data(artifact_dir, filename)
+    folder, tested_versions_filename = os.path.split(versions_under_test["TestedVersionsFile"])
+    tested_versions = {}
+    if check_file(folder, tested_versions_filename.replace(" ", "_")):
+        tested_versions = load_data(folder, tested_versions_filename)
+    tested_versions.setdefault(versions_under_test["Environment"], {}).update(versions_under_test["ApplicationVersions"])
+    store_data(folder, tested_versions_filename, tested_versions)
+    clear_versions_under_test(artifact_dir)
+    print("Recorded {} tested application version(s) for {}.".format(len(versions_under_test["ApplicationVersions"]), versions_under_test["Environment"]), flush=True)
@@ -1,11 +1,10 @@
-# Python Modules
-import requests
-
 # Custom Modules
 from outsystems.exceptions.invalid_json_response import InvalidJsonResponseError
 # Variables
 from outsystems.vars.cicd_vars import PROBE_API_SSL_CERT_VERIFY
+from outsystems.vars.http_vars import PROBE_HTTP_SESSION
 # Functions
+from outsystems.http_helpers.http_retry import send_http_request
 from outsystems.vars.vars_base import get_configuration_value
 
 
@@ -21,7 +20,7 @@ def send_probe_get_request(probe_api: str, probe_endpoint: str, api_key: str, ur
     # Set API key header, when provided
     headers = {"X-CICDProbe-Key": api_key} if api_key else None
     # Send the request
-    response = requests.get(request_string, params=url_params, headers=headers, verify=get_configuration_value("PROBE_API_SSL_CERT_VERIFY", PROBE_API_SSL_CERT_VERIFY))
+    response = send_http_request(PROBE_HTTP_SESSION, "GET", request_string, params=url_params, headers=headers, verify=get_configuration_value("PROBE_API_SSL_CERT_VERIFY", PROBE_API_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     if len(response.text) > 0:
         try:
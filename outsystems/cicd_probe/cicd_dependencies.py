@@ -1,16 +1,33 @@
 # Python Modules
-from toposort import toposort_flatten, CircularDependencyError
+import asyncio
+import os
+from toposort import toposort, toposort_flatten, CircularDependencyError
 
 # Custom Modules
 # Functions
 from outsystems.cicd_probe.cicd_base import send_probe_get_request
+from outsystems.file_helpers.file import store_data, load_data, check_file
+from outsystems.http_helpers.http_concurrency import run_bounded
+from outsystems.vars.vars_base import get_configuration_value
 # Variables
-from outsystems.vars.cicd_vars import GET_APPLICATION_DEPENDENCIES_ENDPOINT, PROBE_DEPENDENCIES_SUCCESS_CODE
+from outsystems.vars.cicd_vars import GET_APPLICATION_DEPENDENCIES_ENDPOINT, PROBE_DEPENDENCIES_SUCCESS_CODE, PROBE_MAX_CONCURRENT_REQUESTS, \
+    PROBE_DEPENDENCIES_CACHE_DIR
+from outsystems.vars.file_vars import PROBE_APPLICATION_DEPENDENCIES_FILE, PROBE_FOLDER
 
 
 # Get a set of applications which are producers for a specified application version.
+# The producers of an application version never change, so they are cached (by version key) and reused in later runs.
+# The cache is kept in the artifacts folder, unless PROBE_DEPENDENCIES_CACHE_DIR points to a folder kept between pipeline runs.
 def get_app_dependencies(artifact_dir: str, probe_endpoint: str, api_key: str, application_version_key: str,
                          application_name: str, application_version: str):
+    filename = "{}{}".format(application_version_key, PROBE_APPLICATION_DEPENDENCIES_FILE)
+    cache_dir = get_configuration_value("PROBE_DEPENDENCIES_CACHE_DIR", PROBE_DEPENDENCIES_CACHE_DIR)
+    if not cache_dir:
+        cache_dir = artifact_dir
+        filename = os.path.join(PROBE_FOLDER, filename)
+    if check_file(cache_dir, filename):
+        return set(load_data(cache_dir, filename))
+
     # Builds the API params
     params = {"ApplicationName": application_name, "ApplicationVersion": application_version}
 
@@ -24,12 +41,23 @@ def get_app_dependencies(artifact_dir: str, probe_endpoint: str, api_key: str, a
         dependencies_list = []
         for dependency in response:
             dependencies_list.append(dependency["ApplicationKey"])
+        # Stores the result
+        store_data(cache_dir, filename, sorted(set(dependencies_list)))
         return set(dependencies_list)
     else:
         raise NotImplementedError(
             "There was an error. Response from server: {}".format(response))
 
 
+# Get the producers of several application versions (dicts with VersionKey, Name and Version) at the same time,
+# bounded by PROBE_MAX_CONCURRENT_REQUESTS. Results are returned in the same order as the application versions.
+def get_apps_dependencies(artifact_dir: str, probe_endpoint: str, api_key: str, app_versions: list):
+    max_concurrency = get_configuration_value("PROBE_MAX_CONCURRENT_REQUESTS", PROBE_MAX_CONCURRENT_REQUESTS)
+    return run_bounded([asyncio.to_thread(get_app_dependencies, artifact_dir, probe_endpoint, api_key,
+                                          app_version["VersionKey"], app_version["Name"], app_version["Version"])
+                        for app_version in app_versions], max_concurrency)
+
+
 # Topological ordering (linear ordering) of a dependency list
 def sort_app_dependencies(dep_list: list):
     try:
@@ -37,3 +65,12 @@ def sort_app_dependencies(dep_list: list):
     except:
         raise CircularDependencyError(
             "There are circular dependencies among the list of applications.")
+
+
+# Topological levels of a dependency list: each level (set) only depends on the previous ones
+def sort_app_dependencies_in_levels(dep_list: list):
+    try:
+        return list(toposort(dep_list))
+    except:
+        raise CircularDependencyError(
+            "There are circular dependencies among the list of applications.")
@@ -1,18 +1,36 @@
 # Python Modules
+import asyncio
+import hashlib
 import os
 
 # Custom Modules
 # Functions
 from outsystems.cicd_probe.cicd_base import send_probe_get_request
-from outsystems.file_helpers.file import store_data
+from outsystems.file_helpers.file import store_data, load_data, check_file
+from outsystems.http_helpers.http_concurrency import run_bounded
+from outsystems.vars.vars_base import get_configuration_value
 # Variables
-from outsystems.vars.cicd_vars import SCAN_BDD_TESTS_ENDPOINT, PROBE_SCAN_SUCCESS_CODE, PROBE_API_VERSION
+from outsystems.vars.cicd_vars import SCAN_BDD_TESTS_ENDPOINT, PROBE_SCAN_SUCCESS_CODE, PROBE_API_VERSION, PROBE_MAX_CONCURRENT_REQUESTS
 from outsystems.vars.file_vars import PROBE_APPLICATION_SCAN_FILE, PROBE_FOLDER
 
 
 # Scan existing BDD test endpoints (i.e. Screens) in the target environment.
+# If the application version key is set, the result is cached by (application name, version key, probe version, exclude pattern),
+# since the test endpoints of an application version never change, and reused in later runs.
 def scan_bdd_test_endpoint(artifact_dir: str, endpoint: str, application_name: str, api_key: str = None,
-                           exclude_pattern: str = None, probe_version: int = PROBE_API_VERSION):
+                           exclude_pattern: str = None, probe_version: int = PROBE_API_VERSION, application_version_key: str = None):
+    filename = "{}{}".format(application_name, PROBE_APPLICATION_SCAN_FILE)
+    filename = os.path.join(PROBE_FOLDER, filename)
+    if application_version_key:
+        cache_filename = os.path.join(PROBE_FOLDER, _get_scan_cache_filename(application_name, application_version_key, exclude_pattern, probe_version))
+        if check_file(artifact_dir, cache_filename.replace(" ", "_")):
+            try:
+                response = load_data(artifact_dir, cache_filename)
+                store_data(artifact_dir, filename, response)
+                return response
+            except ValueError:
+                pass
+
     # Builds the API params
     params = {"ApplicationName": application_name}
     if exclude_pattern:
@@ -26,10 +44,27 @@ def scan_bdd_test_endpoint(artifact_dir: str, endpoint: str, application_name: s
     status_code = response["http_status"]
     if status_code == PROBE_SCAN_SUCCESS_CODE:
         # Stores the result
-        filename = "{}{}".format(application_name, PROBE_APPLICATION_SCAN_FILE)
-        filename = os.path.join(PROBE_FOLDER, filename)
         store_data(artifact_dir, filename, response["response"])
+        if application_version_key:
+            store_data(artifact_dir, cache_filename, response["response"])
         return response["response"]
     else:
         raise NotImplementedError(
             "There was an error. Response from server: {}".format(response))
+
+
+# Scan the BDD test endpoints of several applications (list of (application name, version key or None)) at the same time,
+# bounded by PROBE_MAX_CONCURRENT_REQUESTS. Results are returned in the same order as the applications.
+def scan_bdd_test_endpoints(artifact_dir: str, endpoint: str, applications: list, api_key: str = None,
+                            exclude_pattern: str = None, probe_version: int = PROBE_API_VERSION):
+    max_concurrency = get_configuration_value("PROBE_MAX_CONCURRENT_REQUESTS", PROBE_MAX_CONCURRENT_REQUESTS)
+    return run_bounded([asyncio.to_thread(scan_bdd_test_endpoint, artifact_dir, endpoint, application_name, api_key, exclude_pattern,
+                                          probe_version, application_version_key)
+                        for application_name, application_version_key in applications], max_concurrency)
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Name of the cache file of a scan, e.g. <app name>.<version key>.<hash of the probe version and exclude pattern>.probe.cache
+def _get_scan_cache_filename(application_name: str, application_version_key: str, exclude_pattern: str, probe_version: int):
+    scan_options = hashlib.sha256("{}|{}".format(probe_version, exclude_pattern or "").encode("utf-8")).hexdigest()[:12]
+    return "{}.{}.{}{}".format(application_name, application_version_key, scan_options, PROBE_APPLICATION_SCAN_FILE)
@@ -0,0 +1,46 @@
+# Python Modules
+import re
+from datetime import datetime, timezone
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import CACHE_METADATA_FILE
+# Functions
+from outsystems.file_helpers.file import store_data, load_data, check_file
+
+
+# Stores data in the artifacts cache, along with the time it was fetched, the source endpoint and its API version
+def store_cache(artifact_dir: str, filename: str, data, endpoint: str, params: dict = None):
+    store_data(artifact_dir, filename, data)
+    metadata = {"FetchedOn": datetime.now(timezone.utc).isoformat(), "Endpoint": endpoint, "ApiVersion": _get_api_version(endpoint), "Params": params}
+    store_data(artifact_dir, "{}{}".format(filename, CACHE_METADATA_FILE), metadata)
+
+
+# Loads data from the artifacts cache, if it was fetched from the same endpoint (and with the same params, when given)
+# at most max_age seconds ago. Returns None otherwise (including entries with no metadata).
+def load_cache(artifact_dir: str, filename: str, endpoint: str, max_age: int, params: dict = None):
+    metadata_filename = "{}{}".format(filename, CACHE_METADATA_FILE)
+    if max_age <= 0 or not check_file(artifact_dir, filename.replace(" ", "_")) or not check_file(artifact_dir, metadata_filename.replace(" ", "_")):
+        return None
+    try:
+        metadata = load_data(artifact_dir, metadata_filename)
+        fetched_on = datetime.fromisoformat(metadata["FetchedOn"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if metadata.get("Endpoint") != endpoint or metadata.get("ApiVersion") != _get_api_version(endpoint):
+        return None
+    if params is not None and metadata.get("Params") != params:
+        return None
+    if (datetime.now(timezone.utc) - fetched_on).total_seconds() > max_age:
+        return None
+    try:
+        return load_data(artifact_dir, filename)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Returns the API version from an endpoint (e.g. 2 for https://<lifetime_host>/lifetimeapi/rest/v2)
+def _get_api_version(endpoint: str):
+    api_version = re.search(r"/v(\d+)/?$", endpoint or "")
+    return int(api_version.group(1)) if api_version else None
@@ -1,6 +1,29 @@
 # Python Modules
+import hashlib
 import json
 import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import FILE_DIGEST_FILE, FILE_DIGEST_CHUNK_SIZE_IN_BYTES
+
+# Serializes cache reads and writes between threads fanning out LifeTime calls
+_cache_lock = threading.RLock()
+
+# Process umask, read once (os.umask can only be read by setting it), so files written through a temporary file get the usual permissions
+_umask = os.umask(0)
+os.umask(_umask)
 
 
 def store_data(artifact_dir: str, filename: str, data: str):
@@ -9,8 +32,18 @@ def store_data(artifact_dir: str, filename: str, data: str):
     filename = filename.replace(" ", "_")
     # Makes sure that, if a directory is in the filename, that directory exists
     os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, "w") as outfile:
-        json.dump(data, outfile, indent=4)
+    # Writes to a temporary file first and then replaces the target, so readers never see a partial file
+    with _cache_lock:
+        fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(filename), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as outfile:
+                json.dump(data, outfile, indent=4)
+            # mkstemp creates owner-only files, while other steps (e.g. running as another user) may need to read them
+            os.chmod(tmp_filename, 0o666 & ~_umask)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
 
 
 def load_data(artifact_dir: str, filename: str):
@@ -18,7 +51,7 @@ def load_data(artifact_dir: str, filename: str):
     filename = filename.replace(" ", "_")
     if check_file(artifact_dir, filename):
         filename = os.path.join(artifact_dir, filename)
-        with open(filename, "r") as infile:
+        with _cache_lock, open(filename, "r") as infile:
             return json.load(infile)
     raise FileNotFoundError(
         "The file with filename {} does not exist.".format(filename))
@@ -33,7 +66,74 @@ def clear_cache(artifact_dir: str, filename: str):
     if not check_file(artifact_dir, filename):
         return
     filename = os.path.join(artifact_dir, filename)
-    os.remove(filename)
+    with _cache_lock:
+        if os.path.isfile(filename):
+            os.remove(filename)
+
+
+# Writes the SHA-256 digest of a file next to it (in sha256sum format), so later stages do not need to re-read the file
+def store_file_digest(file_path: str, digest: str):
+    with open("{}{}".format(file_path, FILE_DIGEST_FILE), "w") as outfile:
+        outfile.write("{} *{}\n".format(digest, os.path.basename(file_path)))
+
+
+# Returns the SHA-256 digest stored next to a file (or None, if there is none)
+def load_file_digest(file_path: str):
+    digest_file_path = "{}{}".format(file_path, FILE_DIGEST_FILE)
+    if not os.path.isfile(digest_file_path):
+        return None
+    with open(digest_file_path, "r") as infile:
+        return infile.read().split(" ")[0].strip() or None
+
+
+# Computes the SHA-256 digest of a file, reading it in chunks
+def get_file_digest(file_path: str):
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as infile:
+        for chunk in iter(lambda: infile.read(FILE_DIGEST_CHUNK_SIZE_IN_BYTES), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+# Hard links a file to the target path (replacing it, if it exists), or copies it if a hard link is not possible
+def link_or_copy_file(source_file: str, target_file: str):
+    os.makedirs(os.path.dirname(target_file), exist_ok=True)
+    if os.path.lexists(target_file):
+        if os.path.samefile(source_file, target_file):
+            return
+        os.remove(target_file)
+    try:
+        os.link(source_file, target_file)
+    except OSError:
+        # e.g. the source and the target are in different file systems
+        shutil.copy2(source_file, target_file)
+
+
+# Holds an exclusive lock on a lock file in a folder while the block runs, serializing it with other processes
+# (e.g. pipeline runs of other agents on the same host) that lock the same file
+@contextmanager
+def lock_file(folder: str, filename: str):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, filename), "a+") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK only retries for about 10 seconds before failing
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
 
 
 # Returns a human readable string representation of bytes
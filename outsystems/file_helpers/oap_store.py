@@ -0,0 +1,85 @@
+# Python Modules
+import os
+import threading
+from contextlib import contextmanager
+from time import time
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import OAP_STORE_MANIFEST_FILE, OAP_STORE_LOCK_FILE, APPLICATION_OAP_FILE, OAP_STORE_MAX_SIZE_IN_BYTES
+# Functions
+from outsystems.file_helpers.file import store_data, load_data, check_file, store_file_digest, load_file_digest, get_file_digest, \
+    link_or_copy_file, lock_file
+from outsystems.vars.vars_base import get_configuration_value
+
+
+# Local store of application packages (.oap), kept in a folder reused between pipeline runs.
+# The OAP of an application version never changes, so each one is stored by version key, with its SHA-256 digest and size in a manifest.
+# When the store grows above OAP_STORE_MAX_SIZE_IN_BYTES, the least recently used OAPs are evicted.
+# Copies are hard links whenever the store and the artifacts folder are in the same file system.
+# Several processes (e.g. agents on the same host) can share the store: the manifest is reloaded, changed and written back,
+# and the OAPs are copied in and out of the store, while holding a lock file, so no entry is lost and no OAP in use is evicted.
+class OAPStore:
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._entries = self._load_manifest()
+
+    # Copies the stored OAP of an application version to file_path. Returns False if it is not stored (or the stored copy changed).
+    def restore(self, version_key: str, file_path: str):
+        with self._locked_manifest():
+            entry = self._entries.get(version_key)
+            if entry is None:
+                return False
+            stored_file = self._get_stored_file(version_key)
+            if not os.path.isfile(stored_file):
+                self._entries.pop(version_key)
+                return False
+            link_or_copy_file(stored_file, file_path)
+            entry["LastUsed"] = time()
+
+        # The copy is checked outside the lock, since it is either a hard link to the stored OAP or an independent copy of it
+        if get_file_digest(file_path) != entry["SHA256"]:
+            os.remove(file_path)
+            with self._locked_manifest():
+                if self._entries.get(version_key, {}).get("SHA256") == entry["SHA256"]:
+                    self._entries.pop(version_key)
+            return False
+        store_file_digest(file_path, entry["SHA256"])
+        return True
+
+    # Stores the OAP of an application version, evicting the least recently used ones if the store grows too big
+    def store(self, version_key: str, file_path: str):
+        digest = load_file_digest(file_path) or get_file_digest(file_path)
+        with self._locked_manifest():
+            link_or_copy_file(file_path, self._get_stored_file(version_key))
+            self._entries[version_key] = {"SHA256": digest, "Size": os.path.getsize(file_path), "LastUsed": time()}
+            self._evict(version_key)
+
+    # Reloads the manifest while holding the store lock (shared with other processes), and writes it back once the block runs
+    @contextmanager
+    def _locked_manifest(self):
+        with self._lock, lock_file(self.store_dir, OAP_STORE_LOCK_FILE):
+            self._entries = self._load_manifest()
+            yield
+            store_data(self.store_dir, OAP_STORE_MANIFEST_FILE, self._entries)
+
+    def _load_manifest(self):
+        return load_data(self.store_dir, OAP_STORE_MANIFEST_FILE) if check_file(self.store_dir, OAP_STORE_MANIFEST_FILE) else {}
+
+    # Evicts the least recently used OAPs (except the one just stored) until the store fits its maximum size
+    def _evict(self, stored_version_key: str):
+        max_size = get_configuration_value("OAP_STORE_MAX_SIZE_IN_BYTES", OAP_STORE_MAX_SIZE_IN_BYTES)
+        total_size = sum(entry["Size"] for entry in self._entries.values())
+        for version_key in sorted(self._entries, key=lambda key: self._entries[key]["LastUsed"]):
+            if total_size <= max_size:
+                break
+            if version_key == stored_version_key:
+                continue
+            stored_file = self._get_stored_file(version_key)
+            if os.path.isfile(stored_file):
+                os.remove(stored_file)
+            total_size -= self._entries.pop(version_key)["Size"]
+
+    def _get_stored_file(self, version_key: str):
+        return os.path.join(self.store_dir, "{}{}".format(version_key, APPLICATION_OAP_FILE))
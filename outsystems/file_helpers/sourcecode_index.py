@@ -0,0 +1,123 @@
+# Python Modules
+import hashlib
+import os
+import shutil
+import threading
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import SOURCECODE_INDEX_FILE, SOURCECODE_INDEX_MODULES_FOLDER
+# Functions
+from outsystems.file_helpers.file import store_data, load_data, check_file, store_file_digest, load_file_digest, get_file_digest, \
+    link_or_copy_file
+
+
+# Persistent index of the source code packages already fetched (and extracted), kept in a folder reused between pipeline runs.
+# Each entry points to a copy of the package and of its extracted modules, stored in a subfolder named after the package SHA-256 digest.
+# The package is hard linked whenever the index folder and the artifacts folder are in the same file system (it is never changed in place),
+# while the modules are copied, since post-processing rewrites their files. The package digest and the size and modification time
+# of the module files are checked before restoring them.
+class SourceCodeIndex:
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._entries = load_data(index_dir, SOURCECODE_INDEX_FILE) if check_file(index_dir, SOURCECODE_INDEX_FILE) else {}
+
+    # Restores the package and modules of an entry into target_folder (with the same layout they were fetched with).
+    # Returns the number of restored modules, or None if there is no such entry or its stored copy is missing or changed
+    # (in which case the entry is dropped).
+    def restore(self, entry_key: str, target_folder: str):
+        with self._lock:
+            entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+
+        stored_folder = os.path.join(self.index_dir, entry["SHA256"])
+        stored_package = os.path.join(stored_folder, entry["FileName"])
+        if not _is_stored_copy_unchanged(stored_folder, entry):
+            self._drop(entry_key)
+            return None
+
+        package_file = os.path.join(target_folder, entry["FileName"])
+        link_or_copy_file(stored_package, package_file)
+        store_file_digest(package_file, entry["SHA256"])
+        for module_name in entry["Modules"]:
+            _copy_tree(os.path.join(stored_folder, SOURCECODE_INDEX_MODULES_FOLDER, module_name),
+                       os.path.join(target_folder, SOURCECODE_INDEX_MODULES_FOLDER, module_name))
+        return len(entry["Modules"])
+
+    # Stores a copy of a fetched package and of its extracted modules (found next to it, in the modules folder) under entry_key
+    def store(self, entry_key: str, package_file: str, module_names: list):
+        digest = load_file_digest(package_file) or get_file_digest(package_file)
+        stored_folder = os.path.join(self.index_dir, digest)
+        file_name = os.path.basename(package_file)
+
+        link_or_copy_file(package_file, os.path.join(stored_folder, file_name))
+        module_fingerprints = {}
+        for module_name in module_names:
+            module_folder = os.path.join(os.path.dirname(package_file), SOURCECODE_INDEX_MODULES_FOLDER, module_name)
+            if not os.path.isdir(module_folder):
+                # The module was not extracted, so the entry could not be restored
+                self._drop(entry_key)
+                return
+            stored_module_folder = os.path.join(stored_folder, SOURCECODE_INDEX_MODULES_FOLDER, module_name)
+            _copy_tree(module_folder, stored_module_folder)
+            module_fingerprints[module_name] = _get_tree_fingerprint(stored_module_folder)
+
+        with self._lock:
+            self._entries[entry_key] = {"SHA256": digest, "FileName": file_name, "Modules": module_names, "ModuleFingerprints": module_fingerprints}
+            store_data(self.index_dir, SOURCECODE_INDEX_FILE, self._entries)
+
+    # Removes an entry from the index
+    def _drop(self, entry_key: str):
+        with self._lock:
+            if self._entries.pop(entry_key, None) is not None:
+                store_data(self.index_dir, SOURCECODE_INDEX_FILE, self._entries)
+
+
+# Returns the index key of the running version of an application (as returned by get_running_app_version) in an environment.
+# The post-processing options are part of the key, since they change the extracted content.
+def get_sourcecode_index_key(env_key: str, running_version: dict, include_all_refs: bool, remove_resources_files: bool):
+    return "|".join([env_key, running_version["ApplicationKey"], running_version["VersionKey"], str(running_version["IsModified"]),
+                     str(include_all_refs), str(remove_resources_files)])
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Copies the files of a folder (keeping their modification time), replacing the existing ones
+def _copy_tree(source_folder: str, target_folder: str):
+    for dir_path, _, file_names in os.walk(source_folder):
+        for file_name in file_names:
+            source_file = os.path.join(dir_path, file_name)
+            target_file = os.path.join(target_folder, os.path.relpath(source_file, source_folder))
+            os.makedirs(os.path.dirname(target_file), exist_ok=True)
+            if os.path.lexists(target_file):
+                # Replace the file instead of writing through it, in case it is a hard link
+                os.remove(target_file)
+            shutil.copy2(source_file, target_file)
+
+
+# Checks that the stored package and every stored module of an entry exist and are unchanged since they were stored
+def _is_stored_copy_unchanged(stored_folder: str, entry: dict):
+    stored_package = os.path.join(stored_folder, entry["FileName"])
+    if not os.path.isfile(stored_package) or get_file_digest(stored_package) != entry["SHA256"]:
+        return False
+    module_fingerprints = entry.get("ModuleFingerprints", {})
+    for module_name in entry["Modules"]:
+        module_fingerprint = _get_tree_fingerprint(os.path.join(stored_folder, SOURCECODE_INDEX_MODULES_FOLDER, module_name))
+        if module_fingerprint is None or module_fingerprint != module_fingerprints.get(module_name):
+            return False
+    return True
+
+
+# Returns a digest of the relative path, size and modification time of every file in a folder (without reading them),
+# or None if the folder does not exist
+def _get_tree_fingerprint(folder: str):
+    if not os.path.isdir(folder):
+        return None
+    file_paths = sorted(os.path.relpath(os.path.join(dir_path, file_name), folder).replace(os.sep, "/")
+                        for dir_path, _, file_names in os.walk(folder) for file_name in file_names)
+    sha256 = hashlib.sha256()
+    for file_path in file_paths:
+        file_stat = os.stat(os.path.join(folder, file_path))
+        sha256.update("{} {} {}\n".format(file_stat.st_size, file_stat.st_mtime_ns, file_path).encode("utf-8"))
+    return sha256.hexdigest()
@@ -0,0 +1,54 @@
+# Python Modules
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Custom Modules
+# Variables
+from outsystems.vars.http_vars import HTTP_MAX_TRANSFERS_PER_HOST
+# Functions
+from outsystems.vars.vars_base import get_configuration_value
+
+# Semaphores limiting the concurrent transfers to each host, indexed by host (and port)
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+# Awaits all the given coroutines, running at most max_concurrency of them at the same time.
+# Results are returned in the same order as the coroutines.
+async def gather_bounded(coroutines: list, max_concurrency: int, return_exceptions: bool = False):
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def run_with_semaphore(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*[run_with_semaphore(coroutine) for coroutine in coroutines], return_exceptions=return_exceptions)
+
+
+# Runs the given coroutines in a new event loop, at most max_concurrency at the same time.
+# Blocking calls offloaded with asyncio.to_thread use a thread pool of the same size.
+# Results are returned in the same order as the coroutines.
+def run_bounded(coroutines: list, max_concurrency: int, return_exceptions: bool = False):
+    async def run_all():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(max_concurrency, 1)))
+        return await gather_bounded(coroutines, max_concurrency, return_exceptions)
+
+    return asyncio.run(run_all())
+
+
+# Holds one of the HTTP_MAX_TRANSFERS_PER_HOST slots of the URL host while the block runs, waiting for a free one if needed.
+# Bounds the number of concurrent downloads from the same host, regardless of how many worker threads are running them.
+@contextmanager
+def host_transfer_slot(url: str):
+    host = urlsplit(url).netloc.lower()
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            max_transfers = get_configuration_value("HTTP_MAX_TRANSFERS_PER_HOST", HTTP_MAX_TRANSFERS_PER_HOST)
+            semaphore = threading.BoundedSemaphore(max(max_transfers, 1))
+            _host_semaphores[host] = semaphore
+    with semaphore:
+        yield
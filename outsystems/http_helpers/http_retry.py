@@ -0,0 +1,149 @@
+# Python Modules
+import random
+import threading
+from time import sleep
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# Custom Modules
+# Variables
+from outsystems.vars.http_vars import HTTP_CONNECT_TIMEOUT_IN_SECS, HTTP_READ_TIMEOUT_IN_SECS, HTTP_MAX_RETRIES, \
+    HTTP_RETRY_BACKOFF_BASE_IN_SECS, HTTP_RETRY_BACKOFF_MAX_IN_SECS, HTTP_RETRY_BUDGET_IN_SECS, HTTP_RETRYABLE_STATUS_CODES, \
+    HTTP_TOO_MANY_REQUESTS_CODE, HTTP_IDEMPOTENT_METHODS
+# Functions
+from outsystems.http_helpers.http_session import get_http_session
+from outsystems.vars.vars_base import get_configuration_value
+
+
+# Keeps track of the time spent waiting between retries during the whole run.
+# Once the budget is exhausted, failed requests are no longer retried, so an unhealthy server does not pile up load.
+class RetryBudget:
+    def __init__(self, budget_in_secs: float):
+        self.budget_in_secs = budget_in_secs
+        self.spent_in_secs = 0.0
+        self._lock = threading.Lock()
+
+    # Reserves the given wait time. Returns False if it does not fit in the remaining budget.
+    def consume(self, wait_in_secs: float):
+        with self._lock:
+            if self.spent_in_secs + wait_in_secs > self.budget_in_secs:
+                return False
+            self.spent_in_secs += wait_in_secs
+            return True
+
+    def remaining(self):
+        with self._lock:
+            return max(self.budget_in_secs - self.spent_in_secs, 0)
+
+
+_retry_budget = None
+_retry_budget_lock = threading.Lock()
+
+
+# Returns the retry budget shared by every request of the current run
+def get_retry_budget():
+    global _retry_budget
+    with _retry_budget_lock:
+        if _retry_budget is None:
+            _retry_budget = RetryBudget(get_configuration_value("HTTP_RETRY_BUDGET_IN_SECS", HTTP_RETRY_BUDGET_IN_SECS))
+        return _retry_budget
+
+
+# Sends an HTTP request through the named shared session, retrying transient failures.
+# Retryable failures are 5xx/429 responses, timeouts and connection resets.
+# Idempotent methods (e.g. GET) are retried freely. Other methods (e.g. POST) are only retried when the caller
+# flags them as retry_safe, or when the server provably did not process the request (connection refused or 429).
+def send_http_request(session_name: str, method: str, url: str, retry_safe: bool = None, **kwargs):
+    method = method.upper()
+    if retry_safe is None:
+        retry_safe = method in HTTP_IDEMPOTENT_METHODS
+    if "timeout" not in kwargs:
+        kwargs["timeout"] = (get_configuration_value("HTTP_CONNECT_TIMEOUT_IN_SECS", HTTP_CONNECT_TIMEOUT_IN_SECS),
+                             get_configuration_value("HTTP_READ_TIMEOUT_IN_SECS", HTTP_READ_TIMEOUT_IN_SECS))
+    max_retries = get_configuration_value("HTTP_MAX_RETRIES", HTTP_MAX_RETRIES)
+    session = get_http_session(session_name)
+
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as error:
+            if attempt >= max_retries or not is_retryable_error(error, retry_safe):
+                raise
+            reason = type(error).__name__
+            wait_in_secs = get_backoff_delay(attempt)
+            if not get_retry_budget().consume(wait_in_secs):
+                print("{} {} failed ({}) and the retry budget for this run is exhausted.".format(method, url, reason), flush=True)
+                raise
+        else:
+            if attempt >= max_retries or not is_retryable_response(response, retry_safe):
+                return response
+            reason = "HTTP {}".format(response.status_code)
+            wait_in_secs = get_backoff_delay(attempt, get_retry_after(response))
+            if not get_retry_budget().consume(wait_in_secs):
+                print("{} {} failed ({}) and the retry budget for this run is exhausted.".format(method, url, reason), flush=True)
+                return response
+            # Release the connection back to the pool before waiting
+            response.close()
+
+        attempt += 1
+        print("{} {} failed ({}). Retrying in {:.1f} seconds (attempt {} of {})...".format(method, url, reason, wait_in_secs, attempt, max_retries), flush=True)
+        sleep(wait_in_secs)
+        # Rewind streamed request bodies (e.g. file uploads) before sending them again
+        body = kwargs.get("data")
+        if hasattr(body, "seek"):
+            body.seek(0)
+
+
+# Checks if a response can be retried
+def is_retryable_response(response: requests.Response, retry_safe: bool):
+    if response.status_code not in HTTP_RETRYABLE_STATUS_CODES:
+        return False
+    # A throttled request was not processed by the server, so it can always be repeated
+    return retry_safe or response.status_code == HTTP_TOO_MANY_REQUESTS_CODE
+
+
+# Checks if a request exception can be retried
+def is_retryable_error(error: Exception, retry_safe: bool):
+    # The connection was never established, so the server did not receive the request
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and _is_connection_refused(error):
+        return True
+    if not retry_safe:
+        return False
+    return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError))
+
+
+# Returns the number of seconds requested by the server through the Retry-After header (or None)
+def get_retry_after(response: requests.Response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max((retry_date - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+# Returns the wait time before the next attempt: exponential backoff with jitter, unless the server asked for a specific delay
+def get_backoff_delay(attempt: int, retry_after: float = None):
+    if retry_after is not None:
+        return retry_after
+    base = get_configuration_value("HTTP_RETRY_BACKOFF_BASE_IN_SECS", HTTP_RETRY_BACKOFF_BASE_IN_SECS)
+    ceiling = min(get_configuration_value("HTTP_RETRY_BACKOFF_MAX_IN_SECS", HTTP_RETRY_BACKOFF_MAX_IN_SECS), base * (2 ** attempt))
+    return random.uniform(base / 2, max(ceiling, base / 2))
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+def _is_connection_refused(error: requests.exceptions.ConnectionError):
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
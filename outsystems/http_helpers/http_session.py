@@ -0,0 +1,50 @@
+# Python Modules
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
+
+# Custom Modules
+# Variables
+from outsystems.vars.http_vars import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK
+# Functions
+from outsystems.vars.vars_base import get_configuration_value
+
+# Shared sessions, indexed by name (e.g. one for LifeTime, one for the CI/CD Probe)
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+
+# Returns the shared HTTP session for the given name, creating it on first use.
+# Each session keeps a keep-alive connection pool per host, so consecutive calls reuse the same TCP/TLS connection.
+# The underlying connection pools are thread-safe, so the same session can be used from worker threads.
+def get_http_session(session_name: str):
+    with _http_sessions_lock:
+        session = _http_sessions.get(session_name)
+        if session is None:
+            session = _build_http_session()
+            _http_sessions[session_name] = session
+        return session
+
+
+# Closes all shared HTTP sessions (and their pooled connections).
+def close_http_sessions():
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+def _build_http_session():
+    pool_connections = get_configuration_value("HTTP_POOL_CONNECTIONS", HTTP_POOL_CONNECTIONS)
+    pool_maxsize = get_configuration_value("HTTP_POOL_MAXSIZE", HTTP_POOL_MAXSIZE)
+    pool_block = get_configuration_value("HTTP_POOL_BLOCK", HTTP_POOL_BLOCK)
+
+    session = requests.Session()
+    # Authentication is sent explicitly in every request, so cookies are never stored.
+    # This also avoids sharing mutable cookie state between worker threads.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    for prefix in ("http://", "https://"):
+        session.mount(prefix, HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block))
+    return session
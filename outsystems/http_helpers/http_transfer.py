@@ -0,0 +1,158 @@
+# Python Modules
+import os
+import re
+import hashlib
+from time import sleep, monotonic
+import requests
+
+# Custom Modules
+# Variables
+from outsystems.vars.http_vars import HTTP_DOWNLOAD_CHUNK_SIZE_IN_BYTES, HTTP_DOWNLOAD_MAX_RESUMES, HTTP_SUCCESS_CODE, \
+    HTTP_PARTIAL_CONTENT_CODE, HTTP_UPLOAD_MAX_BYTES_PER_SEC, HTTP_UPLOAD_PROGRESS_INTERVAL_IN_SECS
+from outsystems.vars.file_vars import DOWNLOAD_PARTIAL_FILE
+# Functions
+from outsystems.http_helpers.http_retry import send_http_request, get_backoff_delay, get_retry_budget
+from outsystems.http_helpers.http_concurrency import host_transfer_slot
+from outsystems.vars.vars_base import get_configuration_value
+from outsystems.file_helpers.file import bytes_human_readable_size
+
+
+# Read-only file handle used as a streamed request body, so the file is sent in chunks instead of being loaded in memory.
+# Reports the upload progress (in bytes/sec) and, optionally, throttles the upload rate.
+class UploadFileReader:
+    def __init__(self, file_path: str, max_bytes_per_sec: int = None, progress_interval_in_secs: int = None):
+        self.file_path = file_path
+        self.size = os.path.getsize(file_path)
+        if max_bytes_per_sec is None:
+            max_bytes_per_sec = get_configuration_value("HTTP_UPLOAD_MAX_BYTES_PER_SEC", HTTP_UPLOAD_MAX_BYTES_PER_SEC)
+        if progress_interval_in_secs is None:
+            progress_interval_in_secs = get_configuration_value("HTTP_UPLOAD_PROGRESS_INTERVAL_IN_SECS", HTTP_UPLOAD_PROGRESS_INTERVAL_IN_SECS)
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self.progress_interval_in_secs = progress_interval_in_secs
+        self._file = open(file_path, "rb")
+        self._reset_progress()
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read(self, size: int = -1):
+        chunk = self._file.read(size)
+        self.sent_bytes += len(chunk)
+        if self.max_bytes_per_sec:
+            # Waits until the average rate falls back under the limit
+            ahead_in_secs = self.sent_bytes / self.max_bytes_per_sec - (monotonic() - self._started_on)
+            if ahead_in_secs > 0:
+                sleep(ahead_in_secs)
+        now = monotonic()
+        if (chunk and now - self._reported_on >= self.progress_interval_in_secs) or (not chunk and not self._completed):
+            self._completed = not chunk
+            self._reported_on = now
+            self._report_progress(now)
+        return chunk
+
+    # Rewinds the file (e.g. when the request is retried)
+    def seek(self, offset: int, whence: int = os.SEEK_SET):
+        position = self._file.seek(offset, whence)
+        if position == 0:
+            self._reset_progress()
+        return position
+
+    def tell(self):
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+    def _reset_progress(self):
+        self.sent_bytes = 0
+        self._started_on = monotonic()
+        self._reported_on = self._started_on
+        self._completed = False
+
+    def _report_progress(self, now: float):
+        elapsed_in_secs = max(now - self._started_on, 0.001)
+        percentage = 100 * self.sent_bytes / self.size if self.size else 100
+        print("Uploaded {} of {} ({:.0f}%) at {}/s.".format(
+            bytes_human_readable_size(self.sent_bytes), bytes_human_readable_size(self.size), percentage,
+            bytes_human_readable_size(int(self.sent_bytes / elapsed_in_secs))), flush=True)
+
+
+# Streams the response body of a GET request to file_path, hashing it (SHA-256) as it arrives.
+# The content is written to a partial file, which is only renamed to file_path once the download completes.
+# If the connection drops mid-transfer, the download is resumed from the last received byte using an HTTP Range request.
+# Concurrent downloads from the same host are limited by HTTP_MAX_TRANSFERS_PER_HOST.
+# Returns a dict with the HTTP status, the error response body (if any), the file size and its SHA-256 digest.
+def download_to_file(session_name: str, url: str, file_path: str, headers: dict, **kwargs):
+    partial_file_path = "{}{}".format(file_path, DOWNLOAD_PARTIAL_FILE)
+    try:
+        with host_transfer_slot(url):
+            result = _stream_to_file(session_name, url, partial_file_path, headers, **kwargs)
+    except BaseException:
+        # Never leave a partial file behind
+        if os.path.isfile(partial_file_path):
+            os.remove(partial_file_path)
+        raise
+
+    if result["http_status"] == HTTP_SUCCESS_CODE:
+        os.replace(partial_file_path, file_path)
+    else:
+        os.remove(partial_file_path)
+    return result
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+def _stream_to_file(session_name: str, url: str, partial_file_path: str, headers: dict, **kwargs):
+    chunk_size = get_configuration_value("HTTP_DOWNLOAD_CHUNK_SIZE_IN_BYTES", HTTP_DOWNLOAD_CHUNK_SIZE_IN_BYTES)
+    max_resumes = get_configuration_value("HTTP_DOWNLOAD_MAX_RESUMES", HTTP_DOWNLOAD_MAX_RESUMES)
+    digest = hashlib.sha256()
+    received_bytes = 0
+    resumes = 0
+
+    with open(partial_file_path, "wb") as f:
+        while True:
+            request_headers = dict(headers)
+            if received_bytes > 0:
+                request_headers["Range"] = "bytes={}-".format(received_bytes)
+            response = send_http_request(session_name, "GET", url, headers=request_headers, stream=True, **kwargs)
+            try:
+                if received_bytes > 0 and not _is_resumed_response(response, received_bytes):
+                    if response.status_code != HTTP_SUCCESS_CODE:
+                        return {"http_status": response.status_code, "response": response.text, "size": 0, "sha256": None}
+                    # The server ignored the range request: start over
+                    print("Server did not resume the download of {}. Restarting from the beginning...".format(url), flush=True)
+                    f.seek(0)
+                    f.truncate()
+                    digest = hashlib.sha256()
+                    received_bytes = 0
+                elif received_bytes == 0 and response.status_code != HTTP_SUCCESS_CODE:
+                    return {"http_status": response.status_code, "response": response.text, "size": 0, "sha256": None}
+
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    received_bytes += len(chunk)
+                return {"http_status": HTTP_SUCCESS_CODE, "response": {}, "size": received_bytes, "sha256": digest.hexdigest()}
+            except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                wait_in_secs = get_backoff_delay(resumes)
+                if resumes >= max_resumes or not get_retry_budget().consume(wait_in_secs):
+                    raise
+                resumes += 1
+                print("Download of {} interrupted after {} bytes ({}). Resuming in {:.1f} seconds (attempt {} of {})...".format(
+                    url, received_bytes, type(error).__name__, wait_in_secs, resumes, max_resumes), flush=True)
+                sleep(wait_in_secs)
+            finally:
+                response.close()
+
+
+# Checks if the server replied with the requested range, starting at the given offset
+def _is_resumed_response(response: requests.Response, offset: int):
+    if response.status_code != HTTP_PARTIAL_CONTENT_CODE:
+        return False
+    content_range = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+    return content_range is not None and int(content_range.group(1)) == offset
@@ -12,11 +12,16 @@ from outsystems.exceptions.not_enough_permissions import NotEnoughPermissionsErr
 from outsystems.exceptions.environment_not_found import EnvironmentNotFoundError
 from outsystems.exceptions.app_version_error import AppVersionsError
 # Functions
-from outsystems.file_helpers.file import store_data, load_data, clear_cache
+from outsystems.file_helpers.file import store_data
+from outsystems.file_helpers.cache import store_cache, load_cache
+from outsystems.lifetime.lifetime_registry import find_record, update_records
 from outsystems.lifetime.lifetime_base import send_get_request, send_post_request
 from outsystems.lifetime.lifetime_downloads import download_package
+from outsystems.vars.vars_base import get_configuration_value
 # Variables
-from outsystems.vars.file_vars import APPLICATION_FOLDER, APPLICATIONS_FILE, APPLICATION_FILE, APPLICATION_VERSIONS_FILE, APPLICATION_VERSION_FILE
+from outsystems.vars.pipeline_vars import TAG_STATUS_FAILED
+from outsystems.vars.file_vars import APPLICATION_FOLDER, APPLICATIONS_FILE, APPLICATION_FILE, APPLICATION_VERSIONS_FILE, APPLICATION_VERSION_FILE, \
+    APPLICATIONS_CACHE_TTL_IN_SECS
 from outsystems.vars.lifetime_vars import APPLICATIONS_ENDPOINT, APPLICATION_VERSIONS_ENDPOINT, APPLICATIONS_SUCCESS_CODE, \
     APPLICATIONS_EMPTY_CODE, APPLICATIONS_FLAG_FAILED_CODE, APPLICATIONS_FAILED_CODE, APPLICATION_SUCCESS_CODE, \
     APPLICATION_FLAG_FAILED_CODE, APPLICATION_NO_PERMISSION_CODE, APPLICATION_FAILED_CODE, APPLICATION_VERSION_SUCCESS_CODE, \
@@ -27,8 +32,13 @@ from outsystems.vars.lifetime_vars import APPLICATIONS_ENDPOINT, APPLICATION_VER
 
 
 # Returns a list of applications that exist in the infrastructure.
-def get_applications(artifact_dir: str, endpoint: str, auth_token: str, extra_data: bool):
+# If max_age is set, a cached list fetched with the same parameters at most max_age seconds ago is reused.
+def get_applications(artifact_dir: str, endpoint: str, auth_token: str, extra_data: bool, max_age: int = 0):
     params = {"IncludeModules": extra_data, "IncludeEnvStatus": extra_data}
+    cached_applications = load_cache(artifact_dir, APPLICATIONS_FILE, endpoint, max_age, params)
+    if cached_applications is not None:
+        update_records(artifact_dir, endpoint, APPLICATIONS_FILE, cached_applications, False)
+        return cached_applications
     # Sends the request
     response = send_get_request(
         endpoint, auth_token, APPLICATIONS_ENDPOINT, params)
@@ -36,7 +46,8 @@ def get_applications(artifact_dir: str, endpoint: str, auth_token: str, extra_da
     # Process the response based on the status code returned from the server
     if status_code == APPLICATIONS_SUCCESS_CODE:
         # Stores the result
-        store_data(artifact_dir, APPLICATIONS_FILE, response["response"])
+        store_cache(artifact_dir, APPLICATIONS_FILE, response["response"], endpoint, params)
+        update_records(artifact_dir, endpoint, APPLICATIONS_FILE, response["response"])
         return response["response"]
     elif status_code == APPLICATIONS_EMPTY_CODE:
         raise NoAppsAvailableError(
@@ -202,6 +213,24 @@ def set_application_version(endpoint: str, auth_token: str, env_key: str, app_ke
             "There was an error. Response from server: {}".format(response))
 
 
+# Prints the tagging result of each application (dicts with ApplicationName, Status, Version and Details, or the exception raised)
+# and returns the exceptions raised while tagging
+def print_tagging_report(app_names: list, results: list):
+    rows = [("Application", "Result", "Version", "Details")]
+    errors = []
+    for app_name, result in zip(app_names, results):
+        if isinstance(result, Exception):
+            errors.append(result)
+            rows.append((app_name, TAG_STATUS_FAILED, "-", str(result).splitlines()[0] if str(result) else type(result).__name__))
+        else:
+            rows.append((app_name, result["Status"], result["Version"] or "-", result["Details"] or ""))
+    widths = [max(len(row[col]) for row in rows) for col in range(len(rows[0]))]
+    print("\nTagging Summary:", flush=True)
+    for row in rows:
+        print("     " + " | ".join(value.ljust(width) for value, width in zip(row, widths)), flush=True)
+    return errors
+
+
 # Exports the OAP of a given application version.
 def export_app_oap(file_path: str, endpoint: str, auth_token: str, env_key: str, app_key: str, app_version_key: str):
     query = "{}/{}/{}/{}/{}".format(APPLICATIONS_ENDPOINT,
@@ -256,57 +285,19 @@ def _get_application_info(artifact_dir: str, api_url: str, auth_token: str, **kw
 
 # Private method to find an application key from name
 def _find_application_key(artifact_dir: str, api_url: str, auth_token: str, application_name: str):
-    app_key = ""
-    cached_results = False
-    try:
-        # Try searching the key on the cache
-        applications = load_data(artifact_dir, APPLICATIONS_FILE)
-        cached_results = True
-    except FileNotFoundError:
-        # Query the LT API, since there's no cache
-        applications = get_applications(
-            artifact_dir, api_url, auth_token, False)
-    for app in applications:
-        if app["Name"] == application_name:
-            app_key = app["Key"]
-            break
-    # If the app key was not found, determine if it needs to invalidate the cache or the application does not exist
-    # since we explitly clear the cache, and the code is not multithreaded, it should not lead to recursion issues
-    # If the cache was not used in the first place, it means the app does not exist
-    if app_key == "" and not cached_results:
+    app = find_record(artifact_dir, api_url, APPLICATIONS_FILE, get_configuration_value("APPLICATIONS_CACHE_TTL_IN_SECS", APPLICATIONS_CACHE_TTL_IN_SECS),
+                      lambda: get_applications(artifact_dir, api_url, auth_token, False), "Name", application_name)
+    if app is None:
         raise AppDoesNotExistError(
             "Failed to retrieve the application. Please make sure the app exists in the environment. App Name: {}".format(application_name))
-    # If the cache was used, it needs to be cleared and re-fetched from the LT server
-    elif app_key == "" and cached_results:
-        clear_cache(artifact_dir, APPLICATIONS_FILE)
-        return _find_application_key(artifact_dir, api_url, auth_token, application_name)
-    return app_key
+    return app["Key"]
 
 
 # Private method to find an application name from key
 def _find_application_name(artifact_dir: str, api_url: str, auth_token: str, application_key: str):
-    app_name = ""
-    cached_results = False
-    try:
-        # Try searching the key on the cache
-        applications = load_data(artifact_dir, APPLICATIONS_FILE)
-        cached_results = True
-    except FileNotFoundError:
-        # Query the LT API, since there's no cache
-        applications = get_applications(
-            artifact_dir, api_url, auth_token, False)
-    for app in applications:
-        if app["Key"] == application_key:
-            app_name = app["Name"]
-            break
-    # If the app name  was not found, determine if it needs to invalidate the cache or the application does not exist
-    # since we explitly clear the cache, and the code is not multithreaded, it should not lead to recursion issues
-    # If the cache was not used in the first place, it means the app does not exist
-    if app_name == "" and not cached_results:
+    app = find_record(artifact_dir, api_url, APPLICATIONS_FILE, get_configuration_value("APPLICATIONS_CACHE_TTL_IN_SECS", APPLICATIONS_CACHE_TTL_IN_SECS),
+                      lambda: get_applications(artifact_dir, api_url, auth_token, False), "Key", application_key)
+    if app is None:
         raise AppDoesNotExistError(
             "Failed to retrieve the application. Please make sure the app exists in the environment. App Key: {}".format(application_key))
-    # If the cache was used, it needs to be cleared and re-fetched from the LT server
-    elif app_name == "" and cached_results:
-        clear_cache(artifact_dir, APPLICATIONS_FILE)
-        return _find_application_name(artifact_dir, api_url, auth_token, application_key)
-    return app_name
+    return app["Name"]
@@ -0,0 +1,72 @@
+# Python Modules
+import asyncio
+
+# Custom Modules
+# Functions
+from outsystems.http_helpers.http_concurrency import run_bounded
+from outsystems.lifetime.lifetime_applications import get_applications, get_application_data, get_application_versions, \
+    get_application_version, get_running_app_version
+from outsystems.lifetime.lifetime_environments import get_environments, get_environment_app_version, get_environment_deployment_zones, \
+    get_environment_app_source_code, get_environment_app_source_code_status
+from outsystems.lifetime.lifetime_deployments import get_deployment_info, get_deployment_status
+from outsystems.vars.vars_base import get_configuration_value
+# Variables
+from outsystems.vars.lifetime_vars import LIFETIME_MAX_CONCURRENT_REQUESTS
+
+
+# Async counterparts of the LifeTime API functions.
+# Each call runs the blocking function in a worker thread, so it still goes through the shared HTTP session and retry engine.
+async def get_applications_async(artifact_dir: str, endpoint: str, auth_token: str, extra_data: bool):
+    return await asyncio.to_thread(get_applications, artifact_dir, endpoint, auth_token, extra_data)
+
+
+async def get_application_data_async(artifact_dir: str, endpoint: str, auth_token: str, extra_data: bool, **kwargs):
+    return await asyncio.to_thread(get_application_data, artifact_dir, endpoint, auth_token, extra_data, **kwargs)
+
+
+async def get_application_versions_async(artifact_dir: str, endpoint: str, auth_token: str, number_of_versions: int, **kwargs):
+    return await asyncio.to_thread(get_application_versions, artifact_dir, endpoint, auth_token, number_of_versions, **kwargs)
+
+
+async def get_application_version_async(artifact_dir: str, endpoint: str, auth_token: str, extra_data: bool, version_id: str, **kwargs):
+    return await asyncio.to_thread(get_application_version, artifact_dir, endpoint, auth_token, extra_data, version_id, **kwargs)
+
+
+async def get_running_app_version_async(artifact_dir: str, endpoint: str, auth_token: str, env_key: str, **kwargs):
+    return await asyncio.to_thread(get_running_app_version, artifact_dir, endpoint, auth_token, env_key, **kwargs)
+
+
+async def get_environments_async(artifact_dir: str, endpoint: str, auth_token: str):
+    return await asyncio.to_thread(get_environments, artifact_dir, endpoint, auth_token)
+
+
+async def get_environment_app_version_async(artifact_dir: str, endpoint: str, auth_token: str, extra_data: bool, **kwargs):
+    return await asyncio.to_thread(get_environment_app_version, artifact_dir, endpoint, auth_token, extra_data, **kwargs)
+
+
+async def get_environment_deployment_zones_async(artifact_dir: str, endpoint: str, auth_token: str, **kwargs):
+    return await asyncio.to_thread(get_environment_deployment_zones, artifact_dir, endpoint, auth_token, **kwargs)
+
+
+async def get_environment_app_source_code_async(artifact_dir: str, endpoint: str, auth_token: str, **kwargs):
+    return await asyncio.to_thread(get_environment_app_source_code, artifact_dir, endpoint, auth_token, **kwargs)
+
+
+async def get_environment_app_source_code_status_async(artifact_dir: str, endpoint: str, auth_token: str, **kwargs):
+    return await asyncio.to_thread(get_environment_app_source_code_status, artifact_dir, endpoint, auth_token, **kwargs)
+
+
+async def get_deployment_info_async(artifact_dir: str, endpoint: str, auth_token: str, deployment_key: str):
+    return await asyncio.to_thread(get_deployment_info, artifact_dir, endpoint, auth_token, deployment_key)
+
+
+async def get_deployment_status_async(artifact_dir: str, endpoint: str, auth_token: str, deployment_key: str):
+    return await asyncio.to_thread(get_deployment_status, artifact_dir, endpoint, auth_token, deployment_key)
+
+
+# Runs the given LifeTime coroutines concurrently, bounded by LIFETIME_MAX_CONCURRENT_REQUESTS.
+# Results are returned in the same order as the coroutines.
+# With return_exceptions=True, failed calls return their exception instead of aborting the remaining ones.
+def run_lifetime_calls(coroutines: list, return_exceptions: bool = False):
+    max_concurrency = get_configuration_value("LIFETIME_MAX_CONCURRENT_REQUESTS", LIFETIME_MAX_CONCURRENT_REQUESTS)
+    return run_bounded(coroutines, max_concurrency, return_exceptions)
@@ -1,5 +1,4 @@
 # Python Modules
-import requests
 import json
 
 # Custom Modules
@@ -7,7 +6,10 @@ import json
 from outsystems.exceptions.invalid_json_response import InvalidJsonResponseError
 # Variables
 from outsystems.vars.lifetime_vars import LIFETIME_SSL_CERT_VERIFY
+from outsystems.vars.http_vars import LIFETIME_HTTP_SESSION
 # Functions
+from outsystems.http_helpers.http_retry import send_http_request
+from outsystems.http_helpers.http_transfer import download_to_file, UploadFileReader
 from outsystems.vars.vars_base import get_configuration_value
 from outsystems.file_helpers.file import check_file
 
@@ -25,7 +27,7 @@ def send_get_request(lt_api: str, token: str, api_endpoint: str, url_params: dic
                'authorization': 'Bearer ' + token}
     # Format the request URL to include the api endpoint
     request_string = "{}/{}".format(lt_api, api_endpoint)
-    response = requests.get(request_string, params=url_params, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
+    response = send_http_request(LIFETIME_HTTP_SESSION, "GET", request_string, params=url_params, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     if len(response.text) > 0:
         try:
@@ -37,14 +39,15 @@ def send_get_request(lt_api: str, token: str, api_endpoint: str, url_params: dic
 
 
 # Sends a POST request to LT, with a payload. The json part is ignored
-def send_post_request(lt_api: str, token: str, api_endpoint: str, payload: str):
+# POST requests are only retried on transient failures when flagged as retry_safe (i.e. repeating them has no side effects)
+def send_post_request(lt_api: str, token: str, api_endpoint: str, payload: str, retry_safe: bool = False):
     # Auth token + content type json
     headers = {'content-type': 'application/json',
                'authorization': 'Bearer ' + token}
     # Format the request URL to include the api endpoint
     request_string = "{}/{}".format(lt_api, api_endpoint)
-    response = requests.post(
-        request_string, data=payload, json=None, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
+    response = send_http_request(
+        LIFETIME_HTTP_SESSION, "POST", request_string, retry_safe=retry_safe, data=payload, json=None, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     # Since LT API POST requests do not reply with native JSON, we have to make it ourselves
     if len(response.text) > 0:
@@ -64,10 +67,11 @@ def send_binary_post_request(lt_api: str, token: str, api_endpoint: str, dest_en
     # Format the request URL to include the api endpoint
     request_string = "{}/{}/{}/{}".format(lt_api, api_endpoint, dest_env, lt_endpont)
 
-    if check_file("", binary_file_path):
-        with open(binary_file_path, 'rb') as f:
-            data = f.read()
-    response = requests.post(request_string, data=data, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
+    if not check_file("", binary_file_path):
+        raise FileNotFoundError("The file with filename {} does not exist.".format(binary_file_path))
+    # Streams the file in chunks, instead of loading it in memory
+    with UploadFileReader(binary_file_path) as data:
+        response = send_http_request(LIFETIME_HTTP_SESSION, "POST", request_string, data=data, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     # Since LT API POST requests do not reply with native JSON, we have to make it ourselves
     if len(response.text) > 0:
@@ -86,7 +90,7 @@ def send_delete_request(lt_api: str, token: str, api_endpoint: str):
                'authorization': 'Bearer ' + token}
     # Format the request URL to include the api endpoint
     request_string = "{}/{}".format(lt_api, api_endpoint)
-    response = requests.delete(request_string, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
+    response = send_http_request(LIFETIME_HTTP_SESSION, "DELETE", request_string, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     if len(response.text) > 0:
         try:
@@ -97,12 +101,10 @@ def send_delete_request(lt_api: str, token: str, api_endpoint: str):
     return response_obj
 
 
-# Sends a GET request to LT, with url_params
-def send_download_request(pkg_url: str, token: str):
+# Sends a GET request to LT to download a binary file, streaming it to file_path
+def send_download_request(pkg_url: str, token: str, file_path: str):
     # Auth token + content type json
     headers = {'content-type': 'application/json',
                'authorization': token}
     # Format the request URL to include the api endpoint
-    response = requests.get(pkg_url, headers=headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
-    response_obj = {"http_status": response.status_code, "response": response.content}
-    return response_obj
+    return download_to_file(LIFETIME_HTTP_SESSION, pkg_url, file_path, headers, verify=get_configuration_value("LIFETIME_SSL_CERT_VERIFY", LIFETIME_SSL_CERT_VERIFY))
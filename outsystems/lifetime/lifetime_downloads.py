@@ -9,6 +9,7 @@ from outsystems.exceptions.not_enough_permissions import NotEnoughPermissionsErr
 from outsystems.exceptions.server_error import ServerError
 # Functions
 from outsystems.lifetime.lifetime_base import send_download_request
+from outsystems.file_helpers.file import store_file_digest
 
 # Variables
 from outsystems.vars.lifetime_vars import DOWNLOAD_SUCCESS_CODE, DOWNLOAD_INVALID_KEY_CODE, \
@@ -16,18 +17,19 @@ from outsystems.vars.lifetime_vars import DOWNLOAD_SUCCESS_CODE, DOWNLOAD_INVALI
 
 
 # Downloads a binary file from a LifeTime download link
+# The SHA-256 digest of the file is stored next to it
 def download_package(file_path: str, auth_token: str, pkg_url: str):
-    # Sends the request
-    response = send_download_request(pkg_url, auth_token)
+    # Remove the spaces in the filename
+    file_path = file_path.replace(" ", "_")
+    # Makes sure that, if a directory is in the filename, that directory exists
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # Sends the request, streaming the package to disk
+    response = send_download_request(pkg_url, auth_token, file_path)
     status_code = int(response["http_status"])
 
     if status_code == DOWNLOAD_SUCCESS_CODE:
-        # Remove the spaces in the filename
-        file_path = file_path.replace(" ", "_")
-        # Makes sure that, if a directory is in the filename, that directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "wb") as f:
-            f.write(response["response"])
+        # Stores the digest computed while downloading next to the package
+        store_file_digest(file_path, response["sha256"])
     elif status_code == DOWNLOAD_INVALID_KEY_CODE:
         raise InvalidParametersError("The required type <Type> is invalid for given keys (EnvironmentKey; ApplicationKey). Details: {}".format(
             response["response"]))
@@ -11,7 +11,10 @@ from outsystems.exceptions.server_error import ServerError
 # Functions
 from outsystems.lifetime.lifetime_base import send_get_request, send_post_request
 from outsystems.lifetime.lifetime_applications import _get_application_info
-from outsystems.file_helpers.file import load_data, store_data, clear_cache
+from outsystems.file_helpers.file import store_data
+from outsystems.file_helpers.cache import store_cache, load_cache
+from outsystems.lifetime.lifetime_registry import find_record, update_records
+from outsystems.vars.vars_base import get_configuration_value
 # Variables
 from outsystems.vars.lifetime_vars import ENVIRONMENTS_ENDPOINT, ENVIRONMENT_APPLICATIONS_ENDPOINT, ENVIRONMENTS_SUCCESS_CODE, \
     ENVIRONMENTS_NOT_FOUND_CODE, ENVIRONMENTS_FAILED_CODE, ENVIRONMENT_APP_SUCCESS_CODE, ENVIRONMENT_APP_NOT_STATUS_CODE, \
@@ -21,18 +24,24 @@ from outsystems.vars.lifetime_vars import ENVIRONMENTS_ENDPOINT, ENVIRONMENT_APP
     ENVIRONMENT_SOURCECODE_LINK_SUCCESS_CODE, ENVIRONMENT_SOURCECODE_FAILED_CODE
 from outsystems.vars.file_vars import ENVIRONMENTS_FILE, ENVIRONMENT_FOLDER, ENVIRONMENT_APPLICATION_FILE, \
     ENVIRONMENT_DEPLOYMENT_ZONES_FILE, ENVIRONMENT_SOURCECODE_FOLDER, ENVIRONMENT_SOURCECODE_STATUS_FILE, \
-    ENVIRONMENT_SOURCECODE_LINK_FILE
+    ENVIRONMENT_SOURCECODE_LINK_FILE, ENVIRONMENTS_CACHE_TTL_IN_SECS
 
 
 # Lists all the environments in the infrastructure.
-def get_environments(artifact_dir: str, endpoint: str, auth_token: str):
+# If max_age is set, a cached list fetched at most max_age seconds ago is reused.
+def get_environments(artifact_dir: str, endpoint: str, auth_token: str, max_age: int = 0):
+    cached_environments = load_cache(artifact_dir, ENVIRONMENTS_FILE, endpoint, max_age)
+    if cached_environments is not None:
+        update_records(artifact_dir, endpoint, ENVIRONMENTS_FILE, cached_environments, False)
+        return cached_environments
     # Sends the request
     response = send_get_request(
         endpoint, auth_token, ENVIRONMENTS_ENDPOINT, None)
     status_code = int(response["http_status"])
     if status_code == ENVIRONMENTS_SUCCESS_CODE:
         # Stores the result
-        store_data(artifact_dir, ENVIRONMENTS_FILE, response["response"])
+        store_cache(artifact_dir, ENVIRONMENTS_FILE, response["response"], endpoint)
+        update_records(artifact_dir, endpoint, ENVIRONMENTS_FILE, response["response"])
         return response["response"]
     elif status_code == ENVIRONMENTS_NOT_FOUND_CODE:
         raise EnvironmentNotFoundError(
@@ -136,7 +145,8 @@ def get_environment_app_source_code(artifact_dir: str, endpoint: str, auth_token
                                     ENVIRONMENT_APPLICATIONS_ENDPOINT, app_tuple[1],
                                     ENVIRONMENT_APPLICATIONS_SOURCECODE_ENDPOINT)
     # Sends the request
-    response = send_post_request(endpoint, auth_token, query, None)
+    # Requesting a new source code package has no side effects, so it is safe to retry
+    response = send_post_request(endpoint, auth_token, query, None, retry_safe=True)
     status_code = int(response["http_status"])
     if status_code == ENVIRONMENT_SOURCECODE_PACKAGE_SUCCESS_CODE:
         return response["response"]
@@ -227,81 +237,31 @@ def _get_environment_info(artifact_dir: str, api_url: str, auth_token: str, **kw
 
 # Private method to find an environment key from name
 def _find_environment_key(artifact_dir: str, api_url: str, auth_token: str, environment_name: str):
-    env_key = ""
-    cached_results = False
-    try:
-        # Try searching the key on the cache
-        environments = load_data(artifact_dir, ENVIRONMENTS_FILE)
-        cached_results = True
-    except:
-        # Query the LT API, since there's no cache
-        environments = get_environments(artifact_dir, api_url, auth_token)
-    for env in environments:
-        if env["Name"] == environment_name:
-            env_key = env["Key"]
-            break
-    # If the env key  was not found, determine if it needs to invalidate the cache or the application does not exist
-    # since we explitly clear the cache, and the code is not multithreaded, it should not lead to recursion issues
-    # If the cache was not used in the first place, it means the app does not exist
-    if env_key == "" and not cached_results:
+    env = _find_environment(artifact_dir, api_url, auth_token, "Name", environment_name)
+    if env is None:
         raise EnvironmentNotFoundError(
             "Failed to retrieve the environment. Please make sure the environment exists. Environment name: {}".format(environment_name))
-    # If the cache was used, it needs to be cleared and re-fetched from the LT server
-    elif env_key == "" and cached_results:
-        clear_cache(artifact_dir, ENVIRONMENTS_FILE)
-        return _find_environment_key(artifact_dir, api_url, auth_token, environment_name)
-    return env_key
+    return env["Key"]
 
 
 # Private method to find an environment name from key
 def _find_environment_name(artifact_dir: str, api_url: str, auth_token: str, environment_key: str):
-    env_name = ""
-    cached_results = False
-    try:
-        # Try searching the key on the cache
-        environments = load_data(artifact_dir, ENVIRONMENTS_FILE)
-        cached_results = True
-    except:
-        # Query the LT API, since there's no cache
-        environments = get_environments(artifact_dir, api_url, auth_token)
-    for env in environments:
-        if env["Key"] == environment_key:
-            env_name = env["Name"]
-            break
-    # If the env key  was not found, determine if it needs to invalidate the cache or the application does not exist
-    # since we explitly clear the cache, and the code is not multithreaded, it should not lead to recursion issues
-    # If the cache was not used in the first place, it means the app does not exist
-    if env_name == "" and not cached_results:
+    env = _find_environment(artifact_dir, api_url, auth_token, "Key", environment_key)
+    if env is None:
         raise EnvironmentNotFoundError(
             "Failed to retrieve the environment. Please make sure the environment exists. Environment key: {}".format(environment_key))
-    # If the cache was used, it needs to be cleared and re-fetched from the LT server
-    elif env_name == "" and cached_results:
-        clear_cache(artifact_dir, ENVIRONMENTS_FILE)
-        return _find_environment_name(artifact_dir, api_url, auth_token, environment_key)
-    return env_name
+    return env["Name"]
 
 
 def _find_environment_url(artifact_dir: str, api_url: str, auth_token: str, environment_name: str):
-    env_url = ""
-    cached_results = False
-    try:
-        # Try searching the key on the cache
-        environments = load_data(artifact_dir, ENVIRONMENTS_FILE)
-        cached_results = True
-    except:
-        # Query the LT API, since there's no cache
-        environments = get_environments(artifact_dir, api_url, auth_token)
-    for env in environments:
-        if env["Name"] == environment_name:
-            env_url = env["HostName"]
-    # If the env key  was not found, determine if it needs to invalidate the cache or the application does not exist
-    # since we explitly clear the cache, and the code is not multithreaded, it should not lead to recursion issues
-    # If the cache was not used in the first place, it means the app does not exist
-    if env_url == "" and not cached_results:
+    env = _find_environment(artifact_dir, api_url, auth_token, "Name", environment_name)
+    if env is None or not env.get("HostName"):
         raise EnvironmentNotFoundError(
             "Failed to retrieve the environment. Please make sure the environment exists. Environment name: {}".format(environment_name))
-    # If the cache was used, it needs to be cleared and re-fetched from the LT server
-    elif env_url == "" and cached_results:
-        clear_cache(artifact_dir, ENVIRONMENTS_FILE)
-        return _find_environment_url(artifact_dir, api_url, auth_token, environment_name)
-    return env_url
+    return env["HostName"]
+
+
+# Private method to find an environment record in the registry
+def _find_environment(artifact_dir: str, api_url: str, auth_token: str, field: str, value: str):
+    return find_record(artifact_dir, api_url, ENVIRONMENTS_FILE, get_configuration_value("ENVIRONMENTS_CACHE_TTL_IN_SECS", ENVIRONMENTS_CACHE_TTL_IN_SECS),
+                       lambda: get_environments(artifact_dir, api_url, auth_token), field, value)
@@ -0,0 +1,91 @@
+# Python Modules
+from time import sleep, monotonic
+
+# Custom Modules
+# Variables
+from outsystems.vars.pipeline_vars import POLLING_INITIAL_INTERVAL_IN_SECS, POLLING_BACKOFF_FACTOR, POLLING_EXPECTED_DURATION_RATIO, \
+    POLLING_DURATION_HISTORY_WEIGHT
+from outsystems.vars.file_vars import POLLING_HISTORY_FILE
+# Functions
+from outsystems.file_helpers.file import store_data, load_data, check_file
+from outsystems.vars.vars_base import get_configuration_value
+
+
+# Waits between status checks of a long running LifeTime operation (e.g. deployment plan, source code or solution package).
+# Polls fast at first and backs off up to max_interval_in_secs. The timeout is measured on a monotonic clock (wall time,
+# including the time spent on the status calls). If the usual duration of the operation is known (expected_duration_in_secs),
+# it polls at the slowest rate until the operation is close to finishing.
+# on_transition(previous_status, status, elapsed_in_secs) is called whenever the status reported through observe() changes.
+class Poller:
+    def __init__(self, timeout_in_secs: int, max_interval_in_secs: int, expected_duration_in_secs: float = None, on_transition: callable = None):
+        self.timeout_in_secs = timeout_in_secs
+        self.max_interval_in_secs = max_interval_in_secs
+        self.expected_duration_in_secs = expected_duration_in_secs
+        self.on_transition = on_transition
+        self.status = None
+        self._initial_interval_in_secs = min(get_configuration_value("POLLING_INITIAL_INTERVAL_IN_SECS", POLLING_INITIAL_INTERVAL_IN_SECS), max_interval_in_secs)
+        self._interval_in_secs = self._initial_interval_in_secs
+        self._started_on = monotonic()
+        self._polled = False
+
+    # Returns True while the operation should be polled: immediately on the first call, then after waiting for the next interval
+    def poll(self):
+        if not self._polled:
+            self._polled = True
+            return True
+        return self.wait()
+
+    # Waits for the next interval. Returns False (without waiting) if the timeout was already reached
+    def wait(self):
+        remaining_in_secs = self.timeout_in_secs - self.elapsed()
+        if remaining_in_secs <= 0:
+            return False
+        sleep(min(self._next_interval(), remaining_in_secs))
+        return True
+
+    # Records the current status of the operation, notifying status transitions. Returns True if the status changed
+    def observe(self, status: str):
+        if status == self.status:
+            return False
+        previous_status, self.status = self.status, status
+        if self.on_transition:
+            self.on_transition(previous_status, status, self.elapsed())
+        return True
+
+    # Returns the time (in seconds) elapsed since the poller was created
+    def elapsed(self):
+        return monotonic() - self._started_on
+
+    def _next_interval(self):
+        if self.expected_duration_in_secs:
+            slow_until_in_secs = self.expected_duration_in_secs * float(get_configuration_value("POLLING_EXPECTED_DURATION_RATIO", POLLING_EXPECTED_DURATION_RATIO))
+            if self.elapsed() < slow_until_in_secs:
+                # The operation is not expected to finish yet: poll slowly until it gets close to its usual duration
+                return max(min(self.max_interval_in_secs, slow_until_in_secs - self.elapsed()), self._initial_interval_in_secs)
+        interval_in_secs = self._interval_in_secs
+        self._interval_in_secs = min(self._interval_in_secs * float(get_configuration_value("POLLING_BACKOFF_FACTOR", POLLING_BACKOFF_FACTOR)), self.max_interval_in_secs)
+        return interval_in_secs
+
+
+# Returns the usual duration (in seconds) of a kind of operation (e.g. "deployment"), from previous runs on the same workspace
+def get_expected_duration(artifact_dir: str, operation: str):
+    if not check_file(artifact_dir, POLLING_HISTORY_FILE):
+        return None
+    try:
+        return load_data(artifact_dir, POLLING_HISTORY_FILE).get(operation)
+    except ValueError:
+        return None
+
+
+# Records the duration of a finished operation, keeping a moving average per kind of operation
+def store_duration(artifact_dir: str, operation: str, duration_in_secs: float):
+    history = {}
+    if check_file(artifact_dir, POLLING_HISTORY_FILE):
+        try:
+            history = load_data(artifact_dir, POLLING_HISTORY_FILE)
+        except ValueError:
+            history = {}
+    weight = float(get_configuration_value("POLLING_DURATION_HISTORY_WEIGHT", POLLING_DURATION_HISTORY_WEIGHT))
+    previous_duration = history.get(operation)
+    history[operation] = duration_in_secs if previous_duration is None else (1 - weight) * previous_duration + weight * duration_in_secs
+    store_data(artifact_dir, POLLING_HISTORY_FILE, history)
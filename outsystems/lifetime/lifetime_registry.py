@@ -0,0 +1,78 @@
+# Python Modules
+import threading
+
+# Custom Modules
+# Functions
+from outsystems.file_helpers.cache import load_cache
+
+# Process-wide indexes of the LifeTime records (e.g. applications, environments) stored in the artifacts cache files.
+# Each index is keyed by (artifact_dir, api_url, cache_file) and holds the records plus a dict per looked up field.
+_indexes = {}
+_registry_lock = threading.RLock()
+_registry_stats = {"hits": 0, "misses": 0, "refreshes": 0}
+
+
+# Finds a LifeTime record (e.g. an application) by one of its fields (e.g. "Name" or "Key").
+# The index is built once per process from the cache file (if it is at most max_age seconds old), or fetched from LifeTime.
+# On a miss, an index built from the cache file is refreshed from LifeTime once, since the cache may be outdated.
+# Returns None if there is no such record.
+def find_record(artifact_dir: str, api_url: str, cache_file: str, max_age: int, fetch_records: callable, field: str, value: str):
+    with _registry_lock:
+        index = _indexes.get((artifact_dir, api_url, cache_file))
+        if index is None:
+            records = load_cache(artifact_dir, cache_file, api_url, max_age)
+            if records is not None:
+                index = _build_index(records, False)
+                _indexes[(artifact_dir, api_url, cache_file)] = index
+            else:
+                # Query the LT API, since there's no valid cache (fetch_records updates the registry)
+                fetch_records()
+                index = _indexes[(artifact_dir, api_url, cache_file)]
+
+        record = _lookup(index, field, value)
+        if record is not None:
+            _registry_stats["hits"] += 1
+            return record
+
+        _registry_stats["misses"] += 1
+        if index["fetched"]:
+            # The records already came from LifeTime in this run, so the record does not exist
+            return None
+        # The cache file may be outdated, so it is refreshed from LifeTime (fetch_records updates the registry)
+        _registry_stats["refreshes"] += 1
+        fetch_records()
+        return _lookup(_indexes[(artifact_dir, api_url, cache_file)], field, value)
+
+
+# Replaces the indexed records with the ones just fetched from LifeTime (or loaded from a warm cache, if not fetched)
+def update_records(artifact_dir: str, api_url: str, cache_file: str, records: list, fetched: bool = True):
+    with _registry_lock:
+        _indexes[(artifact_dir, api_url, cache_file)] = _build_index(records, fetched)
+
+
+# Returns the number of lookups found in the registry (hits), not found (misses) and the number of refreshes from LifeTime
+def get_registry_stats():
+    with _registry_lock:
+        return dict(_registry_stats)
+
+
+# Drops every index, forcing the next lookups to reload the cache files
+def clear_registry():
+    with _registry_lock:
+        _indexes.clear()
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+def _build_index(records: list, fetched: bool):
+    return {"records": records, "fetched": fetched, "fields": {}}
+
+
+# Looks up a record by field, building the field dict on first use
+def _lookup(index: dict, field: str, value: str):
+    if field not in index["fields"]:
+        field_index = {}
+        for record in index["records"]:
+            if field in record:
+                field_index.setdefault(record[field], record)
+        index["fields"][field] = field_index
+    return index["fields"][field].get(value)
@@ -0,0 +1,46 @@
+# Custom Modules
+# Functions
+from outsystems.lifetime.lifetime_applications import get_applications
+from outsystems.lifetime.lifetime_async import run_lifetime_calls, get_application_version_async
+
+
+# Point-in-time view of the status of every application in every environment, taken from a single bulk call to LifeTime.
+# Also holds the version numbers of the application versions looked up for the snapshot.
+class InfrastructureSnapshot:
+    def __init__(self, applications: list):
+        self._app_status_in_envs = {}
+        for app in applications:
+            for app_in_env in app.get("AppStatusInEnvs", []):
+                self._app_status_in_envs[(app["Key"], app_in_env["EnvironmentKey"])] = app_in_env
+        self._version_numbers = {}
+
+    # Returns the status of the application in the environment (or None, if the app does not exist there)
+    def get_app_status_in_env(self, app_key: str, env_key: str):
+        return self._app_status_in_envs.get((app_key, env_key))
+
+    # Returns the version number (i.e. tag) of an application version looked up for the snapshot
+    def get_version_number(self, app_key: str, version_key: str):
+        return self._version_numbers[(app_key, version_key)]
+
+    def add_version_number(self, app_key: str, version_key: str, version_number: str):
+        self._version_numbers[(app_key, version_key)] = version_number
+
+
+# Takes a snapshot of the infrastructure to check which applications (dicts with Key and VersionKey) are already deployed in the
+# target environment. The version numbers of the different versions running in the environment are looked up concurrently.
+def get_infrastructure_snapshot(artifact_dir: str, endpoint: str, auth_token: str, env_key: str, app_data_list: list):
+    snapshot = InfrastructureSnapshot(get_applications(artifact_dir, endpoint, auth_token, True))
+
+    running_versions = []  # will contain the (app key, version key) of the versions to look up
+    for app in app_data_list:
+        app_in_env = snapshot.get_app_status_in_env(app["Key"], env_key)
+        if app_in_env and app_in_env["BaseApplicationVersionKey"] != app["VersionKey"] and \
+                (app["Key"], app_in_env["BaseApplicationVersionKey"]) not in running_versions:
+            running_versions.append((app["Key"], app_in_env["BaseApplicationVersionKey"]))
+
+    version_details = run_lifetime_calls([get_application_version_async(artifact_dir, endpoint, auth_token, False, version_key, app_key=app_key)
+                                          for app_key, version_key in running_versions])
+    for (app_key, version_key), version_detail in zip(running_versions, version_details):
+        snapshot.add_version_number(app_key, version_key, version_detail["Version"])
+
+    return snapshot
@@ -26,8 +26,9 @@ def create_solution(artifact_dir: str, endpoint: str, auth_token: str, environme
     # Builds the body for the request
     solution_request = _create_solution_request(solution_name, app_keys, include_refs)
     # Sends the request
+    # Creating a new solution has no side effects on the environment, so it is safe to retry
     response = send_post_request(
-        endpoint, auth_token, query, solution_request)
+        endpoint, auth_token, query, solution_request, retry_safe=True)
     status_code = int(response["http_status"])
     if status_code == ENVIRONMENT_SOLUTION_SUCCESS_CODE:
         return response["response"]
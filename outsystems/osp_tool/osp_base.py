@@ -1,49 +1,82 @@
+# Python Modules
+import os
+import signal
 import subprocess
 import threading
+from collections import deque
+from datetime import datetime
 
 # Custom Modules
 # Variables
-from outsystems.vars.pipeline_vars import SOLUTION_TIMEOUT_IN_SECS
+from outsystems.vars.pipeline_vars import SOLUTION_TIMEOUT_IN_SECS, OSPTOOL_ERROR_VALIDATIONS, OSPTOOL_LOG_TAIL_LINES
 # Functions
 from outsystems.vars.vars_base import get_configuration_value
 # Exceptions
 from outsystems.exceptions.osptool_error import OSPToolDeploymentError
 
 
-def run_command(command, live_output_callback=None, timeout=None):
-    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+# Runs a command, draining its stdout and stderr at the same time (so neither pipe can fill up and block the process).
+# Every output line is passed to live_output_callback and, if log_file_path is set, appended to that file as it arrives (with a timestamp).
+# Only the last OSPTOOL_LOG_TAIL_LINES lines are kept in memory, and returned as the execution log.
+# On timeout, the process and all of its child processes are killed.
+def run_command(command, live_output_callback=None, timeout=None, log_file_path=None):
+    if os.name == "nt":
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+    else:
+        # The process gets its own process group, so it can be killed along with its children
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True)
+
+    # Last lines of the output (both streams), used for error reporting
+    output_tail = deque(maxlen=get_configuration_value("OSPTOOL_LOG_TAIL_LINES", OSPTOOL_LOG_TAIL_LINES))
+    output_lock = threading.Lock()
+    log_file = open(log_file_path, "w") if log_file_path else None
 
-    def read_output(pipe, callback, output_list):
+    def read_output(pipe, stream_name):
         with pipe:
             for line in iter(pipe.readline, ''):
-                callback(line.strip())
-                output_list.append(line)
-
-    # List to capture the live output
-    live_output = []
-
-    # Create a thread for reading and displaying live output
-    live_output_thread = threading.Thread(target=read_output, args=(process.stdout, live_output_callback, live_output))
-    live_output_thread.start()
+                with output_lock:
+                    output_tail.append(line)
+                    if log_file:
+                        log_file.write("{} [{}] {}".format(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), stream_name, line))
+                        log_file.flush()
+                if live_output_callback:
+                    live_output_callback(line.strip())
+
+    # Create a thread per stream for reading and displaying live output
+    output_threads = [threading.Thread(target=read_output, args=(process.stdout, "stdout")),
+                      threading.Thread(target=read_output, args=(process.stderr, "stderr"))]
+    for output_thread in output_threads:
+        output_thread.start()
 
     # Wait for the process to finish and get the return code
     try:
-        return_code = process.wait(timeout=timeout)
-    except subprocess.TimeoutExpired:
-        # Process has exceeded the timeout
-        process.terminate()
-        raise OSPToolDeploymentError("OSPTool Deployment timed out.")
-
-    # Wait for the live output thread to finish
-    live_output_thread.join()
-
-    # Combine the live output into a single string (execution log)
-    execution_log = ''.join(live_output)
+        try:
+            return_code = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # Process has exceeded the timeout
+            _kill_process_tree(process)
+            process.wait()
+            for output_thread in output_threads:
+                output_thread.join()
+            raise OSPToolDeploymentError("OSPTool Deployment timed out. Last output lines:\n{}".format(''.join(list(output_tail)[-20:])))
+
+        # Wait for the live output threads to finish
+        for output_thread in output_threads:
+            output_thread.join()
+    finally:
+        if log_file:
+            log_file.close()
+
+    # Combine the output tail into a single string (execution log)
+    execution_log = ''.join(output_tail)
 
     return return_code, execution_log
 
 
-def call_osptool(osp_tool_path: str, package_file_path: str, env_hostname: str, credentials: str, catalogmappings_path: str):
+# Runs OSPTool to deploy a package. Each line of its output is passed to live_output_callback (printed with a timestamp, by default).
+# If log_file_path is set, the whole output is also stored in that file.
+def call_osptool(osp_tool_path: str, package_file_path: str, env_hostname: str, credentials: str, catalogmappings_path: str, live_output_callback: callable = None,
+                 log_file_path: str = None):
 
     if catalogmappings_path:
         # Construct the command using a formatted string
@@ -53,10 +86,35 @@ def call_osptool(osp_tool_path: str, package_file_path: str, env_hostname: str,
         command = '"{}" "{}" "{}" {}'.format(osp_tool_path, package_file_path, env_hostname, credentials)
 
     # Define a callback function for live output
-    def live_output_callback(output_line):
-        print(output_line)
+    if live_output_callback is None:
+        def live_output_callback(output_line):
+            print("[{}] {}".format(datetime.now().strftime("%H:%M:%S"), output_line), flush=True)
 
     # Run the command and get the return code and execution log
-    return_code, execution_log = run_command(command, live_output_callback, timeout=get_configuration_value("SOLUTION_TIMEOUT_IN_SECS", SOLUTION_TIMEOUT_IN_SECS))
+    return_code, execution_log = run_command(command, live_output_callback, timeout=get_configuration_value("SOLUTION_TIMEOUT_IN_SECS", SOLUTION_TIMEOUT_IN_SECS),
+                                             log_file_path=log_file_path)
 
     return return_code, execution_log
+
+
+# Returns the lines of an OSPTool execution log (any iterable of lines, e.g. an open log file) that match each deployment error found,
+# i.e. {error: [lines]}
+def find_deployment_errors(execution_log):
+    deployment_errors = {error_validation: [] for error_validation in get_configuration_value("OSPTOOL_ERROR_VALIDATIONS", OSPTOOL_ERROR_VALIDATIONS)}
+    for line in execution_log:
+        for error_validation, existing_error_list in deployment_errors.items():
+            if error_validation in line:
+                existing_error_list.append(line.rstrip("\n"))
+    return {error_validation: existing_error_list for error_validation, existing_error_list in deployment_errors.items() if existing_error_list}
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+def _kill_process_tree(process: subprocess.Popen):
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # The process group is already gone
+            pass
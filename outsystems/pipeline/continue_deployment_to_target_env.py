@@ -2,7 +2,6 @@
 import sys
 import os
 import argparse
-from time import sleep
 
 # Workaround for Jenkins:
 # Set the path to include the outsystems module
@@ -18,13 +17,14 @@ from outsystems.vars.file_vars import ARTIFACT_FOLDER
 from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDPOINT, LIFETIME_API_VERSION
 from outsystems.vars.pipeline_vars import SLEEP_PERIOD_IN_SECS, \
     DEPLOYMENT_TIMEOUT_IN_SECS, DEPLOYMENT_RUNNING_STATUS, DEPLOYMENT_WAITING_STATUS, \
-    DEPLOYMENT_ERROR_STATUS_LIST, DEPLOY_ERROR_FILE
+    DEPLOYMENT_ERROR_STATUS_LIST, DEPLOY_ERROR_FILE, DEPLOYMENT_POLLING_OPERATION
 # Functions
 from outsystems.lifetime.lifetime_environments import get_environment_key
 from outsystems.lifetime.lifetime_deployments import get_deployment_status, check_deployment_two_step_deploy_status, \
     continue_deployment, get_running_deployment
 from outsystems.file_helpers.file import store_data
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
+from outsystems.lifetime.lifetime_polling import Poller, get_expected_duration, store_duration
 from outsystems.vars.vars_base import get_configuration_value, load_configuration_file
 # Exceptions
 
@@ -73,14 +73,17 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
         sys.exit(1)
 
     # Sleep thread until deployment has finished
-    wait_counter = 0
-    while wait_counter < get_configuration_value("DEPLOYMENT_TIMEOUT_IN_SECS", DEPLOYMENT_TIMEOUT_IN_SECS):
+    poller = Poller(get_configuration_value("DEPLOYMENT_TIMEOUT_IN_SECS", DEPLOYMENT_TIMEOUT_IN_SECS), get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS),
+                    get_expected_duration(artifact_dir, DEPLOYMENT_POLLING_OPERATION))
+    while poller.poll():
         # Check Deployment Plan status.
         dep_status = get_deployment_status(
             artifact_dir, lt_endpoint, lt_token, dep_plan_key)
+        poller.observe(dep_status["DeploymentStatus"])
         if dep_status["DeploymentStatus"] != DEPLOYMENT_RUNNING_STATUS:
             # Check deployment status is pending approval. Force it to continue (if 2-Step deployment is enabled)
             if dep_status["DeploymentStatus"] == DEPLOYMENT_WAITING_STATUS:
+                # Resume on every status check while waiting, in case a previous resume did not take effect
                 continue_deployment(lt_endpoint, lt_token, dep_plan_key)
                 print("Deployment plan {} resumed execution.".format(dep_plan_key), flush=True)
             elif dep_status["DeploymentStatus"] in DEPLOYMENT_ERROR_STATUS_LIST:
@@ -90,13 +93,11 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
             else:
                 # If it reaches here, it means the deployment was successful
                 print("Deployment plan finished with status {}.".format(dep_status["DeploymentStatus"]), flush=True)
+                # Stores the deployment duration, to adjust the polling of the next deployments
+                store_duration(artifact_dir, DEPLOYMENT_POLLING_OPERATION, poller.elapsed())
                 # Exit the script to continue with the pipeline
                 sys.exit(0)
-        # Deployment status is still running. Go back to sleep.
-        sleep_value = get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS)
-        sleep(sleep_value)
-        wait_counter += sleep_value
-        print("{} secs have passed since the deployment started...".format(wait_counter), flush=True)
+        print("{} secs have passed since the deployment started...".format(int(poller.elapsed())), flush=True)
 
     # Deployment timeout reached. Exit script with error
     print("Timeout occurred while deployment plan is still in {} status.".format(DEPLOYMENT_RUNNING_STATUS), flush=True)
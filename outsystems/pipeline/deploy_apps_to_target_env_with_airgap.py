@@ -2,6 +2,9 @@
 import sys
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import sleep, monotonic
+import requests
 
 # Workaround for Jenkins:
 # Set the path to include the outsystems module
@@ -13,23 +16,28 @@ else:  # Else just add the project dir
 
 # Custom Modules
 # Variables
-from outsystems.vars.file_vars import ARTIFACT_FOLDER, APPLICATION_OAP_FOLDER, APPLICATION_OAP_FILE
+from outsystems.vars.file_vars import ARTIFACT_FOLDER, APPLICATION_OAP_FOLDER, APPLICATION_OAP_FILE, APPLICATION_OAP_DEPLOY_LOG_FILE
 from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDPOINT, LIFETIME_API_VERSION, DEPLOYMENT_MESSAGE
 from outsystems.vars.cicd_vars import PROBE_HTTP_PROTO, PROBE_API_ENDPOINT, PROBE_API_VERSION
+from outsystems.vars.pipeline_vars import OAP_EXPORT_MAX_CONCURRENCY, OAP_EXPORT_MAX_RETRIES, OSPTOOL_MAX_PARALLEL_DEPLOYMENTS
 # Functions
 from outsystems.lifetime.lifetime_environments import get_environment_key
 from outsystems.lifetime.lifetime_applications import export_app_oap
-from outsystems.file_helpers.file import load_data
+from outsystems.file_helpers.file import load_data, bytes_human_readable_size
+from outsystems.file_helpers.oap_store import OAPStore
+from outsystems.http_helpers.http_retry import get_backoff_delay, get_retry_budget
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
 from outsystems.cicd_probe.cicd_base import build_probe_endpoint
-from outsystems.osp_tool.osp_base import call_osptool
-from outsystems.cicd_probe.cicd_dependencies import get_app_dependencies, sort_app_dependencies
+from outsystems.osp_tool.osp_base import call_osptool, find_deployment_errors
+from outsystems.cicd_probe.cicd_dependencies import get_apps_dependencies, sort_app_dependencies, sort_app_dependencies_in_levels
 from outsystems.pipeline.deploy_latest_tags_to_target_env import generate_deployment_based_on_manifest as generate_deployment_based_on_deploy_manifest, \
     generate_regular_deployment
 from outsystems.pipeline.deploy_tags_to_target_env_with_manifest import generate_deployment_based_on_manifest as generate_deployment_based_on_trigger_manifest
-from outsystems.vars.vars_base import load_configuration_file
+from outsystems.vars.vars_base import get_configuration_value, load_configuration_file
 # Exceptions
 from outsystems.exceptions.invalid_parameters import InvalidParametersError
+from outsystems.exceptions.server_error import ServerError
+from outsystems.exceptions.osptool_error import OSPToolDeploymentError
 
 
 # ############################################################# SCRIPT ##############################################################
@@ -45,19 +53,61 @@ def generate_oap_list(app_data_list: list, friendly_package_names: bool):
     return app_oap_list
 
 
-def export_apps_oap(artifact_dir: str, lt_endpoint: str, lt_token: str, env_key: str, app_oap_list: list):
+# Exports the OAP of every application, at most OAP_EXPORT_MAX_CONCURRENCY at the same time.
+# Each export is retried (up to OAP_EXPORT_MAX_RETRIES times) if it fails with a transient error, since its download link may expire.
+# The list and the file names are not changed, so the export order does not matter for the following steps.
+# If an OAP store is given, the OAPs already in it are copied from there instead, and the exported ones are added to it.
+def export_apps_oap(artifact_dir: str, lt_endpoint: str, lt_token: str, env_key: str, app_oap_list: list, oap_store: OAPStore = None):
     print("Application Scope:", flush=True)
-    for app in app_oap_list:
-        file_path = os.path.join(artifact_dir, APPLICATION_OAP_FOLDER, app["filename"])
-        export_app_oap(file_path, lt_endpoint, lt_token, env_key, app_key=app["app_key"], app_version_key=app["version_key"])
-        print("     {} application with version {}, exported as {}".format(app["app_name"], app["app_version"], app["filename"]), flush=True)
+    max_concurrency = get_configuration_value("OAP_EXPORT_MAX_CONCURRENCY", OAP_EXPORT_MAX_CONCURRENCY)
+    exports = [None] * len(app_oap_list)  # will contain the (size, duration, attempts) of each export, or the error it failed with
+    with ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as executor:
+        pending_exports = {executor.submit(_export_app_oap, artifact_dir, lt_endpoint, lt_token, env_key, app, oap_store): idx for idx, app in enumerate(app_oap_list)}
+        for finished_count, pending_export in enumerate(as_completed(pending_exports), start=1):
+            idx = pending_exports[pending_export]
+            app = app_oap_list[idx]
+            try:
+                exports[idx] = pending_export.result()
+                print("     [{}/{}] {} application with version {}, {} as {}".format(
+                    finished_count, len(app_oap_list), app["app_name"], app["app_version"], "exported" if exports[idx][2] else "copied from the OAP store",
+                    app["filename"]), flush=True)
+            except Exception as e:
+                exports[idx] = e
+                print("     [{}/{}] {} application with version {}, failed to export: {}".format(
+                    finished_count, len(app_oap_list), app["app_name"], app["app_version"], e), flush=True)
+
+    print_export_table(app_oap_list, exports)
+    # Fail with the first error (in the list order), after every export finished
+    for export in exports:
+        if isinstance(export, Exception):
+            raise export
+
+
+# Prints the outcome of each export, in the list order
+def print_export_table(app_oap_list: list, exports: list):
+    rows = [("Application", "Version", "File", "Size", "Time", "Attempts")]
+    for app, export in zip(app_oap_list, exports):
+        if isinstance(export, Exception):
+            rows.append((app["app_name"], app["app_version"], app["filename"], "FAILED", "-", "-"))
+        else:
+            size, duration, attempts = export
+            rows.append((app["app_name"], app["app_version"], app["filename"], bytes_human_readable_size(size), "{:.1f}s".format(duration),
+                         str(attempts) if attempts else "OAP store"))
+    widths = [max(len(row[col]) for row in rows) for col in range(len(rows[0]))]
+    print("\nExport Summary:", flush=True)
+    for row in rows:
+        print("     " + " | ".join(value.ljust(width) for value, width in zip(row, widths)), flush=True)
+
+
+# Gets the producers of each application to deploy, i.e. {app_key: set of producer app keys}
+def get_oap_dependencies(artifact_dir: str, probe_endpoint: str, api_key: str, app_oap_list: list):
+    app_versions = [{"VersionKey": app["version_key"], "Name": app["app_name"], "Version": app["app_version"]} for app in app_oap_list]
+    dependencies = get_apps_dependencies(artifact_dir, probe_endpoint, api_key, app_versions)
+    return {app["app_key"]: app_dependencies for app, app_dependencies in zip(app_oap_list, dependencies)}
 
 
 def generate_deployment_order(artifact_dir: str, probe_endpoint: str, api_key: str, app_oap_list: list):
-    dependencies_list = {}
-    for app in app_oap_list:
-        dependencies_list[app["app_key"]] = get_app_dependencies(artifact_dir, probe_endpoint, api_key,
-                                                                 app["version_key"], app["app_name"], app["app_version"])
+    dependencies_list = get_oap_dependencies(artifact_dir, probe_endpoint, api_key, app_oap_list)
     dependencies_order_list = sort_app_dependencies(dependencies_list)
     final_list = []
     for app_dep in dependencies_order_list:
@@ -67,13 +117,99 @@ def generate_deployment_order(artifact_dir: str, probe_endpoint: str, api_key: s
     return final_list
 
 
+# Splits the applications in deployment waves: the topological levels of the dependency graph, where each application
+# only depends on applications of previous waves. Within a wave, applications keep the order of app_oap_list.
+def generate_deployment_waves(artifact_dir: str, probe_endpoint: str, api_key: str, app_oap_list: list):
+    dependencies_list = get_oap_dependencies(artifact_dir, probe_endpoint, api_key, app_oap_list)
+    # Producers that are not being deployed don't hold back their consumers, so they are left out of the graph
+    app_keys = set(dependencies_list)
+    dependencies_list = {app_key: dependencies & app_keys for app_key, dependencies in dependencies_list.items()}
+    waves = []
+    for dependencies_level in sort_app_dependencies_in_levels(dependencies_list):
+        waves.append([app_oap for app_oap in app_oap_list if app_oap["app_key"] in dependencies_level])
+    return waves
+
+
 def deploy_apps_oap(artifact_dir: str, dest_env: str, osp_tool_path: str, credentials: str, app_oap_list: list):
     for app in app_oap_list:
         oap_file_path = os.path.join(artifact_dir, APPLICATION_OAP_FOLDER, app["filename"])
-        call_osptool(osp_tool_path, oap_file_path, dest_env, credentials)
+        call_osptool(osp_tool_path, oap_file_path, dest_env, credentials, None)
+
+
+# Deploys the applications wave by wave, running OSPTool for all applications of a wave at the same time (at most max_parallel_deployments).
+# If any deployment of a wave fails, the following waves are not deployed.
+def deploy_apps_oap_in_waves(artifact_dir: str, dest_env: str, osp_tool_path: str, credentials: str, oap_waves: list, max_parallel_deployments: int):
+    for wave_number, oap_wave in enumerate(oap_waves, start=1):
+        print("\nDeploying wave {} of {} ({} applications)...".format(wave_number, len(oap_waves), len(oap_wave)), flush=True)
+        with ThreadPoolExecutor(max_workers=max(min(max_parallel_deployments, len(oap_wave)), 1)) as executor:
+            deployments = [executor.submit(deploy_app_oap, artifact_dir, dest_env, osp_tool_path, credentials, app) for app in oap_wave]
+
+        failed_apps = []
+        for app, deployment in zip(oap_wave, deployments):
+            try:
+                deployment_errors = deployment.result()
+            except OSPToolDeploymentError as e:
+                deployment_errors = {str(e): []}
+            if deployment_errors:
+                failed_apps.append(app["app_name"])
+                for error_validation, existing_error_list in deployment_errors.items():
+                    print('\n{}: Found "{}" validation:'.format(app["app_name"], error_validation), flush=True)
+                    for error in existing_error_list:
+                        print(" - {}".format(error), flush=True)
 
+        if failed_apps:
+            raise OSPToolDeploymentError(
+                "OSP Tool Deployment of wave {} finished with errors ({}), so the following waves were not deployed. Please check the logs for further details.".format(
+                    wave_number, ", ".join(failed_apps)))
+        print("Wave {} of {} deployed successfully.".format(wave_number, len(oap_waves)), flush=True)
 
-def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, source_env: str, dest_env: str, apps: list, dep_manifest: list, trigger_manifest: dict, include_test_apps: bool, dep_note: str, osp_tool_path: str, credentials: str, cicd_http_proto: str, cicd_url: str, cicd_api_endpoint: str, cicd_version: str, cicd_key: str, friendly_package_names: bool):
+
+# Deploys a single application with OSPTool, storing its execution log next to the OAP.
+# Returns the deployment errors found in the execution log (see find_deployment_errors).
+def deploy_app_oap(artifact_dir: str, dest_env: str, osp_tool_path: str, credentials: str, app: dict):
+    oap_file_path = os.path.join(artifact_dir, APPLICATION_OAP_FOLDER, app["filename"])
+
+    # Output lines of concurrent deployments are interleaved, so each one is prefixed with the application name
+    def live_output_callback(output_line):
+        print("[{}] {}".format(app["app_name"], output_line), flush=True)
+
+    # The execution log is streamed to a file next to the OAP
+    log_file_path = "{}{}".format(oap_file_path, APPLICATION_OAP_DEPLOY_LOG_FILE)
+    call_osptool(osp_tool_path, oap_file_path, dest_env, credentials, None, live_output_callback, log_file_path)
+
+    with open(log_file_path, "r") as log_file:
+        return find_deployment_errors(log_file)
+
+
+# Exports the OAP of one application, retrying transient failures. Returns the file size, the total duration and the number of attempts
+# (0 if the OAP was copied from the OAP store).
+def _export_app_oap(artifact_dir: str, lt_endpoint: str, lt_token: str, env_key: str, app: dict, oap_store: OAPStore):
+    max_retries = get_configuration_value("OAP_EXPORT_MAX_RETRIES", OAP_EXPORT_MAX_RETRIES)
+    file_path = os.path.join(artifact_dir, APPLICATION_OAP_FOLDER, app["filename"])
+    started_on = monotonic()
+    # The file is stored without spaces in its name (see download_package)
+    if oap_store and oap_store.restore(app["version_key"], file_path.replace(" ", "_")):
+        return os.path.getsize(file_path.replace(" ", "_")), monotonic() - started_on, 0
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            export_app_oap(file_path, lt_endpoint, lt_token, env_key, app_key=app["app_key"], app_version_key=app["version_key"])
+            break
+        except (ServerError, requests.exceptions.RequestException) as e:
+            wait_in_secs = get_backoff_delay(attempt - 1)
+            if attempt > max_retries or not get_retry_budget().consume(wait_in_secs):
+                raise
+            print("     Export of {} failed ({}). Retrying in {:.1f} seconds (retry {} of {})...".format(
+                app["filename"], e, wait_in_secs, attempt, max_retries), flush=True)
+            sleep(wait_in_secs)
+    if oap_store:
+        oap_store.store(app["version_key"], file_path.replace(" ", "_"))
+    return os.path.getsize(file_path.replace(" ", "_")), monotonic() - started_on, attempt
+
+
+def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, source_env: str, dest_env: str, apps: list, dep_manifest: list, trigger_manifest: dict, include_test_apps: bool, dep_note: str, osp_tool_path: str, credentials: str, cicd_http_proto: str, cicd_url: str, cicd_api_endpoint: str, cicd_version: str, cicd_key: str, friendly_package_names: bool, deploy_in_waves: bool = False, max_parallel_deployments: int = None, oap_store_dir: str = None):
 
     app_data_list = []  # will contain the applications to deploy details from LT
 
@@ -100,7 +236,21 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
 
     # Export binary files
     app_oap_list = generate_oap_list(app_data_list, friendly_package_names)
-    export_apps_oap(artifact_dir, lt_endpoint, lt_token, src_env_key, app_oap_list)
+    export_apps_oap(artifact_dir, lt_endpoint, lt_token, src_env_key, app_oap_list, OAPStore(oap_store_dir) if oap_store_dir else None)
+
+    if deploy_in_waves:
+        # Generate deployment waves
+        oap_waves = generate_deployment_waves(artifact_dir, probe_endpoint, cicd_key, app_oap_list)
+
+        print("\nDeployment Waves:\n", flush=True)
+        for wave_number, oap_wave in enumerate(oap_waves, start=1):
+            print("      " + str(wave_number) + ". " + ", ".join("{} ({})".format(oap["app_name"], oap["version_key"]) for oap in oap_wave) + "\n", flush=True)
+
+        # Deploy binary files to target environment
+        if max_parallel_deployments is None:
+            max_parallel_deployments = get_configuration_value("OSPTOOL_MAX_PARALLEL_DEPLOYMENTS", OSPTOOL_MAX_PARALLEL_DEPLOYMENTS)
+        deploy_apps_oap_in_waves(artifact_dir, dest_env, osp_tool_path, credentials, oap_waves, max_parallel_deployments)
+        return
 
     # Generate deployment order
     sorted_oap_list = generate_deployment_order(artifact_dir, probe_endpoint, cicd_key, app_oap_list)
@@ -156,6 +306,12 @@ if __name__ == "__main__":
                         help="(Optional) Key for CI/CD Probe API calls (when enabled).")
     parser.add_argument("-n", "--friendly_package_names", action='store_true',
                         help="Flag that indicates if downloaded application packages should have a user-friendly name. Example: \"AppName_v1_2_1\"")
+    parser.add_argument("-w", "--deploy_in_waves", action='store_true',
+                        help="(Optional) Flag that indicates if applications without dependencies between them should be deployed at the same time, in waves that follow the dependency order.")
+    parser.add_argument("-mp", "--max_parallel_deployments", type=int,
+                        help="(Optional) Maximum number of OSP Tool deployments running at the same time, when deploying in waves. Default: 4")
+    parser.add_argument("-os", "--oap_store", type=str,
+                        help="(Optional) Folder where exported application packages are kept between runs. Packages already there are copied from it instead of exported again.")
     parser.add_argument("-cf", "--config_file", type=str,
                         help="Config file path. Contains configuration values to override the default ones.")
 
@@ -234,6 +390,12 @@ if __name__ == "__main__":
     cicd_key = args.cicd_probe_key
     # Parse Friendly Package Names flag
     friendly_package_names = args.friendly_package_names
+    # Parse Deploy In Waves flag
+    deploy_in_waves = args.deploy_in_waves
+    # Parse Max Parallel Deployments
+    max_parallel_deployments = args.max_parallel_deployments
+    # Parse OAP Store folder
+    oap_store_dir = args.oap_store
 
     # Calls the main script
-    main(artifact_dir, lt_http_proto, lt_url, lt_api_endpoint, lt_version, lt_token, source_env, dest_env, apps, dep_manifest, trigger_manifest, include_test_apps, dep_note, osp_tool_path, credentials, cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version, cicd_key, friendly_package_names)
+    main(artifact_dir, lt_http_proto, lt_url, lt_api_endpoint, lt_version, lt_token, source_env, dest_env, apps, dep_manifest, trigger_manifest, include_test_apps, dep_note, osp_tool_path, credentials, cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version, cicd_key, friendly_package_names, deploy_in_waves, max_parallel_deployments, oap_store_dir)
@@ -3,7 +3,6 @@ import sys
 import os
 import argparse
 from packaging.version import Version
-from time import sleep
 
 # Workaround for Jenkins:
 # Set the path to include the outsystems module
@@ -19,14 +18,16 @@ from outsystems.vars.file_vars import ARTIFACT_FOLDER, DEPLOYMENT_FOLDER, DEPLOY
 from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDPOINT, LIFETIME_API_VERSION, DEPLOYMENT_MESSAGE
 from outsystems.vars.pipeline_vars import QUEUE_TIMEOUT_IN_SECS, SLEEP_PERIOD_IN_SECS, CONFLICTS_FILE, \
     REDEPLOY_OUTDATED_APPS, DEPLOYMENT_TIMEOUT_IN_SECS, DEPLOYMENT_RUNNING_STATUS, DEPLOYMENT_WAITING_STATUS, \
-    DEPLOYMENT_ERROR_STATUS_LIST, DEPLOY_ERROR_FILE
+    DEPLOYMENT_ERROR_STATUS_LIST, DEPLOY_ERROR_FILE, DEPLOYMENT_POLLING_OPERATION
 # Functions
-from outsystems.lifetime.lifetime_environments import get_environment_app_version, get_environment_key
-from outsystems.lifetime.lifetime_applications import get_running_app_version, get_application_version
+from outsystems.lifetime.lifetime_environments import get_environment_key
+from outsystems.lifetime.lifetime_async import run_lifetime_calls, get_running_app_version_async, get_application_version_async
+from outsystems.lifetime.lifetime_snapshot import get_infrastructure_snapshot
 from outsystems.lifetime.lifetime_deployments import get_deployment_status, get_deployment_info, \
     send_deployment, delete_deployment, start_deployment, continue_deployment, get_running_deployment
 from outsystems.file_helpers.file import store_data, load_data
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
+from outsystems.lifetime.lifetime_polling import Poller, get_expected_duration, store_duration
 from outsystems.vars.vars_base import get_configuration_value, load_configuration_file
 # Exceptions
 from outsystems.exceptions.app_does_not_exist import AppDoesNotExistError
@@ -47,19 +48,21 @@ def generate_deploy_app_key(lt_api_version: int, app_version_key: str, deploy_zo
 def generate_deployment_based_on_manifest(artifact_dir: str, lt_endpoint: str, lt_token: str, src_env_key: str, src_env_name: str, app_list: list, manifest: list):
     app_data_list = []  # will contain the applications details from the manifest
 
-    for deployed_app in manifest:
-        if deployed_app["ApplicationName"] in app_list:
-            try:
-                get_application_version(artifact_dir, lt_endpoint, lt_token, False, deployed_app["VersionKey"], app_name=deployed_app["ApplicationName"])
-            except AppDoesNotExistError:
-                print("Application {} with version {} no longer exists in {}. The manifest no longer reflects the current state of the environment. Aborting!".format(deployed_app["ApplicationName"], deployed_app["Version"], src_env_name), flush=True)
-                sys.exit(1)
-            except Exception as error:
-                print("Error trying to validate if the application {} exists in the {} environment.\nError: {}".format(deployed_app["ApplicationName"], src_env_name, error), flush=True)
-                sys.exit(1)
+    manifest_apps = [deployed_app for deployed_app in manifest if deployed_app["ApplicationName"] in app_list]
+    # Validates that every application version in the manifest still exists, querying LifeTime concurrently
+    validations = run_lifetime_calls([get_application_version_async(artifact_dir, lt_endpoint, lt_token, False, deployed_app["VersionKey"], app_name=deployed_app["ApplicationName"])
+                                      for deployed_app in manifest_apps], return_exceptions=True)
 
-            # Add it to the app data list
-            app_data_list.append({'Name': deployed_app["ApplicationName"], 'Key': deployed_app["ApplicationKey"], 'Version': deployed_app["Version"], 'VersionKey': deployed_app["VersionKey"]})
+    for deployed_app, validation in zip(manifest_apps, validations):
+        if isinstance(validation, AppDoesNotExistError):
+            print("Application {} with version {} no longer exists in {}. The manifest no longer reflects the current state of the environment. Aborting!".format(deployed_app["ApplicationName"], deployed_app["Version"], src_env_name), flush=True)
+            sys.exit(1)
+        elif isinstance(validation, Exception):
+            print("Error trying to validate if the application {} exists in the {} environment.\nError: {}".format(deployed_app["ApplicationName"], src_env_name, validation), flush=True)
+            sys.exit(1)
+
+        # Add it to the app data list
+        app_data_list.append({'Name': deployed_app["ApplicationName"], 'Key': deployed_app["ApplicationKey"], 'Version': deployed_app["Version"], 'VersionKey': deployed_app["VersionKey"]})
 
     return app_data_list
 
@@ -69,14 +72,14 @@ def generate_regular_deployment(artifact_dir: str, lt_endpoint: str, lt_token: s
     app_data_list = []  # will contain the applications to deploy details from LT
     deployment_manifest = []  # will store the deployment plan, that may be used in later stages of the pipeline
 
-    # Creates a list with the details for the apps you want to deploy
-    for app_name in app_list:
-        # Removes whitespaces in the beginning and end of the string
-        app_name = app_name.strip()
+    # Removes whitespaces in the beginning and end of the app names
+    app_list = [app_name.strip() for app_name in app_list]
 
-        # Get the app running version on the source environment. It will only retrieve tagged applications
-        deployed = get_running_app_version(artifact_dir, lt_endpoint, lt_token, src_env_key, app_name=app_name)
+    # Get the apps running version on the source environment, querying LifeTime concurrently. It will only retrieve tagged applications
+    running_versions = run_lifetime_calls([get_running_app_version_async(artifact_dir, lt_endpoint, lt_token, src_env_key, app_name=app_name) for app_name in app_list])
 
+    # Creates a list with the details for the apps you want to deploy
+    for app_name, deployed in zip(app_list, running_versions):
         # Add it to the app data list
         app_data_list.append({'Name': app_name, 'Key': deployed["ApplicationKey"], 'Version': deployed["Version"], 'VersionKey': deployed["VersionKey"]})
 
@@ -93,32 +96,31 @@ def generate_regular_deployment(artifact_dir: str, lt_endpoint: str, lt_token: s
 # Function to check if target environment already has the application versions to be deployed
 def check_if_can_deploy(artifact_dir: str, lt_endpoint: str, lt_api_version: str, lt_token: str, env_key: str, env_name: str, app_data_list: list):
     app_keys = []  # will contain the application keys to create the deployment plan
+
+    # Takes a snapshot of the status of the apps in the target env (and of the versions running there), to check if they were deployed
+    snapshot = get_infrastructure_snapshot(artifact_dir, lt_endpoint, lt_token, env_key, app_data_list)
+
     for app in app_data_list:
-        # get the status of the app in the target env, to check if they were deployed
-        try:
-            app_status = get_environment_app_version(artifact_dir, lt_endpoint, lt_token, True, env_name=env_name, app_key=app["Key"])
-            # Check if the app version is already deployed in the target environment
-            for app_in_env in app_status["AppStatusInEnvs"]:
-                if app_in_env["EnvironmentKey"] == env_key:
-                    # Check if the target environment has the version deployed
-                    if app_in_env["BaseApplicationVersionKey"] != app["VersionKey"]:
-                        # The version is not the one deployed -> need to compare the version tag
-                        app_in_env_data = get_application_version(artifact_dir, lt_endpoint, lt_token, False, app_in_env["BaseApplicationVersionKey"], app_key=app["Key"])
-                        # If the version in the environment is bigger than the one in the manifest -> stale pipeline -> abort
-                        if Version(app_in_env_data["Version"]) > Version(app["Version"]):
-                            print("The deployment manifest is stale. The Application {} needs to be deployed with version {} but then environment {} has the version {}.\nReason: VersionTag is inferior to the VersionTag already deployed.\nAborting the pipeline.".format(app["Name"], app["Version"], env_name, app_in_env_data["Version"]), flush=True)
-                            sys.exit(1)
-                        elif Version(app_in_env_data["Version"]) == Version(app["Version"]):
-                            print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionTag is equal.".format(app["Name"], app["Version"], env_name), flush=True)
-                        else:
-                            # Generated app_keys for deployment plan based on the running version
-                            app_keys.append(generate_deploy_app_key(lt_api_version, app["VersionKey"]))
-                            print("Adding application {} with version {}, to be deployed in {} environment.".format(app["Name"], app["Version"], env_name), flush=True)
-                    else:
-                        print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionKey is equal.".format(app["Name"], app["Version"], env_name), flush=True)
-        except AppDoesNotExistError:
+        app_in_env = snapshot.get_app_status_in_env(app["Key"], env_key)
+        if app_in_env is None:
             app_keys.append(generate_deploy_app_key(lt_api_version, app["VersionKey"]))
-            print("App {} with version {} does not exist in {} environment. Ignoring check and deploy it.".format(app["Name"], app["Version"], dest_env), flush=True)
+            print("App {} with version {} does not exist in {} environment. Ignoring check and deploy it.".format(app["Name"], app["Version"], env_name), flush=True)
+        # Check if the target environment has the version deployed
+        elif app_in_env["BaseApplicationVersionKey"] != app["VersionKey"]:
+            # The version is not the one deployed -> need to compare the version tag
+            app_in_env_version = snapshot.get_version_number(app["Key"], app_in_env["BaseApplicationVersionKey"])
+            # If the version in the environment is bigger than the one in the manifest -> stale pipeline -> abort
+            if Version(app_in_env_version) > Version(app["Version"]):
+                print("The deployment manifest is stale. The Application {} needs to be deployed with version {} but then environment {} has the version {}.\nReason: VersionTag is inferior to the VersionTag already deployed.\nAborting the pipeline.".format(app["Name"], app["Version"], env_name, app_in_env_version), flush=True)
+                sys.exit(1)
+            elif Version(app_in_env_version) == Version(app["Version"]):
+                print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionTag is equal.".format(app["Name"], app["Version"], env_name), flush=True)
+            else:
+                # Generated app_keys for deployment plan based on the running version
+                app_keys.append(generate_deploy_app_key(lt_api_version, app["VersionKey"]))
+                print("Adding application {} with version {}, to be deployed in {} environment.".format(app["Name"], app["Version"], env_name), flush=True)
+        else:
+            print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionKey is equal.".format(app["Name"], app["Version"], env_name), flush=True)
     return app_keys
 
 
@@ -168,16 +170,13 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
     print("Creating deployment plan from {} to {} including applications: {} ({}).".format(source_env, dest_env, to_deploy_app_names, to_deploy_app_info), flush=True)
 
     if not allow_parallel_deployments:
-        wait_counter = 0
+        poller = Poller(get_configuration_value("QUEUE_TIMEOUT_IN_SECS", QUEUE_TIMEOUT_IN_SECS), get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS))
         deployments = get_running_deployment(artifact_dir, lt_endpoint, lt_token, dest_env_key)
         while len(deployments) > 0:
-            if wait_counter >= get_configuration_value("QUEUE_TIMEOUT_IN_SECS", QUEUE_TIMEOUT_IN_SECS):
+            if not poller.wait():
                 print("Timeout occurred while waiting for LifeTime to be free, to create the new deployment plan.", flush=True)
                 sys.exit(1)
-            sleep_value = get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS)
-            sleep(sleep_value)
-            wait_counter += sleep_value
-            print("Waiting for LifeTime to be free. Elapsed time: {} seconds...".format(wait_counter), flush=True)
+            print("Waiting for LifeTime to be free. Elapsed time: {} seconds...".format(int(poller.elapsed())), flush=True)
             deployments = get_running_deployment(artifact_dir, lt_endpoint, lt_token, dest_env_key)
 
     # LT is free to deploy
@@ -205,14 +204,17 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
     print("Deployment plan {} started being executed.".format(dep_plan_key), flush=True)
 
     # Sleep thread until deployment has finished
-    wait_counter = 0
-    while wait_counter < get_configuration_value("DEPLOYMENT_TIMEOUT_IN_SECS", DEPLOYMENT_TIMEOUT_IN_SECS):
+    poller = Poller(get_configuration_value("DEPLOYMENT_TIMEOUT_IN_SECS", DEPLOYMENT_TIMEOUT_IN_SECS), get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS),
+                    get_expected_duration(artifact_dir, DEPLOYMENT_POLLING_OPERATION))
+    while poller.poll():
         # Check Deployment Plan status.
         dep_status = get_deployment_status(
             artifact_dir, lt_endpoint, lt_token, dep_plan_key)
+        poller.observe(dep_status["DeploymentStatus"])
         if dep_status["DeploymentStatus"] != DEPLOYMENT_RUNNING_STATUS:
             # Check deployment status is pending approval. Force it to continue (if 2-Step deployment is enabled)
             if dep_status["DeploymentStatus"] == DEPLOYMENT_WAITING_STATUS:
+                # Resume on every status check while waiting, in case a previous resume did not take effect
                 continue_deployment(lt_endpoint, lt_token, dep_plan_key)
                 print("Deployment plan {} resumed execution.".format(dep_plan_key), flush=True)
             elif dep_status["DeploymentStatus"] in DEPLOYMENT_ERROR_STATUS_LIST:
@@ -222,13 +224,11 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
             else:
                 # If it reaches here, it means the deployment was successful
                 print("Deployment plan finished with status {}.".format(dep_status["DeploymentStatus"]), flush=True)
+                # Stores the deployment duration, to adjust the polling of the next deployments
+                store_duration(artifact_dir, DEPLOYMENT_POLLING_OPERATION, poller.elapsed())
                 # Exit the script to continue with the pipeline
                 sys.exit(0)
-        # Deployment status is still running. Go back to sleep.
-        sleep_value = get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS)
-        sleep(sleep_value)
-        wait_counter += sleep_value
-        print("{} secs have passed since the deployment started...".format(wait_counter), flush=True)
+        print("{} secs have passed since the deployment started...".format(int(poller.elapsed())), flush=True)
 
     # Deployment timeout reached. Exit script with error
     print("Timeout occurred while deployment plan is still in {} status.".format(DEPLOYMENT_RUNNING_STATUS), flush=True)
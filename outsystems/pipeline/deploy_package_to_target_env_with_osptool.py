@@ -13,9 +13,9 @@ else:  # Else just add the project dir
 
 # Custom Modules
 # Variables
-from outsystems.vars.file_vars import ARTIFACT_FOLDER, SOLUTIONS_FOLDER, SOLUTIONS_DEPLOY_FILE
+from outsystems.vars.file_vars import ARTIFACT_FOLDER, SOLUTIONS_FOLDER, SOLUTIONS_DEPLOY_FILE, SOLUTIONS_DEPLOY_LOG_FILE
 # Functions
-from outsystems.osp_tool.osp_base import call_osptool
+from outsystems.osp_tool.osp_base import call_osptool, find_deployment_errors
 from outsystems.vars.vars_base import load_configuration_file
 from outsystems.file_helpers.file import store_data
 # Exceptions
@@ -30,30 +30,25 @@ def main(artifact_dir: str, dest_env: str, package_path: str, catalogmappings_pa
 
     print("Starting deployment of '{}' into '{}' environment...".format(solution_file, dest_env), flush=True)
 
-    # Call OSP Tool
-    return_code, execution_log = call_osptool(osp_tool_path, package_path, dest_env, credentials, catalogmappings_path)
+    # Call OSP Tool, streaming its whole execution log to a file
+    log_file_path = os.path.join(artifact_dir, SOLUTIONS_FOLDER, "{}{}".format(solution_file, SOLUTIONS_DEPLOY_LOG_FILE))
+    os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
+    return_code, execution_log = call_osptool(osp_tool_path, package_path, dest_env, credentials, catalogmappings_path, log_file_path=log_file_path)
 
-    # Split the output into lines
-    execution_log = execution_log.splitlines()
-
-    # Stores the execution log
+    # Stores the last lines of the execution log
     filename = "{}{}".format(solution_file, SOLUTIONS_DEPLOY_FILE)
     filename = os.path.join(SOLUTIONS_FOLDER, filename)
-    store_data(artifact_dir, filename, execution_log)
-
-    error_validation_list = ['Incompatible Dependency', 'Execution Plan Abort', 'Outdated Consumer', 'Missing Configuration']
+    store_data(artifact_dir, filename, execution_log.splitlines())
 
     # Validate the presence of each error validation
-    deploy_error_flag = False
-    for error_validation in error_validation_list:
-        existing_error_list = [s for s in execution_log if error_validation in s]
-        if existing_error_list:
-            deploy_error_flag = True
-            print(f'\nFound "{error_validation}" validation:')
-            for error in existing_error_list:
-                print(f' - {error}')
-
-    if deploy_error_flag:
+    with open(log_file_path, "r") as log_file:
+        deployment_errors = find_deployment_errors(log_file)
+    for error_validation, existing_error_list in deployment_errors.items():
+        print(f'\nFound "{error_validation}" validation:')
+        for error in existing_error_list:
+            print(f' - {error}')
+
+    if deployment_errors:
         # Exit script with error
         raise OSPToolDeploymentError(
             "OSP Tool Deployment finished with errors. Please check the logs for further details.")
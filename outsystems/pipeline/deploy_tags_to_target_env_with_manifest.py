@@ -3,7 +3,6 @@ import sys
 import os
 import argparse
 from packaging.version import Version
-from time import sleep
 import json
 
 # Workaround for Jenkins:
@@ -21,15 +20,17 @@ from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDP
 from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFEST_FLAG_IS_TEST_APPLICATION
 from outsystems.vars.pipeline_vars import QUEUE_TIMEOUT_IN_SECS, SLEEP_PERIOD_IN_SECS, CONFLICTS_FILE, \
     REDEPLOY_OUTDATED_APPS, DEPLOYMENT_TIMEOUT_IN_SECS, DEPLOYMENT_RUNNING_STATUS, DEPLOYMENT_WAITING_STATUS, \
-    DEPLOYMENT_ERROR_STATUS_LIST, DEPLOY_ERROR_FILE, ALLOW_CONTINUE_WITH_ERRORS
+    DEPLOYMENT_ERROR_STATUS_LIST, DEPLOY_ERROR_FILE, ALLOW_CONTINUE_WITH_ERRORS, DEPLOYMENT_POLLING_OPERATION
 # Functions
-from outsystems.lifetime.lifetime_environments import get_environment_app_version, get_environment_deployment_zones
-from outsystems.lifetime.lifetime_applications import get_application_version
+from outsystems.lifetime.lifetime_environments import get_environment_deployment_zones
+from outsystems.lifetime.lifetime_async import run_lifetime_calls, get_application_version_async
+from outsystems.lifetime.lifetime_snapshot import get_infrastructure_snapshot
 from outsystems.lifetime.lifetime_deployments import get_deployment_status, get_deployment_info, \
     send_deployment, delete_deployment, start_deployment, continue_deployment, get_running_deployment, \
     check_deployment_two_step_deploy_status
 from outsystems.file_helpers.file import store_data, load_data
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
+from outsystems.lifetime.lifetime_polling import Poller, get_expected_duration, store_duration
 from outsystems.manifest.manifest_base import get_environment_details, get_deployment_notes
 from outsystems.vars.vars_base import get_configuration_value, load_configuration_file
 # Exceptions
@@ -52,16 +53,17 @@ def generate_deploy_app_key(lt_api_version: int, app_version_key: str, deploy_zo
 def generate_deployment_based_on_manifest(artifact_dir: str, lt_endpoint: str, lt_token: str, src_env_key: str, src_env_name: str, manifest: list, include_test_apps: bool, include_deployment_zones: bool):
     app_data_list = []  # will contain the applications details from the manifest
 
-    for deployed_app in manifest[MANIFEST_APPLICATION_VERSIONS]:  # type: ignore
-        if not include_test_apps and deployed_app[MANIFEST_FLAG_IS_TEST_APPLICATION]:
-            continue
-        try:
-            get_application_version(artifact_dir, lt_endpoint, lt_token, False, deployed_app["VersionKey"], app_name=deployed_app["ApplicationName"])
-        except AppDoesNotExistError:
+    manifest_apps = [deployed_app for deployed_app in manifest[MANIFEST_APPLICATION_VERSIONS] if include_test_apps or not deployed_app[MANIFEST_FLAG_IS_TEST_APPLICATION]]  # type: ignore
+    # Validates that every application version in the manifest still exists, querying LifeTime concurrently
+    validations = run_lifetime_calls([get_application_version_async(artifact_dir, lt_endpoint, lt_token, False, deployed_app["VersionKey"], app_name=deployed_app["ApplicationName"])
+                                      for deployed_app in manifest_apps], return_exceptions=True)
+
+    for deployed_app, validation in zip(manifest_apps, validations):
+        if isinstance(validation, AppDoesNotExistError):
             print("Application {} with version {} no longer exists in {}. The manifest no longer reflects the current state of the environment. Aborting!".format(deployed_app["ApplicationName"], deployed_app["VersionNumber"], src_env_name), flush=True)
             sys.exit(1)
-        except Exception as error:
-            print("Error trying to validate if the application {} exists in the {} environment.\nError: {}".format(deployed_app["ApplicationName"], src_env_name, error), flush=True)
+        elif isinstance(validation, Exception):
+            print("Error trying to validate if the application {} exists in the {} environment.\nError: {}".format(deployed_app["ApplicationName"], src_env_name, validation), flush=True)
             sys.exit(1)
 
         # Add it to the app data list
@@ -82,39 +84,15 @@ def check_if_can_deploy(artifact_dir: str, lt_endpoint: str, lt_api_version: str
     if include_deployment_zones:
         deploy_zones = get_environment_deployment_zones(artifact_dir, lt_endpoint, lt_token, env_key=env_key)
 
+    # Takes a snapshot of the status of the apps in the target env (and of the versions running there), to check if they were deployed
+    snapshot = get_infrastructure_snapshot(artifact_dir, lt_endpoint, lt_token, env_key, app_data_list)
+
     for app in app_data_list:
         deploy_zone_key = ""
         # Get the target deployment zone based on the name provided in the manifest
         target_deploy_zone = next(filter(lambda x: x["Name"] == app["DeploymentZone"], deploy_zones), None)
-        try:
-            # Get the status of the app in the target env, to check if they were deployed
-            app_status = get_environment_app_version(artifact_dir, lt_endpoint, lt_token, True, env_name=env_name, app_key=app["Key"])
-            # Check if the app version is already deployed in the target environment
-            for app_in_env in app_status["AppStatusInEnvs"]:
-                if app_in_env["EnvironmentKey"] == env_key:
-                    # Check if the target environment has the version deployed
-                    if app_in_env["BaseApplicationVersionKey"] != app["VersionKey"]:
-                        # The version is not the one deployed -> need to compare the version tag
-                        app_in_env_data = get_application_version(artifact_dir, lt_endpoint, lt_token, False, app_in_env["BaseApplicationVersionKey"], app_key=app["Key"])
-                        # If the version in the target environment has the same version number -> skip deployment
-                        if Version(app_in_env_data["Version"]) == Version(app["Version"]):
-                            print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionTag is equal.".format(app["Name"], app["Version"], env_name), flush=True)
-                        else:
-                            # Generated app_keys for deployment plan based on the target version
-                            if target_deploy_zone:
-                                # Check if target deployment zone is different from the current one being used
-                                if target_deploy_zone["Key"] != app_in_env["DeploymentZoneKey"]:
-                                    deploy_zone_key = target_deploy_zone["Key"]
-                            elif include_deployment_zones and app["DeploymentZone"]:
-                                print("Deployment zone with name {} not found in {} environment.".format(app["DeploymentZone"], env_name), flush=True)
-                            app_keys.append(generate_deploy_app_key(lt_api_version, app["VersionKey"], deploy_zone_key))
-                            if deploy_zone_key:
-                                print("Adding application {} with version {}, to be deployed in {} environment using {} deployment zone.".format(app["Name"], app["Version"], env_name, target_deploy_zone["Name"]), flush=True)
-                            else:
-                                print("Adding application {} with version {}, to be deployed in {} environment.".format(app["Name"], app["Version"], env_name), flush=True)
-                    else:
-                        print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionKey is equal.".format(app["Name"], app["Version"], env_name), flush=True)
-        except AppDoesNotExistError:
+        app_in_env = snapshot.get_app_status_in_env(app["Key"], env_key)
+        if app_in_env is None:
             if target_deploy_zone:
                 deploy_zone_key = target_deploy_zone["Key"]
             elif include_deployment_zones and app["DeploymentZone"]:
@@ -124,6 +102,28 @@ def check_if_can_deploy(artifact_dir: str, lt_endpoint: str, lt_api_version: str
                 print("App {} with version {} does not exist in {} environment. Ignoring check and deploying it using {} deployment zone.".format(app["Name"], app["Version"], env_name, target_deploy_zone["Name"]), flush=True)
             else:
                 print("App {} with version {} does not exist in {} environment. Ignoring check and deploying it.".format(app["Name"], app["Version"], env_name), flush=True)
+        # Check if the target environment has the version deployed
+        elif app_in_env["BaseApplicationVersionKey"] != app["VersionKey"]:
+            # The version is not the one deployed -> need to compare the version tag
+            app_in_env_version = snapshot.get_version_number(app["Key"], app_in_env["BaseApplicationVersionKey"])
+            # If the version in the target environment has the same version number -> skip deployment
+            if Version(app_in_env_version) == Version(app["Version"]):
+                print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionTag is equal.".format(app["Name"], app["Version"], env_name), flush=True)
+            else:
+                # Generated app_keys for deployment plan based on the target version
+                if target_deploy_zone:
+                    # Check if target deployment zone is different from the current one being used
+                    if target_deploy_zone["Key"] != app_in_env["DeploymentZoneKey"]:
+                        deploy_zone_key = target_deploy_zone["Key"]
+                elif include_deployment_zones and app["DeploymentZone"]:
+                    print("Deployment zone with name {} not found in {} environment.".format(app["DeploymentZone"], env_name), flush=True)
+                app_keys.append(generate_deploy_app_key(lt_api_version, app["VersionKey"], deploy_zone_key))
+                if deploy_zone_key:
+                    print("Adding application {} with version {}, to be deployed in {} environment using {} deployment zone.".format(app["Name"], app["Version"], env_name, target_deploy_zone["Name"]), flush=True)
+                else:
+                    print("Adding application {} with version {}, to be deployed in {} environment.".format(app["Name"], app["Version"], env_name), flush=True)
+        else:
+            print("Skipping application {} with version {}, since it's already deployed in {} environment.\nReason: VersionKey is equal.".format(app["Name"], app["Version"], env_name), flush=True)
     return app_keys
 
 
@@ -169,16 +169,13 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
     print("Creating deployment plan from {} (Label: {}) to {} (Label: {}) including applications: {} ({}).".format(src_env_tuple[0], source_env_label, dest_env_tuple[0], dest_env_label, to_deploy_app_names, to_deploy_app_info), flush=True)
 
     if not allow_parallel_deployments:
-        wait_counter = 0
+        poller = Poller(get_configuration_value("QUEUE_TIMEOUT_IN_SECS", QUEUE_TIMEOUT_IN_SECS), get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS))
         deployments = get_running_deployment(artifact_dir, lt_endpoint, lt_token, dest_env_tuple[1])
         while len(deployments) > 0:
-            if wait_counter >= get_configuration_value("QUEUE_TIMEOUT_IN_SECS", QUEUE_TIMEOUT_IN_SECS):
+            if not poller.wait():
                 print("Timeout occurred while waiting for LifeTime to be free, to create the new deployment plan.", flush=True)
                 sys.exit(1)
-            sleep_value = get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS)
-            sleep(sleep_value)
-            wait_counter += sleep_value
-            print("Waiting for LifeTime to be free. Elapsed time: {} seconds...".format(wait_counter), flush=True)
+            print("Waiting for LifeTime to be free. Elapsed time: {} seconds...".format(int(poller.elapsed())), flush=True)
             deployments = get_running_deployment(artifact_dir, lt_endpoint, lt_token, dest_env_tuple[1])
 
     # LT is free to deploy
@@ -215,11 +212,13 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
     # Flag to only alert the user once
     alert_user = False
     # Sleep thread until deployment has finished
-    wait_counter = 0
-    while wait_counter < get_configuration_value("DEPLOYMENT_TIMEOUT_IN_SECS", DEPLOYMENT_TIMEOUT_IN_SECS):
+    poller = Poller(get_configuration_value("DEPLOYMENT_TIMEOUT_IN_SECS", DEPLOYMENT_TIMEOUT_IN_SECS), get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS),
+                    get_expected_duration(artifact_dir, DEPLOYMENT_POLLING_OPERATION))
+    while poller.poll():
         # Check Deployment Plan status.
         dep_status = get_deployment_status(
             artifact_dir, lt_endpoint, lt_token, dep_plan_key)
+        poller.observe(dep_status["DeploymentStatus"])
         if dep_status["DeploymentStatus"] != DEPLOYMENT_RUNNING_STATUS:
             # Check deployment status is pending approval.
             if dep_status["DeploymentStatus"] == DEPLOYMENT_WAITING_STATUS:
@@ -227,6 +226,7 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
                 if check_deployment_two_step_deploy_status(dep_status):
                     # Force it to continue in case of force_two_step_deployment parameter
                     if force_two_step_deployment:
+                        # Resume on every status check while waiting, in case a previous resume did not take effect
                         continue_deployment(lt_endpoint, lt_token, dep_plan_key)
                         print("Deployment plan {} resumed execution.".format(dep_plan_key), flush=True)
                     else:
@@ -244,13 +244,11 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
             else:
                 # If it reaches here, it means the deployment was successful
                 print("Deployment plan finished with status {}.".format(dep_status["DeploymentStatus"]), flush=True)
+                # Stores the deployment duration, to adjust the polling of the next deployments
+                store_duration(artifact_dir, DEPLOYMENT_POLLING_OPERATION, poller.elapsed())
                 # Exit the script to continue with the pipeline
                 sys.exit(0)
-        # Deployment status is still running. Go back to sleep.
-        sleep_value = get_configuration_value("SLEEP_PERIOD_IN_SECS", SLEEP_PERIOD_IN_SECS)
-        sleep(sleep_value)
-        wait_counter += sleep_value
-        print("{} secs have passed since the deployment started...".format(wait_counter), flush=True)
+        print("{} secs have passed since the deployment started...".format(int(poller.elapsed())), flush=True)
 
     # Deployment timeout reached. Exit script with error
     print("Timeout occurred while deployment plan is still in {} status.".format(DEPLOYMENT_RUNNING_STATUS), flush=True)
@@ -1,9 +1,8 @@
 # Python Modules
-import unittest
 import os
-import xmlrunner
 import sys
 import argparse
+from time import monotonic
 
 # Workaround for Jenkins:
 # Set the path to include the outsystems module
@@ -14,45 +13,105 @@ else:  # Else just add the project dir
     sys.path.append(os.getcwd())
 
 # Custom Modules
-from outsystems.vars.file_vars import ARTIFACT_FOLDER, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE, JUNIT_TEST_RESULTS_FILE
-from outsystems.bdd_framework.bdd_runner import run_bdd_test
+# Variables
+from outsystems.vars.file_vars import ARTIFACT_FOLDER, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE, JUNIT_TEST_RESULTS_FILE, JUNIT_SHARD_TEST_RESULTS_FILE
+from outsystems.vars.bdd_vars import BDD_MAX_CONCURRENT_TESTS, BDD_TEST_MAX_RETRIES
+# Functions
+from outsystems.bdd_framework.bdd_parallel_runner import run_bdd_tests, BDD_TEST_PASSED
+from outsystems.bdd_framework.bdd_junit import write_junit_results
+from outsystems.bdd_framework.bdd_sharding import load_test_durations, update_test_durations, get_test_shard
+from outsystems.bdd_framework.bdd_test_selection import record_tested_versions
+from outsystems.bdd_framework.bdd_flakiness import update_flakiness_scores, load_quarantine, apply_quarantine, get_failed_tests
 from outsystems.file_helpers.file import load_data
-from outsystems.vars.vars_base import load_configuration_file
+from outsystems.vars.vars_base import load_configuration_file, get_configuration_value
 
 
-# Functions
-# Variables
+# Prints the outcome of a BDD test as soon as it finishes
+def print_test_result(test_result: dict):
+    print("{} ... {} ({:.3f}s)".format(test_result["TestName"], "ok" if test_result["Outcome"] == BDD_TEST_PASSED else test_result["Outcome"].upper(),
+                                       test_result["Duration"]), flush=True)
+    if test_result["Outcome"] != BDD_TEST_PASSED:
+        print(test_result["Message"], flush=True)
 
-# ---------------------- TEST CLASS ----------------------
-# Generator class that will create a unit test for each entry of the test results and print out a XML in tests/python-tests/*.xml
-class BDDTestRunner(unittest.TestCase):
-    longMessage = False
 
+# Parses a shard argument (e.g. "2/4") into (shard index, shard count)
+def parse_shard(shard: str):
+    try:
+        shard_index, shard_count = (int(value) for value in shard.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid shard \"{}\". Expected <index>/<count>, e.g. \"2/4\".".format(shard))
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise argparse.ArgumentTypeError("Invalid shard \"{}\". The index must be between 1 and the shard count.".format(shard))
+    return shard_index, shard_count
 
-def format_error_report(error_obj):
-    description = ""
-    if not error_obj["ErrorMessage"]:
-        description += "\nBDD Test Suite failed {} scenarios (in {})\n".format(error_obj["FailedScenarios"], error_obj["FailedScenarios"] + error_obj["SuccessfulScenarios"])
-        for failure in error_obj["FailureReports"]:
-            description += failure
-    else:
-        description += "\nAn error was found in the unit test.\nError: {}".format(error_obj["ErrorMessage"])
-    return description
 
+# ---------------------- SCRIPT ----------------------
+# Runs the BDD tests concurrently and stores the results in a JUnit XML file. Returns True if every test passed.
+# If shard is set (shard index, shard count), only the tests of that shard run and their results are stored in a shard file,
+# to be combined with the other shards by merge_test_results.
+# Shards are split using the duration history in durations_file (which every shard must share), or with no history if it is not set,
+# so that every agent computes the same split.
+# Tests that did not pass are run again up to max_retries times. Tests in the quarantine list (test or test suite names) run,
+# but do not fail the build.
+def main(artifact_dir: str, max_workers: int = None, serialized_suites: list = None, shard: tuple = None, max_retries: int = None, quarantine: list = None,
+         durations_file: str = None):
+    if max_workers is None:
+        max_workers = get_configuration_value("BDD_MAX_CONCURRENT_TESTS", BDD_MAX_CONCURRENT_TESTS)
+    if max_retries is None:
+        max_retries = get_configuration_value("BDD_TEST_MAX_RETRIES", BDD_TEST_MAX_RETRIES)
 
-def bdd_check_generator(url: str):
-    def test(self):
-        json_obj = run_bdd_test(url)
-        self.assertTrue(json_obj["SuiteSuccess"], format_error_report(json_obj))
+    # Load the test endpoints
+    filename = os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE)
+    test_endpoints = load_data(artifact_dir, filename)
+    if shard:
+        shard_index, shard_count = shard
+        all_tests = len(test_endpoints)
+        # The duration history of the artifacts folder differs between agents, so it is never used to split the tests
+        if not durations_file:
+            print("No shared duration history (--durations_file) was given. Splitting the tests by count.", flush=True)
+        durations = load_test_durations(artifact_dir, durations_file) if durations_file else {}
+        test_endpoints = get_test_shard(test_endpoints, shard_index, shard_count, durations, serialized_suites)
+        print("Shard {} of {}: {} of {} BDD tests.".format(shard_index, shard_count, len(test_endpoints), all_tests), flush=True)
+
+    print("Running {} BDD tests ({} at a time)...".format(len(test_endpoints), max_workers), flush=True)
+    started_on = monotonic()
+    test_results = apply_quarantine(run_bdd_tests(test_endpoints, max_workers, serialized_suites, print_test_result, max_retries), quarantine)
+    duration = monotonic() - started_on
+
+    # Stores the test results in a XML file to be used by JUNIT
+    if shard:
+        filename = os.path.join(artifact_dir, JUNIT_SHARD_TEST_RESULTS_FILE.format(*shard))
+    else:
+        filename = os.path.join(artifact_dir, JUNIT_TEST_RESULTS_FILE)
+        # The duration and flakiness history of sharded runs is updated when the shards are merged
+        update_test_durations(artifact_dir, test_results, durations_file)
+        update_flakiness_scores(artifact_dir, test_results)
+    write_junit_results(filename, test_results, duration)
 
-    return test
+    failed_tests = get_failed_tests(test_results)
+    print("Ran {} BDD tests in {:.3f}s: {} passed, {} failed.".format(len(test_results), duration, len(test_results) - len(failed_tests), len(failed_tests)), flush=True)
+    # The versions under test of sharded runs are recorded when the shards are merged
+    if not failed_tests and not shard:
+        record_tested_versions(artifact_dir)
+    return len(failed_tests) == 0
 
 
-# ---------------------- SCRIPT ----------------------
 if __name__ == '__main__':
     # Argument menu / parsing
     parser = argparse.ArgumentParser()
     parser.add_argument("-a", "--artifacts", type=str, help="Name of the artifacts folder. Default: \"Artifacts\"", default=ARTIFACT_FOLDER)
+    parser.add_argument("-w", "--max_workers", type=int,
+                        help="Maximum number of BDD tests running at the same time. Default: BDD_MAX_CONCURRENT_TESTS")
+    parser.add_argument("-ss", "--serialize_suites", type=str,
+                        help="Comma separated list of test suites (e.g. suites that share data) whose tests run one at a time. Example: \"Test Suite 1,TestSuite2\"")
+    parser.add_argument("-sh", "--shard", type=parse_shard,
+                        help="Runs only a shard of the tests, split by their usual duration. Example: \"2/4\" (second of four shards)")
+    parser.add_argument("-df", "--durations_file", type=str,
+                        help="Duration history file shared by every shard, used to split the tests and updated after non-sharded runs. Default: the history in the artifacts folder (not used to split shards)")
+    parser.add_argument("-r", "--max_retries", type=int,
+                        help="Maximum number of times a test that did not pass is run again. Default: BDD_TEST_MAX_RETRIES")
+    parser.add_argument("-q", "--quarantine_file", type=str,
+                        help="JSON file with a list of test names (e.g. \"test_MyTests__MyScreen\") or test suite names whose tests run, but do not fail the build.")
     parser.add_argument("-cf", "--config_file", type=str,
                         help="Config file path. Contains configuration values to override the default ones.")
 
@@ -64,25 +123,19 @@ if __name__ == '__main__':
     # Parse the artifact directory
     # Assumes the default dir = Artifacts
     artifact_dir = args.artifacts
-    if len(sys.argv) == 3:  # Workaround to clear the args to avoid messing with the unittest.main()
-        sys.argv = sys.argv[:-2]
-    elif len(sys.argv) == 5:
-        sys.argv = sys.argv[:-4]
-
-    # Load the test endpoints
-    filename = os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE)
-    test_urls = load_data(artifact_dir, filename)
-
-    for test_endpoint in test_urls:
-        test_func = bdd_check_generator(test_endpoint["URL"])
-        test_name = "test_{}__{}".format(test_endpoint["TestSuite"], test_endpoint["Name"])
-        setattr(BDDTestRunner, test_name, test_func)
-
-    # Runs the test suite and stores the value in a XMN file to be used by JUNIT
-    filename = os.path.join(artifact_dir, JUNIT_TEST_RESULTS_FILE)
-    try:
-        with open(filename, 'wb') as output:
-            runner = xmlrunner.XMLTestRunner(output=output, failfast=False, buffer=False)
-            unittest.main(testRunner=runner)
-    except UnboundLocalError:
-        sys.exit(0)
+    # Parse the maximum number of concurrent tests
+    max_workers = args.max_workers
+    # Parse the serialized test suites
+    serialized_suites = args.serialize_suites.split(',') if args.serialize_suites else []
+    # Parse the shard
+    shard = args.shard
+    # Parse the duration history file
+    durations_file = args.durations_file
+    # Parse the maximum number of retries
+    max_retries = args.max_retries
+    # Parse the quarantine file (if it exists)
+    quarantine = load_quarantine(args.quarantine_file) if args.quarantine_file else []
+
+    # Calls the main script
+    if not main(artifact_dir, max_workers, serialized_suites, shard, max_retries, quarantine, durations_file):
+        sys.exit(1)
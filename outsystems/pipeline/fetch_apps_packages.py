@@ -21,6 +21,7 @@ from outsystems.vars.cicd_vars import PROBE_HTTP_PROTO, PROBE_API_ENDPOINT, PROB
 # Functions
 from outsystems.lifetime.lifetime_environments import get_environment_key
 from outsystems.file_helpers.file import load_data
+from outsystems.file_helpers.oap_store import OAPStore
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
 from outsystems.pipeline.deploy_latest_tags_to_target_env import generate_deployment_based_on_manifest as generate_deployment_based_on_deploy_manifest, generate_regular_deployment
 from outsystems.pipeline.deploy_tags_to_target_env_with_manifest import generate_deployment_based_on_manifest as generate_deployment_based_on_trigger_manifest
@@ -37,7 +38,7 @@ def store_data(filename: str, data: list):
         json.dump(data, f)
 
 
-def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, source_env: str, apps: list, dep_manifest: list, trigger_manifest: dict, include_test_apps: bool, cicd_http_proto: str, cicd_url: str, cicd_api_endpoint: str, cicd_version: str, cicd_key: str, friendly_package_names: bool, generate_deploy_order: bool):
+def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, source_env: str, apps: list, dep_manifest: list, trigger_manifest: dict, include_test_apps: bool, cicd_http_proto: str, cicd_url: str, cicd_api_endpoint: str, cicd_version: str, cicd_key: str, friendly_package_names: bool, generate_deploy_order: bool, oap_store_dir: str = None):
 
     # will contain the applications to deploy details from LT
     app_data_list = []
@@ -63,7 +64,7 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
 
     # Export binary files
     app_oap_list = generate_oap_list(app_data_list, friendly_package_names)
-    export_apps_oap(artifact_dir, lt_endpoint, lt_token, src_env_key, app_oap_list)
+    export_apps_oap(artifact_dir, lt_endpoint, lt_token, src_env_key, app_oap_list, OAPStore(oap_store_dir) if oap_store_dir else None)
 
     if generate_deploy_order:
         # Builds the Probe endpoint
@@ -115,6 +116,8 @@ if __name__ == "__main__":
                         help="Flag that indicates if downloaded application packages should have a user-friendly name. Example: \"AppName_v1_2_1\"")
     parser.add_argument("-g", "--generate_deploy_order", action='store_true',
                         help="Flag that indicates if the deploy order file should be created.")
+    parser.add_argument("-os", "--oap_store", type=str,
+                        help="(Optional) Folder where exported application packages are kept between runs. Packages already there are copied from it instead of exported again.")
     parser.add_argument("-cf", "--config_file", type=str,
                         help="Config file path. Contains configuration values to override the default ones.")
 
@@ -191,6 +194,8 @@ if __name__ == "__main__":
     generate_deploy_order = args.generate_deploy_order
     if generate_deploy_order and not args.cicd_probe_url:
         raise InvalidParametersError("The CI/CD Probe is required to create the deployment order and must be provided as argument")
+    # Parse OAP Store folder
+    oap_store_dir = args.oap_store
 
     # Calls the main script
-    main(artifact_dir, lt_http_proto, lt_url, lt_api_endpoint, lt_version, lt_token, source_env, apps, dep_manifest, trigger_manifest, include_test_apps, cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version, cicd_key, friendly_package_names, generate_deploy_order)
+    main(artifact_dir, lt_http_proto, lt_url, lt_api_endpoint, lt_version, lt_token, source_env, apps, dep_manifest, trigger_manifest, include_test_apps, cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version, cicd_key, friendly_package_names, generate_deploy_order, oap_store_dir)
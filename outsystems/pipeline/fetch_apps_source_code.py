@@ -3,10 +3,14 @@ import sys
 import os
 import argparse
 import re
-from time import sleep
 import xml.etree.ElementTree as ET
-from zipfile import ZipFile
-from io import BytesIO
+from zipfile import ZipFile, ZipInfo
+from tempfile import SpooledTemporaryFile
+from shutil import copyfileobj
+from time import monotonic
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import nullcontext
 
 # Workaround for Jenkins:
 # Set the path to include the outsystems module
@@ -23,46 +27,85 @@ from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDP
 from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFEST_FLAG_IS_TEST_APPLICATION, \
     MANIFEST_APPLICATION_NAME
 from outsystems.vars.pipeline_vars import SOURCECODE_SLEEP_PERIOD_IN_SECS, SOURCECODE_TIMEOUT_IN_SECS, SOURCECODE_ONGOING_STATUS, \
-    SOURCECODE_FINISHED_STATUS
+    SOURCECODE_FINISHED_STATUS, SOURCECODE_POLLING_OPERATION, SOURCECODE_MAX_CONCURRENT_DOWNLOADS, \
+    SOURCECODE_MODULE_SPILL_THRESHOLD_IN_BYTES, SOURCECODE_EXTRACTION_CHUNK_SIZE_IN_BYTES, SOURCECODE_EXTRACTION_MAX_PROCESSES
 from outsystems.vars.dotnet_vars import MS_BUILD_NAMESPACE, ASSEMBLY_BLACKLIST
 
 # Functions
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
+from outsystems.lifetime.lifetime_polling import Poller, get_expected_duration, store_duration
 from outsystems.lifetime.lifetime_environments import get_environment_app_source_code, get_environment_app_source_code_status, \
     get_environment_app_source_code_link, get_environment_key
 from outsystems.lifetime.lifetime_applications import get_running_app_version
+from outsystems.lifetime.lifetime_async import run_lifetime_calls, get_environment_app_source_code_async, \
+    get_environment_app_source_code_status_async, get_running_app_version_async
 from outsystems.lifetime.lifetime_downloads import download_package
-from outsystems.file_helpers.file import load_data
+from outsystems.file_helpers.file import load_data, bytes_human_readable_size
+from outsystems.file_helpers.sourcecode_index import SourceCodeIndex, get_sourcecode_index_key
 from outsystems.vars.vars_base import get_configuration_value, load_configuration_file
 
 # ############################################################# SCRIPT ##############################################################
 
 
 # Extract content of downloaded source code package (one folder per application module)
-def extract_package_content(file_path: str, include_all_refs: bool, remove_resources_files: bool):
-    module_count = 0
+# With max_processes > 1, the modules are extracted and post-processed in a pool of processes (0 means one per CPU core).
+# If process_pool is set, the modules are extracted in that pool instead (e.g. a pool shared by several packages extracted at the same time).
+def extract_package_content(file_path: str, include_all_refs: bool, remove_resources_files: bool, max_processes: int = 1, process_pool: ProcessPoolExecutor = None):
+    spill_threshold = get_configuration_value("SOURCECODE_MODULE_SPILL_THRESHOLD_IN_BYTES", SOURCECODE_MODULE_SPILL_THRESHOLD_IN_BYTES)
+    module_archives = get_package_module_archives(file_path)
+
+    max_processes = get_extraction_processes(max_processes)
+    jobs = [(file_path, archive_name, module_name, spill_threshold, include_all_refs, remove_resources_files) for archive_name, module_name in module_archives]
+    if process_pool:
+        extractions = [process_pool.submit(_process_module_archive, *job) for job in jobs]
+        # Results are reported in the package order, regardless of which module finishes first
+        _report_extracted_modules(extraction.result() for extraction in extractions)
+    elif max_processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_processes, len(jobs))) as executor:
+            extractions = [executor.submit(_process_module_archive, *job) for job in jobs]
+            # Results are reported in the package order, regardless of which module finishes first
+            _report_extracted_modules(extraction.result() for extraction in extractions)
+    else:
+        _report_extracted_modules(_process_module_archive(*job) for job in jobs)
+
+    # Return number of modules inside the source code package
+    return len(module_archives)
+
+
+# Returns the number of processes used to extract the modules of a package (0 means one per CPU core)
+def get_extraction_processes(max_processes: int):
+    if max_processes == 0:
+        return os.cpu_count() or 1
+    return max_processes
+
+
+# Return the (archive name, module name) of each module archive inside a source code package
+def get_package_module_archives(file_path: str):
+    module_archives = []
     with ZipFile(file_path, 'r') as zf:
         # Iterate through the content of the source code package
         for archive_name in zf.namelist():
             match = re.search(r'(.*)\.v\d+.zip$', archive_name)
             # Each package will have one .zip file per module
             if match:
-                module_name = match.group(1)
-                module_folder = os.path.join(os.path.dirname(file_path), "modules", module_name)
-                file_data = BytesIO(zf.read(archive_name))
-                with ZipFile(file_data) as zf2:
-                    # Extract generated source code of each module to a subfolder
-                    zf2.extractall(path=module_folder)
-
-                # Check if any post-processing action is needed over the extracted resources
-                if (include_all_refs or remove_resources_files):
-                    process_csproj_files(module_name, module_folder, include_all_refs, remove_resources_files)
-
-                # Update package modules count
-                module_count += 1
-
-    # Return number of modules inside the source code package
-    return module_count
+                module_archives.append((archive_name, match.group(1)))
+    return module_archives
+
+
+# Extract a module archive nested in the source code package to the module folder, without loading it whole into memory.
+# The inner archive is streamed into a spooled file, which stays in memory up to spill_threshold bytes and moves to disk above it
+# (a zip file needs random access, so it can't be read straight from the compressed stream of the outer package).
+# Returns the number of extracted (uncompressed) bytes and the time it took, in seconds.
+def extract_module_archive(zf: ZipFile, archive_info: ZipInfo, module_folder: str, spill_threshold: int):
+    started_on = monotonic()
+    with SpooledTemporaryFile(max_size=spill_threshold) as module_file:
+        with zf.open(archive_info) as archive_file:
+            copyfileobj(archive_file, module_file, get_configuration_value("SOURCECODE_EXTRACTION_CHUNK_SIZE_IN_BYTES", SOURCECODE_EXTRACTION_CHUNK_SIZE_IN_BYTES))
+        module_file.seek(0)
+        with ZipFile(module_file) as zf2:
+            zf2.extractall(path=module_folder)
+            extracted_bytes = sum(info.file_size for info in zf2.infolist())
+    return extracted_bytes, monotonic() - started_on
 
 
 # Return the list of .csproj relative paths referenced in the module .sln file
@@ -103,6 +146,8 @@ def process_csproj_files(module_name: str, module_folder: str, include_all_refs:
 
     # Build bin directory full path
     bin_folder = os.path.join(module_folder, "bin")
+    # Assemblies (.dll) available in the bin directory, listed once for all csproj files of the module
+    bin_dlls = None
 
     # Iterate through all csproj files for the current module
     for csproj in csprojs:
@@ -111,53 +156,57 @@ def process_csproj_files(module_name: str, module_folder: str, include_all_refs:
 
         # Check if csproj is for the module's references proxy assembly
         if csproj["IsReferencesProxy"] and include_all_refs:
+            if bin_dlls is None:
+                bin_dlls = sorted(file for file in os.listdir(bin_folder) if file.endswith(".dll"))
+
             # Read csproj file and identify first ItemGroup element
             ET.register_namespace('', MS_BUILD_NAMESPACE)
             tree = ET.parse(csproj_file)
             itemgroup_elem = tree.find("./{val}ItemGroup".format(val='{' + MS_BUILD_NAMESPACE + '}'))
+            # Collect the dlls already referenced in the csproj
+            existing_hintpaths = {hintpath.text for hintpath in tree.iterfind("./{val}ItemGroup/{val}Reference/{val}HintPath".format(val='{' + MS_BUILD_NAMESPACE + '}'))}
+            csproj_assembly = os.path.splitext(os.path.basename(csproj_file))[0]
+            # Identify the relative path between the module's full dir and csproj file full dir
+            bin_relpath = os.path.join(os.path.relpath(module_folder, os.path.dirname(csproj_file)), 'bin')
 
             # Iterate through all dlls found in the bin directory
-            for file in os.listdir(bin_folder):
-                if file.endswith(".dll"):
-                    dll_name = os.path.splitext(file)[0]
-                    # TODO: Use os.path.join instead
-                    dll_relpath = os.path.join(os.path.relpath(module_folder, os.path.dirname(csproj_file)), 'bin', file)
-
-                    # Validate if dll already exists in the csproj
-                    dll_exists = tree.find("./{val}ItemGroup/{val}Reference/{val}HintPath[.='{dll}']".format(val='{' + MS_BUILD_NAMESPACE + '}', dll=dll_relpath)) is not None
-
-                    # Continue if dll is csproj target assembly
-                    # Continue if dll already exists in csproj
-                    # Continue if dll exists in blacklist
-                    if dll_name == os.path.splitext(os.path.basename(csproj_file))[0] or dll_exists or dll_name in ASSEMBLY_BLACKLIST:
-                        continue
-
-                    # Create Reference structure
-                    ref = ET.Element("Reference")
-                    ref.set("Include", dll_name)
-
-                    # Create Name structure
-                    ref_name = ET.Element("Name")
-                    ref_name.text = dll_name
-                    ref.append(ref_name)
-
-                    # Create HintPath structure
-                    ref_hintpath = ET.Element("HintPath")
-                    # Identify the relative path between the module's full dir and csproj file full dir
-                    # Adds to the element text the dll relative path
-                    ref_hintpath.text = dll_relpath
-                    ref.append(ref_hintpath)
-
-                    # Create Private structure
-                    ref_private = ET.Element("Private")
-                    ref_private.text = "False"
-                    ref.append(ref_private)
-
-                    # Append new element to ItemGroup element
-                    itemgroup_elem.append(ref)
-
-            # Save newly added references to csproj file
-            tree.write(csproj_file)
+            new_refs = []
+            for file in bin_dlls:
+                dll_name = os.path.splitext(file)[0]
+                dll_relpath = os.path.join(bin_relpath, file)
+
+                # Continue if dll is csproj target assembly
+                # Continue if dll already exists in csproj
+                # Continue if dll exists in blacklist
+                if dll_name == csproj_assembly or dll_relpath in existing_hintpaths or dll_name in ASSEMBLY_BLACKLIST:
+                    continue
+
+                # Create Reference structure
+                ref = ET.Element("Reference")
+                ref.set("Include", dll_name)
+
+                # Create Name structure
+                ref_name = ET.Element("Name")
+                ref_name.text = dll_name
+                ref.append(ref_name)
+
+                # Create HintPath structure
+                # Adds to the element text the dll relative path
+                ref_hintpath = ET.Element("HintPath")
+                ref_hintpath.text = dll_relpath
+                ref.append(ref_hintpath)
+
+                # Create Private structure
+                ref_private = ET.Element("Private")
+                ref_private.text = "False"
+                ref.append(ref_private)
+
+                new_refs.append(ref)
+
+            # Append all new elements to ItemGroup element and save them to csproj file at once
+            if new_refs:
+                itemgroup_elem.extend(new_refs)
+                tree.write(csproj_file)
 
         # Check if csproj is for the module's main assembly
         elif csproj["IsMain"] and remove_resources_files:
@@ -178,22 +227,28 @@ def process_csproj_files(module_name: str, module_folder: str, include_all_refs:
             tree.write(csproj_file)
 
 
-def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, target_env: str, apps: list, trigger_manifest: dict, include_test_apps: bool, friendly_package_names: bool, include_all_refs: bool, remove_resources_files: bool):
-
-    # Builds the LifeTime endpoint
-    lt_endpoint = build_lt_endpoint(lt_http_proto, lt_url, lt_api_endpoint, lt_api_version)
+# Downloads a source code package that finished being created, returning the path of the downloaded file
+def download_source_code_package(artifact_dir: str, lt_endpoint: str, lt_token: str, target_env: str, app_name: str, pkg_key: str, friendly_package_names: bool):
+    pkg_link = get_environment_app_source_code_link(artifact_dir, lt_endpoint, lt_token,
+                                                    env_name=target_env, app_name=app_name, pkg_key=pkg_key)
+    if friendly_package_names:
+        target_env_key = get_environment_key(artifact_dir, lt_endpoint, lt_token, target_env)
+        running_version = get_running_app_version(artifact_dir, lt_endpoint, lt_token, target_env_key, app_name=app_name)
+        file_name = "{}_v{}".format(app_name.replace(" ", "_"), running_version["Version"].replace(".", "_"))
+        if running_version["IsModified"]:
+            file_name += "+"
+    else:
+        file_name = pkg_key
+    file_name += ENVIRONMENT_SOURCECODE_DOWNLOAD_FILE
+    file_path = os.path.join(artifact_dir, ENVIRONMENT_SOURCECODE_FOLDER, file_name)
 
-    # List of application names to fetch the source code from target environment
-    app_list = []
+    download_package(file_path, lt_token, pkg_link["url"])
+    return file_path
 
-    # Extract names from manifest file (when available)
-    if trigger_manifest:
-        for app in trigger_manifest[MANIFEST_APPLICATION_VERSIONS]:
-            if include_test_apps or not app[MANIFEST_FLAG_IS_TEST_APPLICATION]:
-                app_list.append(app[MANIFEST_APPLICATION_NAME])
-    else:
-        app_list = apps
 
+# Fetches the source code of one application at a time: request the package, wait for it, download and extract it
+# The optional on_package_extracted(app_name, file_path) is called after each package is extracted (in both modes).
+def fetch_source_code_sequentially(artifact_dir: str, lt_endpoint: str, lt_token: str, target_env: str, app_list: list, friendly_package_names: bool, include_all_refs: bool, remove_resources_files: bool, extraction_processes: int = 1, on_package_extracted: callable = None):
     for app_name in app_list:
         # Request source code package creation
         pkg_details = get_environment_app_source_code(artifact_dir, lt_endpoint, lt_token, env_name=target_env, app_name=app_name)
@@ -201,51 +256,225 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
         print("Source code package {} started being created for application {} deployed in {} environment.".format(pkg_key, app_name, target_env), flush=True)
 
         # Wait for package creation to finish
-        wait_counter = 0
+        poller = Poller(get_configuration_value("SOURCECODE_TIMEOUT_IN_SECS", SOURCECODE_TIMEOUT_IN_SECS), get_configuration_value("SOURCECODE_SLEEP_PERIOD_IN_SECS", SOURCECODE_SLEEP_PERIOD_IN_SECS),
+                        get_expected_duration(artifact_dir, SOURCECODE_POLLING_OPERATION))
         link_available = False
-        while wait_counter < get_configuration_value("SOURCECODE_TIMEOUT_IN_SECS", SOURCECODE_TIMEOUT_IN_SECS):
+        while poller.poll():
             # Check current package status
             pkg_status = get_environment_app_source_code_status(artifact_dir, lt_endpoint, lt_token,
                                                                 env_name=target_env, app_name=app_name, pkg_key=pkg_key)
             if pkg_status["Status"] == SOURCECODE_FINISHED_STATUS:
                 # Package was created successfully
                 link_available = True
+                store_duration(artifact_dir, SOURCECODE_POLLING_OPERATION, poller.elapsed())
                 break
             elif pkg_status["Status"] == SOURCECODE_ONGOING_STATUS:
                 # Package is still being created. Go back to sleep.
-                sleep_value = get_configuration_value("SOURCECODE_SLEEP_PERIOD_IN_SECS", SOURCECODE_SLEEP_PERIOD_IN_SECS)
-                sleep(sleep_value)
-                wait_counter += sleep_value
-                print("{} secs have passed while source code package is being created...".format(wait_counter), flush=True)
+                print("{} secs have passed while source code package is being created...".format(int(poller.elapsed())), flush=True)
             else:
                 raise NotImplementedError("Unknown source code package status: {}.".format(pkg_status["Status"]))
 
         # When the package is created, download it using the provided key
         if link_available:
             print("Source code package {} created successfully.".format(pkg_key), flush=True)
-            pkg_link = get_environment_app_source_code_link(artifact_dir, lt_endpoint, lt_token,
-                                                            env_name=target_env, app_name=app_name, pkg_key=pkg_key)
-            if friendly_package_names:
-                target_env_key = get_environment_key(artifact_dir, lt_endpoint, lt_token, target_env)
-                running_version = get_running_app_version(artifact_dir, lt_endpoint, lt_token, target_env_key, app_name=app_name)
-                file_name = "{}_v{}".format(app_name.replace(" ", "_"), running_version["Version"].replace(".", "_"))
-                if running_version["IsModified"]:
-                    file_name += "+"
-            else:
-                file_name = pkg_key
-            file_name += ENVIRONMENT_SOURCECODE_DOWNLOAD_FILE
-            file_path = os.path.join(artifact_dir, ENVIRONMENT_SOURCECODE_FOLDER, file_name)
-
-            download_package(file_path, lt_token, pkg_link["url"])
+            file_path = download_source_code_package(artifact_dir, lt_endpoint, lt_token, target_env, app_name, pkg_key, friendly_package_names)
             print("Source code package {} downloaded successfully.".format(pkg_key), flush=True)
 
             # Extract source code for each module from downloaded package, applying post-processing actions (if requested)
-            module_count = extract_package_content(file_path, include_all_refs, remove_resources_files)
+            module_count = extract_package_content(file_path, include_all_refs, remove_resources_files, extraction_processes)
             print("{} application modules processed successfully.".format(module_count), flush=True)
+            if on_package_extracted:
+                on_package_extracted(app_name, file_path)
         else:
             print("Timeout expired while generating source code package {}. Unable to download source code for application {}.".format(pkg_key, app_name), flush=True)
 
 
+# Fetches the source code of all applications in a pipeline: every package is requested up front and all pending packages
+# are polled in a single loop. As soon as a package is created, it is downloaded and extracted by a bounded pool of workers.
+# With extraction_processes > 1 (or 0, one per CPU core), the workers extract the modules in a single process pool of that size.
+# Returns a dict with the outcome of each application and whether it succeeded, i.e. {app_name: (succeeded, message)}
+def fetch_source_code_pipelined(artifact_dir: str, lt_endpoint: str, lt_token: str, target_env: str, app_list: list, friendly_package_names: bool, include_all_refs: bool, remove_resources_files: bool, max_workers: int, extraction_processes: int = 1, on_package_extracted: callable = None):
+    results = {}
+    pending_pkgs = {}  # will contain the package key of each app whose package is still being created
+
+    # Request the creation of all source code packages
+    pkg_requests = run_lifetime_calls([get_environment_app_source_code_async(artifact_dir, lt_endpoint, lt_token, env_name=target_env, app_name=app_name)
+                                       for app_name in app_list], return_exceptions=True)
+    for app_name, pkg_details in zip(app_list, pkg_requests):
+        if isinstance(pkg_details, Exception):
+            results[app_name] = (False, "Unable to request source code package: {}".format(pkg_details))
+        else:
+            pending_pkgs[app_name] = pkg_details["PackageKey"]
+            print("[{}] Source code package {} started being created in {} environment.".format(app_name, pkg_details["PackageKey"], target_env), flush=True)
+
+    downloads = {}  # will contain the download (and extraction) job of each app whose package was created
+    last_created_in_secs = None  # time until the last package was created
+    # The module extraction process pool is shared by all workers, so the number of processes does not grow with the number of workers
+    extraction_processes = get_extraction_processes(extraction_processes)
+    with (ProcessPoolExecutor(max_workers=extraction_processes) if extraction_processes > 1 else nullcontext()) as process_pool, \
+            ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        # Wait for all packages creation to finish, handing over each package to the workers as soon as it is created
+        poller = Poller(get_configuration_value("SOURCECODE_TIMEOUT_IN_SECS", SOURCECODE_TIMEOUT_IN_SECS), get_configuration_value("SOURCECODE_SLEEP_PERIOD_IN_SECS", SOURCECODE_SLEEP_PERIOD_IN_SECS),
+                        get_expected_duration(artifact_dir, SOURCECODE_POLLING_OPERATION))
+        while pending_pkgs and poller.poll():
+            # Check current status of all pending packages
+            app_names = list(pending_pkgs)
+            pkg_statuses = run_lifetime_calls([get_environment_app_source_code_status_async(artifact_dir, lt_endpoint, lt_token, env_name=target_env,
+                                                                                            app_name=app_name, pkg_key=pending_pkgs[app_name])
+                                               for app_name in app_names], return_exceptions=True)
+            for app_name, pkg_status in zip(app_names, pkg_statuses):
+                if isinstance(pkg_status, Exception):
+                    results[app_name] = (False, "Unable to check source code package {} status: {}".format(pending_pkgs.pop(app_name), pkg_status))
+                elif pkg_status["Status"] == SOURCECODE_FINISHED_STATUS:
+                    # Package was created successfully
+                    last_created_in_secs = poller.elapsed()
+                    pkg_key = pending_pkgs.pop(app_name)
+                    print("[{}] Source code package {} created successfully.".format(app_name, pkg_key), flush=True)
+                    downloads[app_name] = executor.submit(_process_source_code_package, artifact_dir, lt_endpoint, lt_token, target_env, app_name, pkg_key,
+                                                          friendly_package_names, include_all_refs, remove_resources_files, process_pool, on_package_extracted)
+                elif pkg_status["Status"] != SOURCECODE_ONGOING_STATUS:
+                    results[app_name] = (False, "Unknown source code package {} status: {}.".format(pending_pkgs.pop(app_name), pkg_status["Status"]))
+
+            if pending_pkgs:
+                # Some packages are still being created. Go back to sleep.
+                print("{} secs have passed while {} source code packages are being created...".format(int(poller.elapsed()), len(pending_pkgs)), flush=True)
+
+        for app_name, pkg_key in pending_pkgs.items():
+            results[app_name] = (False, "Timeout expired while generating source code package {}.".format(pkg_key))
+        # A single duration sample per run (until the last package was created), since all packages are polled together
+        if last_created_in_secs is not None:
+            store_duration(artifact_dir, SOURCECODE_POLLING_OPERATION, last_created_in_secs)
+
+        # Wait for the workers to download and extract the created packages
+        for app_name, download in downloads.items():
+            try:
+                module_count = download.result()
+                results[app_name] = (True, "{} application modules processed successfully.".format(module_count))
+            except Exception as e:
+                results[app_name] = (False, "Unable to download or extract source code package: {}".format(e))
+
+    return {app_name: results[app_name] for app_name in app_list}
+
+
+# Restores the source code of the applications whose running version in the target environment is in the source code index.
+# Returns the index key of each application to fetch (None if its running version is modified, so it can't be reused)
+# and the number of modules restored for each reused application.
+def reuse_unchanged_source_code(artifact_dir: str, lt_endpoint: str, lt_token: str, target_env: str, app_list: list, sourcecode_index: SourceCodeIndex, include_all_refs: bool, remove_resources_files: bool):
+    target_env_key = get_environment_key(artifact_dir, lt_endpoint, lt_token, target_env)
+    running_versions = run_lifetime_calls([get_running_app_version_async(artifact_dir, lt_endpoint, lt_token, target_env_key, app_name=app_name) for app_name in app_list])
+    target_folder = os.path.join(artifact_dir, ENVIRONMENT_SOURCECODE_FOLDER)
+
+    index_keys = {}
+    reused_apps = {}
+    for app_name, running_version in zip(app_list, running_versions):
+        if not running_version or running_version["IsModified"]:
+            index_keys[app_name] = None
+            continue
+        index_key = get_sourcecode_index_key(target_env_key, running_version, include_all_refs, remove_resources_files)
+        module_count = sourcecode_index.restore(index_key, target_folder)
+        if module_count is None:
+            index_keys[app_name] = index_key
+        else:
+            reused_apps[app_name] = module_count
+            print("Source code of application {} (version {}) is unchanged. {} application modules reused from the source code index.".format(
+                app_name, running_version["Version"], module_count), flush=True)
+
+    return index_keys, reused_apps
+
+
+def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, target_env: str, apps: list, trigger_manifest: dict, include_test_apps: bool, friendly_package_names: bool, include_all_refs: bool, remove_resources_files: bool, pipelined: bool = False, max_workers: int = None, parallel_extraction: bool = False, sourcecode_index_dir: str = None):
+
+    # Builds the LifeTime endpoint
+    lt_endpoint = build_lt_endpoint(lt_http_proto, lt_url, lt_api_endpoint, lt_api_version)
+
+    # List of application names to fetch the source code from target environment
+    app_list = []
+
+    # Extract names from manifest file (when available)
+    if trigger_manifest:
+        for app in trigger_manifest[MANIFEST_APPLICATION_VERSIONS]:
+            if include_test_apps or not app[MANIFEST_FLAG_IS_TEST_APPLICATION]:
+                app_list.append(app[MANIFEST_APPLICATION_NAME])
+    else:
+        app_list = apps
+
+    # Number of processes used to extract the modules of each package (and post-process their .csproj files)
+    extraction_processes = 1
+    if parallel_extraction:
+        extraction_processes = get_configuration_value("SOURCECODE_EXTRACTION_MAX_PROCESSES", SOURCECODE_EXTRACTION_MAX_PROCESSES)
+
+    # Reuse the source code of the applications whose running version was already fetched in a previous run
+    reused_apps = {}
+    on_package_extracted = None
+    if sourcecode_index_dir:
+        sourcecode_index = SourceCodeIndex(sourcecode_index_dir)
+        index_keys, reused_apps = reuse_unchanged_source_code(artifact_dir, lt_endpoint, lt_token, target_env, app_list, sourcecode_index, include_all_refs, remove_resources_files)
+        app_list = [app_name for app_name in app_list if app_name not in reused_apps]
+        on_package_extracted = partial(_store_in_sourcecode_index, sourcecode_index, index_keys)
+
+    if not pipelined:
+        fetch_source_code_sequentially(artifact_dir, lt_endpoint, lt_token, target_env, app_list, friendly_package_names, include_all_refs, remove_resources_files, extraction_processes, on_package_extracted)
+        return
+
+    if max_workers is None:
+        max_workers = get_configuration_value("SOURCECODE_MAX_CONCURRENT_DOWNLOADS", SOURCECODE_MAX_CONCURRENT_DOWNLOADS)
+    results = fetch_source_code_pipelined(artifact_dir, lt_endpoint, lt_token, target_env, app_list, friendly_package_names, include_all_refs, remove_resources_files, max_workers,
+                                          extraction_processes, on_package_extracted)
+    for app_name, module_count in reused_apps.items():
+        results[app_name] = (True, "{} application modules reused from the source code index.".format(module_count))
+
+    # Print the combined summary
+    print("Source code fetch summary:", flush=True)
+    for app_name, (succeeded, message) in results.items():
+        print(" - {} [{}]: {}".format(app_name, "OK" if succeeded else "FAILED", message), flush=True)
+    failed_apps = [app_name for app_name, (succeeded, _) in results.items() if not succeeded]
+    if failed_apps:
+        print("Unable to fetch the source code for {} of {} applications.".format(len(failed_apps), len(results)), flush=True)
+        sys.exit(1)
+
+
+# ---------------------- PRIVATE METHODS ----------------------
+# Extracts a module archive and applies the post-processing actions (if requested). Runs on its own, so it can be sent to a worker process.
+def _process_module_archive(file_path: str, archive_name: str, module_name: str, spill_threshold: int, include_all_refs: bool, remove_resources_files: bool):
+    module_folder = os.path.join(os.path.dirname(file_path), "modules", module_name)
+    with ZipFile(file_path, 'r') as zf:
+        # Extract generated source code of the module to a subfolder
+        extracted_bytes, elapsed_in_secs = extract_module_archive(zf, zf.getinfo(archive_name), module_folder, spill_threshold)
+
+    # Check if any post-processing action is needed over the extracted resources
+    if (include_all_refs or remove_resources_files):
+        process_csproj_files(module_name, module_folder, include_all_refs, remove_resources_files)
+
+    return module_name, extracted_bytes, elapsed_in_secs
+
+
+# Stores a fetched package in the source code index.
+# Modified running versions can change without getting a new version key, so they have no index key and are never stored.
+def _store_in_sourcecode_index(sourcecode_index: SourceCodeIndex, index_keys: dict, app_name: str, file_path: str):
+    if index_keys[app_name]:
+        sourcecode_index.store(index_keys[app_name], file_path, [module_name for _, module_name in get_package_module_archives(file_path)])
+
+
+def _report_extracted_modules(results):
+    for module_name, extracted_bytes, elapsed_in_secs in results:
+        print("Module {} extracted: {} in {:.1f} secs ({}/s).".format(
+            module_name, bytes_human_readable_size(extracted_bytes), elapsed_in_secs,
+            bytes_human_readable_size(int(extracted_bytes / max(elapsed_in_secs, 0.001)))), flush=True)
+
+
+# Downloads and extracts a created source code package (runs in a worker thread of the pipelined mode)
+def _process_source_code_package(artifact_dir: str, lt_endpoint: str, lt_token: str, target_env: str, app_name: str, pkg_key: str, friendly_package_names: bool, include_all_refs: bool, remove_resources_files: bool, process_pool: ProcessPoolExecutor, on_package_extracted: callable):
+    file_path = download_source_code_package(artifact_dir, lt_endpoint, lt_token, target_env, app_name, pkg_key, friendly_package_names)
+    print("[{}] Source code package {} downloaded successfully.".format(app_name, pkg_key), flush=True)
+
+    # Extract source code for each module from downloaded package, applying post-processing actions (if requested)
+    module_count = extract_package_content(file_path, include_all_refs, remove_resources_files, process_pool=process_pool)
+    print("[{}] {} application modules processed successfully.".format(app_name, module_count), flush=True)
+    if on_package_extracted:
+        on_package_extracted(app_name, file_path)
+    return module_count
+
+
 # End of main()
 
 
@@ -274,6 +503,14 @@ if __name__ == "__main__":
                         help="Flag that indicates if all assemblies in the \"bin\" folder should be added as references in the .csproj file.")
     parser.add_argument("-res", "--remove_resources_files", action='store_true',
                         help="Flag that indicates if embedded resources files should be removed from the .csproj file.")
+    parser.add_argument("-p", "--pipelined", action='store_true',
+                        help="Flag that indicates if all source code packages should be requested up front and downloaded as soon as each one is created.")
+    parser.add_argument("-w", "--max_workers", type=int,
+                        help="(optional) Maximum number of source code packages downloaded and extracted at the same time, when pipelined. Default: 4")
+    parser.add_argument("-px", "--parallel_extraction", action='store_true',
+                        help="Flag that indicates if the modules of each source code package should be extracted and post-processed in parallel, using one process per CPU core.")
+    parser.add_argument("-si", "--sourcecode_index", type=str,
+                        help="(optional) Folder with the source code fetched in previous runs. Applications whose running version is unchanged are reused from it instead of fetched again.")
     parser.add_argument("-cf", "--config_file", type=str,
                         help="Config file path. Contains configuration values to override the default ones.")
 
@@ -324,6 +561,14 @@ if __name__ == "__main__":
     include_all_refs = args.include_all_refs
     # Parse Remove Resources Files flag
     remove_resources_files = args.remove_resources_files
+    # Parse Pipelined flag
+    pipelined = args.pipelined
+    # Parse Max Workers
+    max_workers = args.max_workers
+    # Parse Parallel Extraction flag
+    parallel_extraction = args.parallel_extraction
+    # Parse Source Code Index folder
+    sourcecode_index_dir = args.sourcecode_index
 
     # Calls the main script
-    main(artifact_dir, lt_http_proto, lt_url, lt_api_endpoint, lt_version, lt_token, target_env, apps, trigger_manifest, include_test_apps, friendly_package_names, include_all_refs, remove_resources_files)  # type: ignore
+    main(artifact_dir, lt_http_proto, lt_url, lt_api_endpoint, lt_version, lt_token, target_env, apps, trigger_manifest, include_test_apps, friendly_package_names, include_all_refs, remove_resources_files, pipelined, max_workers, parallel_extraction, sourcecode_index_dir)  # type: ignore
@@ -2,7 +2,6 @@
 import sys
 import os
 import argparse
-from time import sleep
 import json
 
 # Workaround for Jenkins:
@@ -20,12 +19,13 @@ from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDP
 from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFEST_APPLICATION_KEY, MANIFEST_FLAG_IS_TEST_APPLICATION, MANIFEST_APPLICATION_NAME
 from outsystems.vars.pipeline_vars import SOLUTION_TIMEOUT_IN_SECS, SOLUTION_SLEEP_PERIOD_IN_SECS, SOLUTION_CREATED_STATUS, \
     SOLUTION_READY_STATUS, SOLUTION_GATHERING_DEPENDENCIES_STATUS, SOLUTION_GETTING_BINARIES_STATUS, SOLUTION_GENERATING_META_MODEL_STATUS, \
-    SOLUTION_GENERATING_SOLUTION_STATUS, SOLUTION_COMPLETED_STATUS, SOLUTION_ABORTED_STATUS
+    SOLUTION_GENERATING_SOLUTION_STATUS, SOLUTION_COMPLETED_STATUS, SOLUTION_ABORTED_STATUS, SOLUTION_POLLING_OPERATION
 
 # Functions
 from outsystems.file_helpers.file import load_data, bytes_human_readable_size
 from outsystems.lifetime.lifetime_solutions import create_solution, get_solution_status, get_solution_url
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
+from outsystems.lifetime.lifetime_polling import Poller, get_expected_duration, store_duration
 from outsystems.lifetime.lifetime_downloads import download_package
 from outsystems.manifest.manifest_base import get_environment_details
 from outsystems.vars.vars_base import get_configuration_value, load_configuration_file
@@ -63,9 +63,7 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
     solution_key = create_solution(artifact_dir, lt_endpoint, lt_token, env_tuple[1], solution_name, application_keys, include_refs)
 
     # Wait for solution package creation to finish
-    wait_counter = 0
     package_url_available = False
-    check_status = None
     IN_PROGESS_STATUS = [SOLUTION_CREATED_STATUS, SOLUTION_READY_STATUS, SOLUTION_GATHERING_DEPENDENCIES_STATUS,
                          SOLUTION_GETTING_BINARIES_STATUS, SOLUTION_GENERATING_META_MODEL_STATUS,
                          SOLUTION_GENERATING_SOLUTION_STATUS]
@@ -84,24 +82,23 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
         print("Producer modules will also be included in the solution package", flush=True)
 
     print("Start creation of '{}' package:".format(solution_name), flush=True)
-    while wait_counter < get_configuration_value("SOLUTION_TIMEOUT_IN_SECS", SOLUTION_TIMEOUT_IN_SECS):
+    poller = Poller(get_configuration_value("SOLUTION_TIMEOUT_IN_SECS", SOLUTION_TIMEOUT_IN_SECS), get_configuration_value("SOLUTION_SLEEP_PERIOD_IN_SECS", SOLUTION_SLEEP_PERIOD_IN_SECS),
+                    get_expected_duration(artifact_dir, SOLUTION_POLLING_OPERATION),
+                    on_transition=lambda previous_status, status, elapsed_in_secs: print(" - {} - {}".format(status, get_status_message(status)), flush=True))
+    while poller.poll():
         # Check current package status
         solution_status = get_solution_status(artifact_dir, lt_endpoint, lt_token, env_tuple[1], solution_key)
         if solution_status["Status"] == SOLUTION_COMPLETED_STATUS:
             # Package was created successfully
             package_url_available = True
+            store_duration(artifact_dir, SOLUTION_POLLING_OPERATION, poller.elapsed())
             break
         elif solution_status["Status"] == SOLUTION_ABORTED_STATUS:
             print(" - {}. Reason: {}".format(solution_status["Status"], solution_status["StatusReason"]), flush=True)
             exit(1)
         elif solution_status["Status"] in IN_PROGESS_STATUS:
             # Solution package is still being created. Go back to sleep.
-            sleep_value = get_configuration_value("SOLUTION_SLEEP_PERIOD_IN_SECS", SOLUTION_SLEEP_PERIOD_IN_SECS)
-            sleep(sleep_value)
-            wait_counter += sleep_value
-            if check_status != solution_status["Status"]:
-                print(" - {} - {}".format(solution_status["Status"], get_status_message(solution_status["Status"])), flush=True)
-                check_status = solution_status["Status"]
+            poller.observe(solution_status["Status"])
         else:
             raise NotImplementedError("Unknown solution code status: {}.".format(solution_status["Status"]))
 
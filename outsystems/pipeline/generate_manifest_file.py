@@ -13,7 +13,7 @@ else:  # Else just add the project dir
 
 # Custom Modules
 # Variables
-from outsystems.vars.file_vars import ARTIFACT_FOLDER
+from outsystems.vars.file_vars import ARTIFACT_FOLDER, ENVIRONMENTS_CACHE_TTL_IN_SECS
 from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDPOINT, LIFETIME_API_VERSION, DEPLOYMENT_MESSAGE
 from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFEST_ENVIRONMENT_DEFINITIONS, MANIFEST_DEPLOYMENT_NOTES, \
     MANIFEST_APPLICATION_KEY, MANIFEST_APPLICATION_NAME, MANIFEST_APPLICATION_VERSION_KEY, MANIFEST_APPLICATION_VERSION_NUMBER, \
@@ -22,15 +22,16 @@ from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFES
 
 # Functions
 from outsystems.lifetime.lifetime_environments import get_environments, get_environment_deployment_zones
-from outsystems.lifetime.lifetime_applications import get_running_app_version, get_application_data
+from outsystems.lifetime.lifetime_async import run_lifetime_calls, get_running_app_version_async, get_application_data_async
 from outsystems.file_helpers.file import store_data
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
+from outsystems.vars.vars_base import get_configuration_value
 
 
 # Function that will build the info required for the environments
 def generate_manifest_env_info(artifact_dir: str, lt_endpoint: str, lt_token: str):
-    # Gets all infra environments information
-    infra_envs = get_environments(artifact_dir, lt_endpoint, lt_token)
+    # Gets all infra environments information (reusing a warm cache from previous stages, since environments rarely change)
+    infra_envs = get_environments(artifact_dir, lt_endpoint, lt_token, get_configuration_value("ENVIRONMENTS_CACHE_TTL_IN_SECS", ENVIRONMENTS_CACHE_TTL_IN_SECS))
 
     # Trims info to include only the desired env info (Name and Key)
     env_info = [{MANIFEST_ENVIRONMENT_KEY: env["Key"], MANIFEST_ENVIRONMENT_NAME: env["Name"], MANIFEST_ENVIRONMENT_LABEL: env["Name"]} for env in infra_envs if "Name" in env and "Key" in env]
@@ -44,17 +45,17 @@ def generate_manifest_app_info(artifact_dir: str, lt_endpoint: str, lt_token: st
 
     deployment_zones = get_environment_deployment_zones(artifact_dir, lt_endpoint, lt_token, env_key=src_env_key)
 
-    # Creates a list with the details for the apps you want to deploy
-    for app_name in app_list:
-        # Removes whitespaces in the beginning and end of the string
-        app_name = app_name.strip()
-
-        # Get the app running version on the source environment. It will only retrieve tagged applications
-        app_info = get_running_app_version(artifact_dir, lt_endpoint, lt_token, src_env_key, app_name=app_name)
+    # Get the app running version on the source environment (it will only retrieve tagged applications) and its module info
+    async def get_app_details(app_name: str):
+        app_info = await get_running_app_version_async(artifact_dir, lt_endpoint, lt_token, src_env_key, app_name=app_name)
+        app_module_data = await get_application_data_async(artifact_dir, lt_endpoint, lt_token, True, app_key=app_info[MANIFEST_APPLICATION_KEY])
+        return app_info, app_module_data
 
-        # Get the module info
-        app_module_data = get_application_data(artifact_dir, lt_endpoint, lt_token, True, app_key=app_info[MANIFEST_APPLICATION_KEY])
+    # Removes whitespaces in the beginning and end of the app names and queries LifeTime concurrently
+    app_details = run_lifetime_calls([get_app_details(app_name.strip()) for app_name in app_list])
 
+    # Creates a list with the details for the apps you want to deploy
+    for app_info, app_module_data in app_details:
         # Get deployment zone info
         deployment_zone_key = next((item['DeploymentZoneKey'] for item in app_module_data['AppStatusInEnvs'] if item['EnvironmentKey'] == src_env_key), None)
         deployment_zone_name = next((item['Name'] for item in deployment_zones if item['Key'] == deployment_zone_key), None)
@@ -0,0 +1,104 @@
+# Python Modules
+import os
+import sys
+import argparse
+import glob
+
+# Workaround for Jenkins:
+# Set the path to include the outsystems module
+# Jenkins exposes the workspace directory through env.
+if "WORKSPACE" in os.environ:
+    sys.path.append(os.environ['WORKSPACE'])
+else:  # Else just add the project dir
+    sys.path.append(os.getcwd())
+
+# Custom Modules
+# Variables
+from outsystems.vars.file_vars import ARTIFACT_FOLDER, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE, JUNIT_TEST_RESULTS_FILE, JUNIT_SHARD_TEST_RESULTS_FILE
+# Functions
+from outsystems.bdd_framework.bdd_parallel_runner import get_bdd_test_name, BDD_TEST_ERROR
+from outsystems.bdd_framework.bdd_junit import load_junit_results, write_junit_results
+from outsystems.bdd_framework.bdd_sharding import update_test_durations
+from outsystems.bdd_framework.bdd_test_selection import record_tested_versions
+from outsystems.bdd_framework.bdd_flakiness import update_flakiness_scores, get_failed_tests
+from outsystems.file_helpers.file import load_data, check_file
+from outsystems.vars.vars_base import load_configuration_file
+
+
+# ---------------------- SCRIPT ----------------------
+# Combines the JUnit XML files of the test shards (run by evaluate_test_results --shard) into a single JUnit XML file and
+# updates the duration and flakiness history of the tests. Tests of the endpoints file with no result in any shard are reported as errors.
+# The duration history is stored in durations_file (the shared file the next shards are split with), if set.
+# Returns True if every test passed.
+def main(artifact_dir: str, shard_files: list = None, durations_file: str = None):
+    if not shard_files:
+        shard_files = sorted(glob.glob(os.path.join(artifact_dir, JUNIT_SHARD_TEST_RESULTS_FILE.format("*", "*"))))
+    if not shard_files:
+        raise FileNotFoundError("No test shard results were found in {}.".format(artifact_dir))
+
+    test_results = {}
+    for shard_file in shard_files:
+        for test_result in load_junit_results(shard_file):
+            if test_result["TestName"] in test_results:
+                print("Test {} ran in more than one shard. Keeping its first result.".format(test_result["TestName"]), flush=True)
+                continue
+            test_results[test_result["TestName"]] = test_result
+        print("Loaded test results from {}.".format(shard_file), flush=True)
+    update_test_durations(artifact_dir, list(test_results.values()), durations_file)
+    update_flakiness_scores(artifact_dir, list(test_results.values()))
+    started_on = min((test_result["Timestamp"] for test_result in test_results.values() if test_result["Timestamp"]), default="")
+
+    # The merged results follow the order of the test endpoints, if available
+    filename = os.path.join(BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE)
+    if check_file(artifact_dir, filename):
+        merged_results = []
+        for test_endpoint in load_data(artifact_dir, filename):
+            test_name = get_bdd_test_name(test_endpoint)
+            if test_name in test_results:
+                merged_results.append(test_results.pop(test_name))
+            else:
+                # Happens when a shard did not run, or the shards were split with different duration histories or shard counts
+                print("Test {} did not run in any shard.".format(test_name), flush=True)
+                merged_results.append({"TestName": test_name, "Timestamp": started_on, "Duration": 0.0, "Outcome": BDD_TEST_ERROR, "ErrorType": "MissingTestResult",
+                                       "Message": "Test did not run in any shard.", "Details": None})
+        merged_results.extend(test_results.values())
+    else:
+        merged_results = list(test_results.values())
+
+    write_junit_results(os.path.join(artifact_dir, JUNIT_TEST_RESULTS_FILE), merged_results)
+
+    failed_tests = get_failed_tests(merged_results)
+    print("Merged {} BDD test results from {} shards: {} passed, {} failed.".format(
+        len(merged_results), len(shard_files), len(merged_results) - len(failed_tests), len(failed_tests)), flush=True)
+    if not failed_tests:
+        record_tested_versions(artifact_dir)
+    return len(failed_tests) == 0
+
+
+if __name__ == '__main__':
+    # Argument menu / parsing
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", "--artifacts", type=str, help="Name of the artifacts folder. Default: \"Artifacts\"", default=ARTIFACT_FOLDER)
+    parser.add_argument("-sf", "--shard_files", type=str,
+                        help="Comma separated list of the JUnit XML files of the test shards. Default: every junit-result.<index>-of-<count>.xml file in the artifacts folder")
+    parser.add_argument("-df", "--durations_file", type=str,
+                        help="Duration history file shared by every shard (see evaluate_test_results --durations_file). Default: the history in the artifacts folder")
+    parser.add_argument("-cf", "--config_file", type=str,
+                        help="Config file path. Contains configuration values to override the default ones.")
+
+    args = parser.parse_args()
+
+    # Load config file if exists
+    if args.config_file:
+        load_configuration_file(args.config_file)
+    # Parse the artifact directory
+    # Assumes the default dir = Artifacts
+    artifact_dir = args.artifacts
+    # Parse the shard files
+    shard_files = args.shard_files.split(',') if args.shard_files else []
+    # Parse the duration history file
+    durations_file = args.durations_file
+
+    # Calls the main script
+    if not main(artifact_dir, shard_files, durations_file):
+        sys.exit(1)
@@ -17,51 +17,22 @@ from outsystems.vars.bdd_vars import BDD_HTTP_PROTO, BDD_API_ENDPOINT, BDD_CLIEN
 from outsystems.vars.cicd_vars import PROBE_HTTP_PROTO, PROBE_API_ENDPOINT, PROBE_API_VERSION
 from outsystems.vars.file_vars import ARTIFACT_FOLDER, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE
 from outsystems.bdd_framework.bdd_base import build_bdd_endpoint, build_bdd_test_endpoint
-from outsystems.cicd_probe.cicd_scan import scan_bdd_test_endpoint
+from outsystems.cicd_probe.cicd_scan import scan_bdd_test_endpoints
 from outsystems.cicd_probe.cicd_base import build_probe_endpoint
+from outsystems.bdd_framework.bdd_test_selection import load_tested_versions, get_affected_test_apps, store_versions_under_test, \
+    clear_versions_under_test
 from outsystems.file_helpers.file import store_data, load_data
 from outsystems.vars.vars_base import load_configuration_file
-from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFEST_APPLICATION_NAME, MANIFEST_FLAG_IS_TEST_APPLICATION
+from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS, MANIFEST_APPLICATION_NAME, MANIFEST_APPLICATION_VERSION_KEY, \
+    MANIFEST_FLAG_IS_TEST_APPLICATION
 # Exceptions
 from outsystems.exceptions.invalid_parameters import InvalidParametersError
-# Functions
-# Variables
 
-# ---------------------- VARS ----------------------
-# Set script local variables
-bdd_test = []  # will contain the BDD Framework tests for each app
-bdd_modules = 0  # will count the number of bdd test modules
-test_names = []  # will contain the names of the tests to run
-test_list = []  # will contain the webflows output from BDD for the application
-test_urls = []  # will contain the urls for the BDD framework
 
-
-# ---------------------- SCRIPT ----------------------
-def main(artifact_dir: str, apps: list, trigger_manifest: dict, bdd_http_proto: str, bdd_url: str, bdd_api_endpoint: str,
-         bdd_client_api_endpoint: str, bdd_version: int, cicd_http_proto: str, cicd_url: str, cicd_api_endpoint: str,
-         cicd_version: int, cicd_key: str, exclude_pattern: str):
-    # use the script variables
-    global bdd_test, bdd_modules, test_names, test_list, test_urls
-
-    probe_endpoint = build_probe_endpoint(
-        cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version)
-    bdd_endpoint = build_bdd_endpoint(
-        bdd_http_proto, bdd_url, bdd_api_endpoint, bdd_version)
-    bdd_endpoint_client = build_bdd_endpoint(
-        bdd_http_proto, bdd_url, bdd_client_api_endpoint, bdd_version)
-
-    # Extract application list from manifest (if needed)
-    if trigger_manifest:
-        app_versions = trigger_manifest[MANIFEST_APPLICATION_VERSIONS]
-        apps = [app_version[MANIFEST_APPLICATION_NAME] for app_version in app_versions if app_version[MANIFEST_FLAG_IS_TEST_APPLICATION]]
-
-    # Query the CICD probe
-    for app in apps:
-        # Removes whitespaces in the beginning and end of the string
-        app = app.strip()
-        response = scan_bdd_test_endpoint(artifact_dir, probe_endpoint, app, cicd_key, exclude_pattern, cicd_version)
-        if len(response) == 0:
-            continue  # It has no test suites, continue the loop
+# Gets the BDD test modules from the CICD Probe scan results of the applications (in the same order)
+def get_bdd_test_modules(scan_results: list, cicd_version: int):
+    bdd_test = []  # will contain the BDD Framework tests for each app
+    for response in scan_results:
         for test_endpoint in response:
             # Get the BDD test endpoints information, per module
             if cicd_version == 1 and "WebFlows" in test_endpoint["BDDTestEndpointsInfo"]:
@@ -73,31 +44,12 @@ def main(artifact_dir: str, apps: list, trigger_manifest: dict, bdd_http_proto:
                               "TestFlows": test_endpoint["TestFlows"]}]
             else:
                 raise NotImplementedError("Unsupported CICD Probe API version ({}).".format(cicd_version))
-        # Increment bdd modules counter
-        bdd_modules += len(response)
+    return bdd_test
 
-    print("{} BDD module(s) found.".format(bdd_modules), flush=True)
 
-    # Get the tests to run (just for presentation)
-    for bdd in bdd_test:  # For each BDD test
-        if cicd_version == 1:
-            for webflow in bdd["WebFlows"]:  # For each webflow
-                if "WebScreens" in webflow:  # Sanity check to see if there are actual webscreens in the flow
-                    test_list += webflow["WebScreens"]
-        elif cicd_version == 2:
-            for testflow in bdd["TestFlows"]:  # For each uiflow
-                if "TestScreens" in testflow:  # Sanity check to see if there are actual testscreens in the flow
-                    test_list += testflow["TestScreens"]
-
-    print("{} BDD endpoint(s) scanned successfully.".format(len(test_list)), flush=True)
-
-    # Get the names of the tests to run (just for presentation)
-    for test in test_list:
-        test_names.append(test["Name"])
-    print("Tests to run: {}".format(test_names), flush=True)
-
-    # For each test, generate the URL to query the BDD framework, to be used in the test class
-    test_urls = []
+# Generates the URL to query the BDD framework for each test of the BDD test modules, i.e. a list of dicts with TestSuite, Name and URL
+def get_test_urls(bdd_test: list, cicd_version: int, bdd_endpoint: str, bdd_endpoint_client: str):
+    test_urls = []  # will contain the urls for the BDD framework
     for bdd in bdd_test:  # For each BDD test module
         if cicd_version == 1:
             for webflow in bdd["WebFlows"]:  # For each webflow
@@ -118,11 +70,66 @@ def main(artifact_dir: str, apps: list, trigger_manifest: dict, bdd_http_proto:
                             target_bdd_endpoint, bdd["EspaceName"], testscreen["Name"])
                         test_urls.append(
                             {"TestSuite": bdd["EspaceName"], "Name": testscreen["Name"], "URL": test_endpoint})
+    return test_urls
+
+
+# ---------------------- SCRIPT ----------------------
+# Scans the BDD test endpoints of the test apps and stores them in the test endpoints file. Returns the test endpoints.
+def main(artifact_dir: str, apps: list, trigger_manifest: dict, bdd_http_proto: str, bdd_url: str, bdd_api_endpoint: str,
+         bdd_client_api_endpoint: str, bdd_version: int, cicd_http_proto: str, cicd_url: str, cicd_api_endpoint: str,
+         cicd_version: int, cicd_key: str, exclude_pattern: str, select_changed: bool = False, tested_versions_file: str = None, smoke_test_apps: list = None):
+    probe_endpoint = build_probe_endpoint(
+        cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version)
+    bdd_endpoint = build_bdd_endpoint(
+        bdd_http_proto, bdd_url, bdd_api_endpoint, bdd_version)
+    bdd_endpoint_client = build_bdd_endpoint(
+        bdd_http_proto, bdd_url, bdd_client_api_endpoint, bdd_version)
+
+    # Versions under test are only recorded when selecting the test apps by the changed apps
+    clear_versions_under_test(artifact_dir)
+
+    # Version keys of the apps, used to reuse the scans of the same app versions (only known from the manifest)
+    version_keys = {}
+    # Extract application list from manifest (if needed)
+    if trigger_manifest:
+        app_versions = trigger_manifest[MANIFEST_APPLICATION_VERSIONS]
+        apps = [app_version[MANIFEST_APPLICATION_NAME] for app_version in app_versions if app_version[MANIFEST_FLAG_IS_TEST_APPLICATION]]
+        version_keys = {app_version[MANIFEST_APPLICATION_NAME]: app_version[MANIFEST_APPLICATION_VERSION_KEY] for app_version in app_versions}
+
+        # Only keep the test apps affected by the apps changed since the last tested versions (plus the smoke test apps)
+        if select_changed:
+            # The artifacts folder is usually new in each run, so the tested versions must be kept elsewhere
+            if not tested_versions_file:
+                raise InvalidParametersError("--select_changed requires --tested_versions_file (a file kept between pipeline runs)")
+            tested_versions = load_tested_versions(tested_versions_file, bdd_url)
+            if not tested_versions:
+                print("No tested versions were recorded for {} in {}. Every test application is selected.".format(bdd_url, tested_versions_file), flush=True)
+            affected_apps = get_affected_test_apps(artifact_dir, probe_endpoint, cicd_key, app_versions, tested_versions)
+            smoke_test_apps = [app.strip() for app in smoke_test_apps or []]
+            apps = [app for app in apps if app in affected_apps or app in smoke_test_apps] + \
+                [app for app in smoke_test_apps if app not in apps]
+            print("{} affected test application(s) selected: {}".format(len(apps), apps), flush=True)
+            store_versions_under_test(artifact_dir, tested_versions_file, bdd_url, app_versions)
+    elif select_changed:
+        raise InvalidParametersError("--select_changed requires a manifest file")
+
+    # Query the CICD probe (removes whitespaces in the beginning and end of each app name)
+    apps = [app.strip() for app in apps]
+    scan_results = scan_bdd_test_endpoints(artifact_dir, probe_endpoint, [(app, version_keys.get(app)) for app in apps], cicd_key, exclude_pattern, cicd_version)
+    bdd_test = get_bdd_test_modules(scan_results, cicd_version)
+    print("{} BDD module(s) found.".format(len(bdd_test)), flush=True)
+
+    # For each test, generate the URL to query the BDD framework, to be used by the test runner
+    test_urls = get_test_urls(bdd_test, cicd_version, bdd_endpoint, bdd_endpoint_client)
+    print("{} BDD endpoint(s) scanned successfully.".format(len(test_urls)), flush=True)
+    # Get the names of the tests to run (just for presentation)
+    print("Tests to run: {}".format([test_url["Name"] for test_url in test_urls]), flush=True)
 
     # Save the test results in a file for later processing
     filename = os.path.join(BDD_FRAMEWORK_FOLDER,
                             BDD_FRAMEWORK_TEST_ENDPOINTS_FILE)
     store_data(artifact_dir, filename, test_urls)
+    return test_urls
 
 
 # end of main()
@@ -154,6 +161,12 @@ if __name__ == "__main__":
                         help="(optional) Used to set the API endpoint for BDD Framework Client-side, without the version. Default: \"TestRunner_API/rest\"", default=BDD_CLIENT_API_ENDPOINT)
     parser.add_argument("--bdd_framework_version", type=int,
                         help="(optional) BDD Framework API version number. Default: 1", default=BDD_API_VERSION)
+    parser.add_argument("--select_changed", action='store_true',
+                        help="(optional) Only scans the test apps of the manifest affected by the apps changed since the versions last tested in the target environment (see --tested_versions_file).")
+    parser.add_argument("--tested_versions_file", type=str,
+                        help="(optional) File with the versions last tested in each environment, kept between runs (e.g. on the agent). Required by --select_changed.")
+    parser.add_argument("--smoke_test_apps", type=str,
+                        help="(optional) Comma separated list of test apps that are always scanned, when --select_changed is used. Example: \"App1 Tests,App2_Tests\"")
     parser.add_argument("-cf", "--config_file", type=str,
                         help="Config file path. Contains configuration values to override the default ones.")
 
@@ -214,7 +227,13 @@ if __name__ == "__main__":
     cicd_key = args.cicd_probe_key
     # Parse Exclude Pattern regex
     exclude_pattern = args.exclude_pattern
+    # Parse Select Changed flag
+    select_changed = args.select_changed
+    # Parse Tested Versions file
+    tested_versions_file = args.tested_versions_file
+    # Parse Smoke Test App list
+    smoke_test_apps = args.smoke_test_apps.split(',') if args.smoke_test_apps else []
 
     # Calls the main script
     main(artifact_dir, apps, manifest_file, bdd_http_proto, bdd_url, bdd_api_endpoint, bdd_client_api_endpoint, bdd_version,
-         cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version, cicd_key, exclude_pattern)
+         cicd_http_proto, cicd_url, cicd_api_endpoint, cicd_version, cicd_key, exclude_pattern, select_changed, tested_versions_file, smoke_test_apps)
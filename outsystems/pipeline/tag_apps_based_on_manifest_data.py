@@ -2,6 +2,7 @@
 import sys
 import os
 import argparse
+import asyncio
 from packaging.version import Version
 
 # Workaround for Jenkins:
@@ -16,12 +17,14 @@ else:  # Else just add the project dir
 # Variables
 from outsystems.vars.file_vars import ARTIFACT_FOLDER
 from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDPOINT, LIFETIME_API_VERSION
+from outsystems.vars.pipeline_vars import TAG_STATUS_TAGGED, TAG_STATUS_SKIPPED
 
 # Functions
 from outsystems.file_helpers.file import load_data
 from outsystems.lifetime.lifetime_environments import get_environment_key
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
-from outsystems.lifetime.lifetime_applications import set_application_version, get_running_app_version
+from outsystems.lifetime.lifetime_applications import set_application_version, get_running_app_version, print_tagging_report
+from outsystems.lifetime.lifetime_async import run_lifetime_calls
 from outsystems.vars.vars_base import load_configuration_file
 # Exceptions
 from outsystems.exceptions.invalid_parameters import InvalidParametersError
@@ -39,6 +42,22 @@ def valid_tag_number(artifact_dir: str, lt_endpoint: str, lt_token: str, env_nam
     return False
 
 
+# Tags an application version in the destination environment and returns its tagging result (see print_tagging_report)
+def tag_manifest_app(lt_endpoint: str, lt_token: str, dest_env: str, dest_env_key: str, app_name: str, app_key: str, change_log: str, version: str):
+    set_application_version(lt_endpoint, lt_token, dest_env_key, app_key, change_log, version, None)
+    print("{} application successuflly tagged as {} on {}".format(app_name, version, dest_env), flush=True)
+    return {"ApplicationName": app_name, "Status": TAG_STATUS_TAGGED, "Version": version, "Details": None}
+
+
+# Tags an application version of the trigger manifest, if its version number is greater than the one running in the destination environment
+def tag_trigger_manifest_app(artifact_dir: str, lt_endpoint: str, lt_token: str, dest_env: str, dest_env_key: str, deployed_app: dict):
+    if valid_tag_number(artifact_dir, lt_endpoint, lt_token, dest_env, dest_env_key, deployed_app):
+        return tag_manifest_app(lt_endpoint, lt_token, dest_env, dest_env_key, deployed_app["ApplicationName"], deployed_app["ApplicationKey"],
+                                deployed_app["ChangeLog"], deployed_app["VersionNumber"])
+    return {"ApplicationName": deployed_app["ApplicationName"], "Status": TAG_STATUS_SKIPPED, "Version": None,
+            "Details": "Current tag is greater than or equal to {}".format(deployed_app["VersionNumber"])}
+
+
 def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, dest_env: str, app_list: list, dep_manifest: list, trigger_manifest: dict, include_test_apps: bool):
     # Builds the LifeTime endpoint
     lt_endpoint = build_lt_endpoint(lt_http_proto, lt_url, lt_api_endpoint, lt_api_version)
@@ -47,19 +66,26 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
 
     # the app versions MUST come from that a file
     # either deployment or trigger manifest file
+    app_names = []
+    tagging_calls = []
     if dep_manifest:
+        app_list = set(app_list)
         for deployed_app in dep_manifest:
             if deployed_app["ApplicationName"] in app_list:
-                set_application_version(lt_endpoint, lt_token, dest_env_key, deployed_app["ApplicationKey"], deployed_app["ChangeLog"], deployed_app["Version"], None)
-                print("{} application successuflly tagged as {} on {}".format(deployed_app["ApplicationName"], deployed_app["Version"], dest_env), flush=True)
+                app_names.append(deployed_app["ApplicationName"])
+                tagging_calls.append(asyncio.to_thread(tag_manifest_app, lt_endpoint, lt_token, dest_env, dest_env_key, deployed_app["ApplicationName"],
+                                                       deployed_app["ApplicationKey"], deployed_app["ChangeLog"], deployed_app["Version"]))
     elif trigger_manifest:
         for deployed_app in trigger_manifest["ApplicationVersions"]:
             if not deployed_app["IsTestApplication"] or (deployed_app["IsTestApplication"] and include_test_apps):
-                if valid_tag_number(artifact_dir, lt_endpoint, lt_token, dest_env, dest_env_key, deployed_app):
-                    set_application_version(lt_endpoint, lt_token, dest_env_key, deployed_app["ApplicationKey"], deployed_app["ChangeLog"], deployed_app["VersionNumber"], None)
-                    print("{} application successuflly tagged as {} on {}".format(deployed_app["ApplicationName"], deployed_app["VersionNumber"], dest_env), flush=True)
-                else:
-                    continue
+                app_names.append(deployed_app["ApplicationName"])
+                tagging_calls.append(asyncio.to_thread(tag_trigger_manifest_app, artifact_dir, lt_endpoint, lt_token, dest_env, dest_env_key, deployed_app))
+
+    # Tags the applications concurrently
+    results = run_lifetime_calls(tagging_calls, return_exceptions=True)
+    errors = print_tagging_report(app_names, results)
+    if errors:
+        raise errors[0]
 
 # End of main()
 
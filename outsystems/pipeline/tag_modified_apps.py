@@ -2,6 +2,7 @@
 import sys
 import os
 import argparse
+import asyncio
 
 # Workaround for Jenkins:
 # Set the path to include the outsystems module
@@ -17,12 +18,14 @@ from outsystems.vars.file_vars import ARTIFACT_FOLDER
 from outsystems.vars.lifetime_vars import LIFETIME_HTTP_PROTO, LIFETIME_API_ENDPOINT, LIFETIME_API_VERSION
 from outsystems.vars.pipeline_vars import MAX_VERSIONS_TO_RETURN, TAG_APP_MAX_RETRIES
 from outsystems.vars.manifest_vars import MANIFEST_APPLICATION_VERSIONS
+from outsystems.vars.pipeline_vars import TAG_STATUS_TAGGED, TAG_STATUS_SKIPPED
 
 # Functions
-from outsystems.lifetime.lifetime_applications import get_applications, get_running_app_version, get_application_versions
+from outsystems.lifetime.lifetime_applications import get_applications, get_application_version, get_application_versions
+from outsystems.lifetime.lifetime_async import run_lifetime_calls
 from outsystems.lifetime.lifetime_environments import get_environment_key
 from outsystems.lifetime.lifetime_base import build_lt_endpoint
-from outsystems.lifetime.lifetime_applications import set_application_version
+from outsystems.lifetime.lifetime_applications import set_application_version, print_tagging_report
 from outsystems.file_helpers.file import load_data
 from outsystems.vars.vars_base import load_configuration_file, get_configuration_value
 
@@ -50,6 +53,45 @@ def generate_new_version_number(base_version: str):
     return "{}.{}.{}".format(maj, min, rev)
 
 
+# Tags the running version of a modified application (with the environment status of the bulk applications response) with the
+# next available version number: the revision of the running version is incremented until it is not one of the last versions
+# of the application, up to TAG_APP_MAX_RETRIES times. Modified native shells are tagged with their next revision as well.
+# Returns the tagging result of the application (see print_tagging_report).
+def tag_modified_app(artifact_dir: str, lt_endpoint: str, lt_token: str, dest_env: str, env_key: str, app_detail: dict, app_env_detail: dict, log_msg: str):
+    running_version = get_application_version(artifact_dir, lt_endpoint, lt_token, False, app_env_detail["BaseApplicationVersionKey"], app_key=app_detail["Key"])
+    generated_tag = generate_new_version_number(running_version["Version"])
+
+    # List of the last application tags
+    tag_history_list = [d["Version"] for d in get_application_versions(artifact_dir, lt_endpoint, lt_token, get_configuration_value("MAX_VERSIONS_TO_RETURN", MAX_VERSIONS_TO_RETURN), app_key=app_detail["Key"])]
+
+    # Finds next available tag number
+    retries = 0
+    while retries < get_configuration_value("TAG_APP_MAX_RETRIES", TAG_APP_MAX_RETRIES):
+        if generated_tag in tag_history_list:
+            generated_tag = generate_new_version_number(generated_tag)
+        else:
+            # Checks if app is mobile and gets mobile info
+            app_mobile_detail = list(filter(lambda x: x["IsModified"], app_env_detail["MobileAppsStatus"]))
+
+            # Will contain the List of mobile versions to tag
+            native_shell_versions = []
+
+            # Generate new version number for each native shell
+            if app_mobile_detail:
+                for native_shell in app_mobile_detail:
+                    native_shell_versions.append({"NativePlatform": native_shell["NativePlatform"], "VersionNumber": generate_new_version_number(native_shell["VersionNumber"]), "VersionDescription": log_msg})
+
+            set_application_version(lt_endpoint, lt_token, env_key, app_detail["Key"], log_msg, generated_tag, native_shell_versions)
+            print("Application '{}' successfully tagged to version {} on environment '{}'".format(app_detail["Name"], generated_tag, dest_env), flush=True)
+            return {"ApplicationName": app_detail["Name"], "Status": TAG_STATUS_TAGGED, "Version": generated_tag, "Details": "Previous version: {}".format(running_version["Version"])}
+
+        retries += 1
+
+    print("Could not find available tag for Application '{}' ".format(app_detail["Name"]), flush=True)
+    return {"ApplicationName": app_detail["Name"], "Status": TAG_STATUS_SKIPPED, "Version": None,
+            "Details": "No available tag after {} attempts (last tried: {})".format(retries, generated_tag)}
+
+
 def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: str, lt_api_version: int, lt_token: str, dest_env: str, apps: list, trigger_manifest: dict, log_msg: str):
     # Builds the LifeTime endpoint
     lt_endpoint = build_lt_endpoint(lt_http_proto, lt_url, lt_api_endpoint, lt_api_version)
@@ -57,54 +99,36 @@ def main(artifact_dir: str, lt_http_proto: str, lt_url: str, lt_api_endpoint: st
     # Get the environment key
     env_key = get_environment_key(artifact_dir, lt_endpoint, lt_token, dest_env)
 
-    # Get all applications info
+    # Get all applications info, indexed by name
     all_apps = get_applications(artifact_dir, lt_endpoint, lt_token, True)
+    apps_by_name = {}
+    for app_detail in all_apps:
+        apps_by_name.setdefault(app_detail["Name"], app_detail)
 
     # Use trigger_manifest or apps list
     app_list = trigger_manifest[MANIFEST_APPLICATION_VERSIONS] if trigger_manifest else apps
     trigger_in_use = bool(trigger_manifest)
 
+    app_names = []
+    tagging_calls = []
     for app in app_list:
-
         app_name = app["ApplicationName"] if trigger_in_use else app
         # Gets application specific details
-        app_detail = list(filter(lambda x: x["Name"] == app_name, all_apps))
-
-        if len(app_detail):
-            # Checks if application is modified in target env
-            app_env_detail = list(filter(lambda x: x["EnvironmentKey"] == env_key and x["IsModified"], app_detail[0]["AppStatusInEnvs"]))
-
-            if len(app_env_detail):
-                current_tag = get_running_app_version(artifact_dir, lt_endpoint, lt_token, env_key, app_name=app_name)
-                generated_tag = generate_new_version_number(current_tag["Version"])
-
-                # List of the last application tags
-                tag_history_list = [d["Version"] for d in get_application_versions(artifact_dir, lt_endpoint, lt_token, get_configuration_value("MAX_VERSIONS_TO_RETURN", MAX_VERSIONS_TO_RETURN), app_name=app_name)]
-
-                # Finds next available tag number
-                retries = 0
-                while retries < get_configuration_value("TAG_APP_MAX_RETRIES", TAG_APP_MAX_RETRIES):
-                    if generated_tag in tag_history_list:
-                        generated_tag = generate_new_version_number(generated_tag)
-                    else:
-                        # Checks if app is mobile and gets mobile info
-                        app_mobile_detail = list(filter(lambda x: x["IsModified"], app_env_detail[0]["MobileAppsStatus"]))
-
-                        # Will contain the List of mobile versions to tag
-                        native_shell_versions = []
-
-                        # Generate new version number for each native shell
-                        if app_mobile_detail:
-                            for native_shell in app_mobile_detail:
-                                native_shell_versions.append({"NativePlatform": native_shell["NativePlatform"], "VersionNumber": generate_new_version_number(native_shell["VersionNumber"]), "VersionDescription": log_msg})
-
-                        set_application_version(lt_endpoint, lt_token, env_key, current_tag["ApplicationKey"], log_msg, generated_tag, native_shell_versions)
-                        print("Application '{}' successfully tagged to version {} on environment '{}'".format(current_tag["ApplicationName"], generated_tag, dest_env), flush=True)
-                        break
-
-                    retries += 1
-                    if retries == get_configuration_value("TAG_APP_MAX_RETRIES", TAG_APP_MAX_RETRIES):
-                        print("Could not find available tag for Application '{}' ".format(current_tag["ApplicationName"]), flush=True)
+        app_detail = apps_by_name.get(app_name)
+        if app_detail is None:
+            continue
+        # Checks if application is modified in target env
+        app_env_detail = next((x for x in app_detail["AppStatusInEnvs"] if x["EnvironmentKey"] == env_key and x["IsModified"]), None)
+        if app_env_detail is None:
+            continue
+        app_names.append(app_name)
+        tagging_calls.append(asyncio.to_thread(tag_modified_app, artifact_dir, lt_endpoint, lt_token, dest_env, env_key, app_detail, app_env_detail, log_msg))
+
+    # Tags the modified applications concurrently
+    results = run_lifetime_calls(tagging_calls, return_exceptions=True)
+    errors = print_tagging_report(app_names, results)
+    if errors:
+        raise errors[0]
 
 # End of main()
 
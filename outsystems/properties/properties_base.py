@@ -1,10 +1,9 @@
-# Python Modules
-import requests
-
 # Custom Modules
 from outsystems.exceptions.invalid_json_response import InvalidJsonResponseError
 from outsystems.vars.properties_vars import PROPERTIES_API_HTTP_PROTO, PROPERTIES_API_ENDPOINT, PROPERTIES_API_VERSION, PROPERTIES_API_SSL_CERT_VERIFY
+from outsystems.vars.http_vars import PROPERTIES_HTTP_SESSION
 # Functions
+from outsystems.http_helpers.http_retry import send_http_request
 from outsystems.vars.vars_base import get_configuration_value
 
 
@@ -21,8 +20,8 @@ def send_properties_put_request(lt_url: str, token: str, api_endpoint: str, payl
     # Format the request URL to include the api endpoint
     properties_api_url = build_properties_api_url(PROPERTIES_API_HTTP_PROTO, lt_url, PROPERTIES_API_ENDPOINT, PROPERTIES_API_VERSION)
     request_string = "{}/{}".format(properties_api_url, api_endpoint)
-    response = requests.put(
-        request_string, data=payload, json=None, headers=headers, verify=get_configuration_value("PROPERTIES_API_SSL_CERT_VERIFY", PROPERTIES_API_SSL_CERT_VERIFY))
+    response = send_http_request(
+        PROPERTIES_HTTP_SESSION, "PUT", request_string, data=payload, json=None, headers=headers, verify=get_configuration_value("PROPERTIES_API_SSL_CERT_VERIFY", PROPERTIES_API_SSL_CERT_VERIFY))
     response_obj = {"http_status": response.status_code, "response": {}}
     if len(response.text) > 0:
         try:
@@ -10,3 +10,20 @@ BDD_FRAMEWORK_TYPE_CLIENT = "client"
 # Test Runner Endpoint Variables
 BDD_TEST_RUNNER_ENDPOINT = "BDDTestRunner"
 BDD_RUNNER_SUCCESS_CODE = 200
+# Maximum time (in seconds) waiting for the response of a test run, i.e. for the whole test suite to run. None means no limit
+BDD_TEST_TIMEOUT_IN_SECS = None
+
+# Test Execution Variables
+BDD_MAX_CONCURRENT_TESTS = 4
+
+# Test Sharding Variables
+# Expected duration of the tests with no duration history
+BDD_TEST_DEFAULT_DURATION_IN_SECS = 30
+# Weight of the last duration of a test in its duration history (moving average)
+BDD_TEST_DURATION_HISTORY_WEIGHT = 0.3
+
+# Test Retry Variables
+# Maximum number of times a test that did not pass is run again
+BDD_TEST_MAX_RETRIES = 0
+# Weight of the last run in the flakiness score of a test (moving average)
+BDD_TEST_FLAKINESS_HISTORY_WEIGHT = 0.2
@@ -3,6 +3,8 @@ PROBE_HTTP_PROTO = "https"
 PROBE_API_ENDPOINT = "CI_CDProbe/rest"
 PROBE_API_VERSION = 1
 PROBE_API_SSL_CERT_VERIFY = True
+# Maximum number of CI/CD Probe requests running at the same time
+PROBE_MAX_CONCURRENT_REQUESTS = 8
 
 # Scan Endpoints
 SCAN_BDD_TESTS_ENDPOINT = "ScanBDDTestEndpoints"
@@ -11,3 +13,5 @@ PROBE_SCAN_SUCCESS_CODE = 200
 # Application Dependencies Endpoint
 GET_APPLICATION_DEPENDENCIES_ENDPOINT = "GetApplicationDependencies"
 PROBE_DEPENDENCIES_SUCCESS_CODE = 200
+# Folder kept between pipeline runs where the application dependencies are cached. None caches them in the artifacts folder
+PROBE_DEPENDENCIES_CACHE_DIR = None
@@ -1,3 +1,3 @@
 # DotNet specific
 MS_BUILD_NAMESPACE = 'http://schemas.microsoft.com/developer/msbuild/2003'
-ASSEMBLY_BLACKLIST = ["System.ComponentModel.Annotations"]
+ASSEMBLY_BLACKLIST = frozenset(["System.ComponentModel.Annotations"])
@@ -46,10 +46,16 @@ PROBE_FOLDER = "cicd_probe_data"
 # BDD Framework vars
 BDD_FRAMEWORK_TEST_RUN_FILE = ".testrun.cache"
 BDD_FRAMEWORK_TEST_ENDPOINTS_FILE = "test.endpoints.cache"
+BDD_FRAMEWORK_TEST_DURATIONS_FILE = "test.durations.cache"
+BDD_FRAMEWORK_TEST_FLAKINESS_FILE = "test.flakiness.cache"
+# Application versions under test (recorded as tested once the tests pass)
+BDD_FRAMEWORK_TEST_VERSIONS_FILE = "test.versions.cache"
 BDD_FRAMEWORK_FOLDER = "bdd_data"
 
 # JUNIT vars
 JUNIT_TEST_RESULTS_FILE = "junit-result.xml"
+# Results of a shard of the tests, e.g. junit-result.2-of-4.xml
+JUNIT_SHARD_TEST_RESULTS_FILE = "junit-result.{}-of-{}.xml"
 
 # Architecture Dashboard vars
 AD_FILE_PREFIX = "TechDebt"
@@ -61,10 +67,38 @@ AD_FOLDER = "techdebt_data"
 
 # AirGap vars
 DEPLOYMENT_ORDER_FILE = "sorted_oap.list"
+APPLICATION_OAP_DEPLOY_LOG_FILE = ".deploy.log"
 
 # Solutions vars
 SOLUTIONS_OSP_FILE = ".osp"
 SOLUTIONS_LINK_FILE = ".link.cache"
 SOLUTIONS_STATUS_FILE = ".status.cache"
 SOLUTIONS_DEPLOY_FILE = ".deploy.cache"
+SOLUTIONS_DEPLOY_LOG_FILE = ".deploy.log"
 SOLUTIONS_FOLDER = "solution_data"
+
+# Downloads vars
+DOWNLOAD_PARTIAL_FILE = ".part"
+FILE_DIGEST_FILE = ".sha256"
+FILE_DIGEST_CHUNK_SIZE_IN_BYTES = 1024 * 1024
+
+# Cache vars
+# Metadata (fetch time, source endpoint and API version) stored next to each cache entry
+CACHE_METADATA_FILE = ".meta"
+# How long (in seconds) each kind of cache entry can be reused, including across pipeline stages on the same agent
+ENVIRONMENTS_CACHE_TTL_IN_SECS = 6 * 60 * 60
+APPLICATIONS_CACHE_TTL_IN_SECS = 15 * 60
+
+# Polling vars
+POLLING_HISTORY_FILE = "polling_history.cache"
+
+# Source code index vars
+SOURCECODE_INDEX_FILE = "sourcecode_index.cache"
+SOURCECODE_INDEX_MODULES_FOLDER = "modules"
+
+# OAP store vars
+OAP_STORE_MANIFEST_FILE = "oap_store.cache"
+# Lock file serializing the manifest updates (and evictions) of every process using the store
+OAP_STORE_LOCK_FILE = "oap_store.lock"
+# Maximum total size of the OAPs kept in the store. The least recently used ones are evicted above it
+OAP_STORE_MAX_SIZE_IN_BYTES = 10 * 1024 * 1024 * 1024
@@ -0,0 +1,45 @@
+# HTTP Connection Pool Variables
+# Number of per-host connection pools cached by each shared session
+HTTP_POOL_CONNECTIONS = 10
+# Maximum number of keep-alive connections kept per host
+HTTP_POOL_MAXSIZE = 10
+# Block (instead of opening extra connections) when the pool is exhausted
+HTTP_POOL_BLOCK = False
+
+# Shared session names
+LIFETIME_HTTP_SESSION = "lifetime"
+PROBE_HTTP_SESSION = "cicd_probe"
+BDD_HTTP_SESSION = "bdd_framework"
+PROPERTIES_HTTP_SESSION = "properties_api"
+AD_HTTP_SESSION = "architecture_dashboard"
+
+# HTTP Timeout Variables
+HTTP_CONNECT_TIMEOUT_IN_SECS = 30
+# No read timeout by default, since some calls (e.g. creating solution or source code packages) can take very long
+HTTP_READ_TIMEOUT_IN_SECS = None
+
+# HTTP Retry Variables
+# Failed requests are retried with exponential backoff (plus jitter), up to the max number of retries
+HTTP_MAX_RETRIES = 4
+HTTP_RETRY_BACKOFF_BASE_IN_SECS = 1
+HTTP_RETRY_BACKOFF_MAX_IN_SECS = 30
+# Total time the whole run is allowed to spend waiting between retries (shared by all requests)
+HTTP_RETRY_BUDGET_IN_SECS = 300
+HTTP_RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+HTTP_TOO_MANY_REQUESTS_CODE = 429
+# Methods that can be safely repeated, even if the server already processed the first attempt
+HTTP_IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+
+# HTTP Transfer Variables
+# Downloads are streamed to disk in chunks of this size, so memory usage does not depend on the file size
+HTTP_DOWNLOAD_CHUNK_SIZE_IN_BYTES = 1024 * 1024
+# Number of times an interrupted download is resumed (using HTTP Range requests) before giving up
+HTTP_DOWNLOAD_MAX_RESUMES = 5
+# Maximum number of downloads from the same host running at the same time
+HTTP_MAX_TRANSFERS_PER_HOST = 4
+HTTP_SUCCESS_CODE = 200
+HTTP_PARTIAL_CONTENT_CODE = 206
+# Maximum upload rate for binary uploads (e.g. deployment packages). 0 means unlimited
+HTTP_UPLOAD_MAX_BYTES_PER_SEC = 0
+# Minimum interval between upload progress messages
+HTTP_UPLOAD_PROGRESS_INTERVAL_IN_SECS = 10
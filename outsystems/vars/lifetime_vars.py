@@ -3,6 +3,8 @@ LIFETIME_HTTP_PROTO = "https"
 LIFETIME_API_ENDPOINT = "lifetimeapi/rest"
 LIFETIME_API_VERSION = 2
 LIFETIME_SSL_CERT_VERIFY = True
+# Max number of LifeTime API calls running at the same time when fanning out requests
+LIFETIME_MAX_CONCURRENT_REQUESTS = 8
 
 # Applications Endpoint Variables
 # Application list specific
@@ -17,12 +17,22 @@ DEPLOY_ERROR_FILE = "DeploymentErrors"
 # Application specific variables
 MAX_VERSIONS_TO_RETURN = 10
 TAG_APP_MAX_RETRIES = 5
+# Tagging results of an application
+TAG_STATUS_TAGGED = "Tagged"
+TAG_STATUS_SKIPPED = "Skipped"
+TAG_STATUS_FAILED = "Failed"
+OAP_EXPORT_MAX_CONCURRENCY = 4
+OAP_EXPORT_MAX_RETRIES = 3
 
 # Environment specific variables
 SOURCECODE_TIMEOUT_IN_SECS = 3600
 SOURCECODE_SLEEP_PERIOD_IN_SECS = 10
 SOURCECODE_ONGOING_STATUS = "InProgress"
 SOURCECODE_FINISHED_STATUS = "Done"
+SOURCECODE_MAX_CONCURRENT_DOWNLOADS = 4
+SOURCECODE_MODULE_SPILL_THRESHOLD_IN_BYTES = 32 * 1024 * 1024
+SOURCECODE_EXTRACTION_CHUNK_SIZE_IN_BYTES = 1024 * 1024
+SOURCECODE_EXTRACTION_MAX_PROCESSES = 0
 
 # Solutions specific variables
 SOLUTION_TIMEOUT_IN_SECS = 3600
@@ -35,3 +45,24 @@ SOLUTION_GENERATING_META_MODEL_STATUS = "Generating Meta Model"
 SOLUTION_GENERATING_SOLUTION_STATUS = "Generating Solution"
 SOLUTION_COMPLETED_STATUS = "Completed"
 SOLUTION_ABORTED_STATUS = "Aborted"
+
+# OSPTool specific variables
+# Messages in the OSPTool execution log that mean the deployment failed
+OSPTOOL_ERROR_VALIDATIONS = ["Incompatible Dependency", "Execution Plan Abort", "Outdated Consumer", "Missing Configuration"]
+# Maximum number of OSPTool deployments running at the same time, when deploying in waves
+OSPTOOL_MAX_PARALLEL_DEPLOYMENTS = 4
+# Number of (last) OSPTool output lines kept in memory for error reporting. The whole output is streamed to a log file
+OSPTOOL_LOG_TAIL_LINES = 200
+
+# Polling specific variables
+# Status polling starts at the initial interval and backs off (by the backoff factor) up to the sleep period of each wait loop
+POLLING_INITIAL_INTERVAL_IN_SECS = 2
+POLLING_BACKOFF_FACTOR = 2
+# When the usual duration of an operation is known, polling only speeds up once this fraction of it has elapsed
+POLLING_EXPECTED_DURATION_RATIO = 0.8
+# Weight of the last duration of an operation in its duration history (moving average)
+POLLING_DURATION_HISTORY_WEIGHT = 0.3
+# Names of the operations whose duration is recorded to adjust the polling of the next runs
+DEPLOYMENT_POLLING_OPERATION = "deployment"
+SOURCECODE_POLLING_OPERATION = "sourcecode"
+SOLUTION_POLLING_OPERATION = "solution"
@@ -58,7 +58,6 @@ CLASSIFIERS = [
 REQUIREMENTS = [
     'python-dateutil==2.9.0.post0',
     'requests==2.32.5',
-    'unittest-xml-reporting==3.2.0',
     'xunitparser==1.3.4',
     'toposort==1.10',
     'python-dotenv==1.0.1',
@@ -72,6 +71,7 @@ PACKAGES = [
     'outsystems.cicd_probe',
     'outsystems.exceptions',
     'outsystems.file_helpers',
+    'outsystems.http_helpers',
     'outsystems.lifetime',
     'outsystems.manifest',
     'outsystems.osp_tool',
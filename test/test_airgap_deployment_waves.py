@@ -0,0 +1,46 @@
+import os
+from unittest import mock
+
+import pytest
+
+from outsystems.cicd_probe import cicd_dependencies
+from outsystems.exceptions.osptool_error import OSPToolDeploymentError
+from outsystems.pipeline import deploy_apps_to_target_env_with_airgap
+from outsystems.pipeline.deploy_apps_to_target_env_with_airgap import generate_deployment_waves, deploy_apps_oap_in_waves
+
+
+def _build_app(name: str):
+    return {"app_name": name, "app_version": "1.0", "app_key": name.lower(), "version_key": "{}_v1".format(name), "filename": "{}.oap".format(name)}
+
+
+def test_waves_follow_dependency_levels_and_skip_producers_not_deployed(tmp_path):
+    app_oap_list = [_build_app(name) for name in ("Portal", "Core", "Theme", "Orders")]
+    dependencies = {"portal": {"orders", "theme"}, "core": {"external"}, "theme": set(), "orders": {"core"}}
+
+    def send_probe_get_request(probe_endpoint, api_endpoint, api_key, params):
+        return {"http_status": 200, "response": [{"ApplicationKey": key} for key in dependencies[params["ApplicationName"].lower()]]}
+
+    with mock.patch.object(cicd_dependencies, "send_probe_get_request", side_effect=send_probe_get_request):
+        waves = generate_deployment_waves(str(tmp_path), "probe", "key", app_oap_list)
+
+    assert [[app["app_name"] for app in wave] for wave in waves] == [["Core", "Theme"], ["Orders"], ["Portal"]]
+
+
+def test_failed_wave_stops_the_following_waves(tmp_path):
+    os.makedirs(os.path.join(str(tmp_path), "application_oap"))
+    waves = [[_build_app("Core"), _build_app("Theme")], [_build_app("Portal")]]
+    deployed = []
+
+    def call_osptool(osp_tool_path, package_file_path, env_hostname, credentials, catalogmappings_path, live_output_callback, log_file_path):
+        deployed.append(os.path.basename(package_file_path))
+        execution_log = "Outdated Consumer found\n" if package_file_path.endswith("Theme.oap") else "Done\n"
+        with open(log_file_path, "w") as f:
+            f.write(execution_log)
+        return 0, execution_log
+
+    with mock.patch.object(deploy_apps_to_target_env_with_airgap, "call_osptool", side_effect=call_osptool), \
+            pytest.raises(OSPToolDeploymentError, match="wave 1"):
+        deploy_apps_oap_in_waves(str(tmp_path), "env", "osptool", "user pass", waves, 2)
+
+    assert sorted(deployed) == ["Core.oap", "Theme.oap"]
+    assert os.path.isfile(os.path.join(str(tmp_path), "application_oap", "Core.oap.deploy.log"))
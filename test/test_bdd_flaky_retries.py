@@ -0,0 +1,57 @@
+import json
+import os
+import time
+from collections import Counter
+from unittest import mock
+
+import xunitparser
+
+from outsystems.bdd_framework import bdd_parallel_runner
+from outsystems.bdd_framework.bdd_flakiness import load_flakiness_scores
+from outsystems.bdd_framework.bdd_junit import load_junit_results
+from outsystems.bdd_framework.bdd_sharding import load_test_durations
+from outsystems.pipeline import evaluate_test_results
+from outsystems.vars.file_vars import BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE, JUNIT_TEST_RESULTS_FILE
+
+TEST_ENDPOINTS = [{"TestSuite": "Suite", "Name": name, "URL": "https://bdd/{}".format(name)} for name in ("Flaky", "Broken", "Stable")]
+
+
+def test_only_failed_tests_are_retried_and_quarantined_tests_do_not_fail_the_build(tmp_path):
+    artifact_dir = str(tmp_path)
+    os.makedirs(os.path.join(artifact_dir, BDD_FRAMEWORK_FOLDER))
+    with open(os.path.join(artifact_dir, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE), "w") as endpoints_file:
+        json.dump(TEST_ENDPOINTS, endpoints_file)
+    calls = Counter()
+
+    def fake_run_bdd_test(url):
+        calls[url] += 1
+        if url.endswith("Flaky") and calls[url] == 1:
+            time.sleep(0.2)
+        if url.endswith("Broken") or (url.endswith("Flaky") and calls[url] == 1):
+            raise NotImplementedError("There was an error. Response from server: timeout")
+        return {"SuiteSuccess": True}
+
+    with mock.patch.object(bdd_parallel_runner, "run_bdd_test", side_effect=fake_run_bdd_test):
+        assert evaluate_test_results.main(artifact_dir, 2, max_retries=2, quarantine=["test_Suite__Broken"])
+
+    assert calls == {"https://bdd/Flaky": 2, "https://bdd/Broken": 3, "https://bdd/Stable": 1}
+
+    junit_file_path = os.path.join(artifact_dir, JUNIT_TEST_RESULTS_FILE)
+    with open(junit_file_path) as junit_file:
+        _, test_run = xunitparser.parse(junit_file)
+    assert test_run.testsRun == 3 and not test_run.failures and not test_run.errors and len(test_run.skipped) == 1
+
+    test_results = {test_result["TestName"]: test_result for test_result in load_junit_results(junit_file_path)}
+    assert test_results["test_Suite__Flaky"]["Flaky"]
+    assert [attempt["Outcome"] for attempt in test_results["test_Suite__Flaky"]["Attempts"]] == ["error", "passed"]
+    assert test_results["test_Suite__Broken"]["Quarantined"] and test_results["test_Suite__Broken"]["Outcome"] == "error"
+    assert len(test_results["test_Suite__Broken"]["Attempts"]) == 3
+    assert "Attempts" not in test_results["test_Suite__Stable"]
+
+    scores = load_flakiness_scores(artifact_dir)
+    assert scores["test_Suite__Flaky"] == {"Runs": 1, "FlakyRuns": 1, "Score": 0.2}
+    assert scores["test_Suite__Broken"]["FlakyRuns"] == 0
+
+    # The duration history only records the last attempt of each test
+    durations = load_test_durations(artifact_dir)
+    assert test_results["test_Suite__Flaky"]["Duration"] >= 0.2 and durations["test_Suite__Flaky"] < 0.1
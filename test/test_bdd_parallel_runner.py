@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+from unittest import mock
+
+import xunitparser
+
+from outsystems.bdd_framework import bdd_parallel_runner
+from outsystems.bdd_framework.bdd_junit import write_junit_results
+from outsystems.bdd_framework.bdd_parallel_runner import run_bdd_tests
+
+TEST_ENDPOINTS = [{"TestSuite": "Shared", "Name": "Screen{}".format(i), "URL": "https://bdd/Shared/{}".format(i)} for i in range(3)] + \
+                 [{"TestSuite": "Isolated", "Name": "Screen{}".format(i), "URL": "https://bdd/Isolated/{}".format(i)} for i in range(3)]
+
+
+def test_run_bdd_tests_runs_concurrently_but_serializes_suites():
+    running = {"Shared": 0, "Isolated": 0}
+    max_running = {"Shared": 0, "Isolated": 0}
+    lock = threading.Lock()
+
+    def fake_run_bdd_test(url):
+        suite = url.split("/")[-2]
+        with lock:
+            running[suite] += 1
+            max_running[suite] = max(max_running[suite], running[suite])
+        time.sleep(0.1)
+        with lock:
+            running[suite] -= 1
+        if url.endswith("Isolated/1"):
+            return {"SuiteSuccess": False, "ErrorMessage": "", "FailedScenarios": 1, "SuccessfulScenarios": 2, "FailureReports": ["Scenario failed"]}
+        if url.endswith("Isolated/2"):
+            raise NotImplementedError("There was an error.")
+        return {"SuiteSuccess": True}
+
+    with mock.patch.object(bdd_parallel_runner, "run_bdd_test", side_effect=fake_run_bdd_test):
+        test_results = run_bdd_tests(TEST_ENDPOINTS, 6, ["Shared"])
+
+    assert max_running == {"Shared": 1, "Isolated": 3}
+    assert [test_result["TestName"] for test_result in test_results] == ["test_{}__{}".format(e["TestSuite"], e["Name"]) for e in TEST_ENDPOINTS]
+    assert [test_result["Outcome"] for test_result in test_results] == ["passed"] * 4 + ["failure", "error"]
+    assert all(test_result["Duration"] >= 0.1 for test_result in test_results)
+
+
+def test_write_junit_results_is_readable_by_junit_parsers(tmp_path):
+    test_results = [
+        {"TestName": "test_Suite__Ok", "Outcome": "passed", "Message": None, "Details": None, "Timestamp": "2026-10-18T10:00:00", "Duration": 1.5},
+        {"TestName": "test_Suite__Failed", "Outcome": "failure", "Message": "\nBDD Test Suite failed 1 scenarios (in 2)\n", "Details": "\nBDD Test Suite failed 1 scenarios (in 2)\n",
+         "Timestamp": "2026-10-18T10:00:01", "Duration": 2.25},
+        {"TestName": "test_Suite__Error", "Outcome": "error", "Message": "Timeout", "ErrorType": "NotImplementedError", "Details": "Traceback...",
+         "Timestamp": "2026-10-18T10:00:02", "Duration": 0.5}]
+    file_path = os.path.join(str(tmp_path), "junit-result.xml")
+
+    write_junit_results(file_path, test_results, 2.5)
+
+    with open(file_path) as junit_file:
+        test_suite, test_run = xunitparser.parse(junit_file)
+    assert test_run.testsRun == 3
+    assert len(test_run.failures) == 1 and len(test_run.errors) == 1
+    assert str(test_run.failures[0][0]).split("test_")[1].split(" ")[0] == "Suite__Failed"
+    assert sorted(test_case.time.total_seconds() for test_case in test_suite) == [0.5, 1.5, 2.25]
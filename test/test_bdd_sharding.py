@@ -0,0 +1,71 @@
+import json
+import os
+from unittest import mock
+
+from outsystems.bdd_framework import bdd_parallel_runner
+from outsystems.bdd_framework.bdd_junit import load_junit_results
+from outsystems.bdd_framework.bdd_sharding import get_test_shard, load_test_durations, update_test_durations
+from outsystems.pipeline import evaluate_test_results, merge_test_results
+from outsystems.vars.file_vars import BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE, JUNIT_TEST_RESULTS_FILE
+
+TEST_ENDPOINTS = [{"TestSuite": "Suite{}".format(i % 3), "Name": "Screen{}".format(i), "URL": "https://bdd/{}".format(i)} for i in range(9)]
+
+
+def test_get_test_shard_balances_durations_and_keeps_grouped_suites_together():
+    durations = {"test_Suite{}__Screen{}".format(i % 3, i): duration for i, duration in enumerate([10, 9, 8, 7, 6, 5, 4, 3, 2])}
+
+    shards = [get_test_shard(TEST_ENDPOINTS, index, 3, durations) for index in range(1, 4)]
+
+    assert sorted(e["Name"] for shard in shards for e in shard) == sorted(e["Name"] for e in TEST_ENDPOINTS)
+    loads = [sum(durations["test_{}__{}".format(e["TestSuite"], e["Name"])] for e in shard) for shard in shards]
+    assert max(loads) - min(loads) <= 2
+    # The tests of each shard keep the original order
+    assert all(shard == sorted(shard, key=TEST_ENDPOINTS.index) for shard in shards)
+
+    grouped_shards = [get_test_shard(TEST_ENDPOINTS, index, 3, durations, ["Suite0"]) for index in range(1, 4)]
+    assert sum(1 for shard in grouped_shards if any(e["TestSuite"] == "Suite0" for e in shard)) == 1
+
+
+def test_sharded_runs_are_merged_into_a_single_report(tmp_path):
+    artifact_dir = str(tmp_path)
+    os.makedirs(os.path.join(artifact_dir, BDD_FRAMEWORK_FOLDER))
+    with open(os.path.join(artifact_dir, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE), "w") as endpoints_file:
+        json.dump(TEST_ENDPOINTS, endpoints_file)
+
+    def fake_run_bdd_test(url):
+        return {"SuiteSuccess": not url.endswith("/4"), "ErrorMessage": "Scenario failed"}
+
+    with mock.patch.object(bdd_parallel_runner, "run_bdd_test", side_effect=fake_run_bdd_test):
+        shard_outcomes = [evaluate_test_results.main(artifact_dir, 2, None, (index, 2)) for index in (1, 2)]
+    assert sorted(shard_outcomes) == [False, True]
+    assert not merge_test_results.main(artifact_dir)
+
+    test_results = load_junit_results(os.path.join(artifact_dir, JUNIT_TEST_RESULTS_FILE))
+    assert [test_result["TestName"] for test_result in test_results] == ["test_{}__{}".format(e["TestSuite"], e["Name"]) for e in TEST_ENDPOINTS]
+    assert [test_result["TestName"] for test_result in test_results if test_result["Outcome"] != "passed"] == ["test_Suite1__Screen4"]
+    assert sorted(load_test_durations(artifact_dir)) == sorted(test_result["TestName"] for test_result in test_results)
+
+
+def test_shards_are_split_with_the_shared_duration_history_only(tmp_path):
+    durations_file = str(tmp_path / "shared" / "test.durations.cache")
+    # Each agent has its own artifacts folder, with a different local duration history
+    artifact_dirs = [str(tmp_path / "agent{}".format(index)) for index in (1, 2)]
+    for index, artifact_dir in enumerate(artifact_dirs):
+        os.makedirs(os.path.join(artifact_dir, BDD_FRAMEWORK_FOLDER))
+        with open(os.path.join(artifact_dir, BDD_FRAMEWORK_FOLDER, BDD_FRAMEWORK_TEST_ENDPOINTS_FILE), "w") as endpoints_file:
+            json.dump(TEST_ENDPOINTS, endpoints_file)
+        update_test_durations(artifact_dir, [{"TestName": "test_Suite{}__Screen{}".format(i % 3, i), "Duration": (i + index * 7) % 9} for i in range(9)])
+    update_test_durations(artifact_dirs[0], [{"TestName": "test_Suite{}__Screen{}".format(i % 3, i), "Duration": 100 if i == 0 else 1} for i in range(9)],
+                          durations_file)
+
+    for shared_file in (None, durations_file):
+        ran_urls = []
+        with mock.patch.object(bdd_parallel_runner, "run_bdd_test", side_effect=lambda url: ran_urls.append(url) or {"SuiteSuccess": True}):
+            for index, artifact_dir in enumerate(artifact_dirs, start=1):
+                assert evaluate_test_results.main(artifact_dir, 2, None, (index, 2), durations_file=shared_file)
+        assert sorted(ran_urls) == sorted(e["URL"] for e in TEST_ENDPOINTS)
+
+    # The longest test of the shared history runs alone in its shard
+    with mock.patch.object(bdd_parallel_runner, "run_bdd_test", return_value={"SuiteSuccess": True}):
+        evaluate_test_results.main(artifact_dirs[0], 2, None, (1, 2), durations_file=durations_file)
+    assert [test_result["TestName"] for test_result in load_junit_results(os.path.join(artifact_dirs[0], "junit-result.1-of-2.xml"))] == ["test_Suite0__Screen0"]
@@ -0,0 +1,41 @@
+import os
+from unittest import mock
+
+from outsystems.bdd_framework import bdd_test_selection
+from outsystems.bdd_framework.bdd_test_selection import get_affected_test_apps, load_tested_versions, store_versions_under_test, record_tested_versions
+
+
+def _app_version(name: str, version_key: str, is_test: bool = False):
+    return {"ApplicationKey": name, "ApplicationName": name, "VersionKey": version_key, "VersionNumber": "1.0.0", "IsTestApplication": is_test}
+
+
+APP_VERSIONS = [_app_version("Core", "core-v2"), _app_version("Portal", "portal-v1"), _app_version("Billing", "billing-v1"),
+                _app_version("Portal Tests", "portal-tests-v1", True), _app_version("Billing Tests", "billing-tests-v1", True),
+                _app_version("Core Tests", "core-tests-v1", True)]
+# Producers of each application version (in the same order)
+DEPENDENCIES = [set(), {"Core"}, set(), {"Portal"}, {"Billing"}, set()]
+TESTED_VERSIONS = {"Core": "core-v1", "Portal": "portal-v1", "Billing": "billing-v1",
+                   "Portal Tests": "portal-tests-v1", "Billing Tests": "billing-tests-v1", "Core Tests": "core-tests-v1"}
+
+
+def test_get_affected_test_apps_follows_the_consumers_of_changed_apps():
+    with mock.patch.object(bdd_test_selection, "get_apps_dependencies", return_value=DEPENDENCIES):
+        assert get_affected_test_apps("Artifacts", "https://probe", None, APP_VERSIONS, TESTED_VERSIONS) == ["Portal Tests"]
+        # With no tested versions, every test app is affected
+        assert get_affected_test_apps("Artifacts", "https://probe", None, APP_VERSIONS, {}) == ["Portal Tests", "Billing Tests", "Core Tests"]
+
+
+def test_versions_under_test_are_recorded_per_environment(tmp_path):
+    artifact_dir = str(tmp_path)
+    tested_versions_file = os.path.join(artifact_dir, "agent", "tested.versions.cache")
+
+    store_versions_under_test(artifact_dir, tested_versions_file, "qa.example.com", APP_VERSIONS)
+    assert load_tested_versions(tested_versions_file, "qa.example.com") == {}
+
+    record_tested_versions(artifact_dir)
+    assert load_tested_versions(tested_versions_file, "qa.example.com")["Core"] == "core-v2"
+    assert load_tested_versions(tested_versions_file, "dev.example.com") == {}
+    # The versions under test are only recorded once
+    with mock.patch.object(bdd_test_selection, "store_data") as store_data:
+        record_tested_versions(artifact_dir)
+    store_data.assert_not_called()
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from outsystems.cicd_probe import cicd_dependencies
+from outsystems.cicd_probe.cicd_dependencies import get_apps_dependencies
+
+
+def test_dependencies_are_cached_by_version_key(tmp_path):
+    response = {"http_status": 200, "response": [{"ApplicationKey": "core"}, {"ApplicationKey": "theme"}]}
+    app_versions = [{"VersionKey": "v1", "Name": "Portal", "Version": "1.0"}, {"VersionKey": "v2", "Name": "Orders", "Version": "2.0"}]
+
+    with mock.patch.object(cicd_dependencies, "send_probe_get_request", return_value=response) as send_probe_get_request:
+        first_run = get_apps_dependencies(str(tmp_path), "probe", "key", app_versions)
+        second_run = get_apps_dependencies(str(tmp_path), "probe", "key", app_versions + [{"VersionKey": "v3", "Name": "Core", "Version": "1.0"}])
+
+    assert first_run == [{"core", "theme"}, {"core", "theme"}]
+    assert second_run[:2] == first_run
+    # Only the new version was queried in the second run
+    assert send_probe_get_request.call_count == 3
+
+
+def test_dependencies_cache_can_be_kept_outside_the_artifacts(tmp_path, monkeypatch):
+    response = {"http_status": 200, "response": [{"ApplicationKey": "core"}]}
+    app_versions = [{"VersionKey": "v1", "Name": "Portal", "Version": "1.0"}]
+    monkeypatch.setenv("OVERRIDE_CONFIG_IN_USE", "True")
+    monkeypatch.setenv("PROBE_DEPENDENCIES_CACHE_DIR", str(tmp_path / "cache"))
+
+    with mock.patch.object(cicd_dependencies, "send_probe_get_request", return_value=response) as send_probe_get_request:
+        # Each run has a fresh artifacts folder
+        first_run = get_apps_dependencies(str(tmp_path / "run1"), "probe", "key", app_versions)
+        second_run = get_apps_dependencies(str(tmp_path / "run2"), "probe", "key", app_versions)
+
+    assert first_run == second_run == [{"core"}]
+    assert send_probe_get_request.call_count == 1
+    assert not (tmp_path / "run1").exists()
@@ -0,0 +1,24 @@
+from unittest import mock
+
+import pytest
+
+from outsystems.lifetime import lifetime_polling
+from outsystems.pipeline import continue_deployment_to_target_env
+from outsystems.vars.pipeline_vars import DEPLOYMENT_WAITING_STATUS, DEPLOYMENT_RUNNING_STATUS
+
+
+def test_waiting_deployment_is_resumed_on_every_status_check(tmp_path):
+    statuses = [DEPLOYMENT_WAITING_STATUS, DEPLOYMENT_WAITING_STATUS, DEPLOYMENT_WAITING_STATUS, DEPLOYMENT_RUNNING_STATUS, "finished_successful"]
+    with mock.patch.object(continue_deployment_to_target_env, "get_environment_key", return_value="env-key"), \
+            mock.patch.object(continue_deployment_to_target_env, "get_running_deployment", return_value=[{"Key": "plan"}]), \
+            mock.patch.object(continue_deployment_to_target_env, "get_deployment_status",
+                              side_effect=[{"DeploymentStatus": status} for status in statuses]), \
+            mock.patch.object(continue_deployment_to_target_env, "check_deployment_two_step_deploy_status", return_value=True), \
+            mock.patch.object(continue_deployment_to_target_env, "continue_deployment") as continue_deployment, \
+            mock.patch.object(lifetime_polling, "sleep"), \
+            pytest.raises(SystemExit) as exit_info:
+        continue_deployment_to_target_env.main(str(tmp_path), "https", "lt.example.com", "lifetimeapi/rest", 2, "token", "QA", None)
+
+    assert exit_info.value.code == 0
+    # Resumed once before polling, and again on each status check that still found the deployment waiting
+    assert continue_deployment.call_count == 3
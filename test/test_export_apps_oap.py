@@ -0,0 +1,63 @@
+import os
+from unittest import mock
+
+import pytest
+
+from outsystems.exceptions.not_enough_permissions import NotEnoughPermissionsError
+from outsystems.exceptions.server_error import ServerError
+from outsystems.file_helpers.oap_store import OAPStore
+from outsystems.pipeline import deploy_apps_to_target_env_with_airgap
+from outsystems.pipeline.deploy_apps_to_target_env_with_airgap import export_apps_oap
+
+
+def _build_app_oap_list(count: int):
+    return [{"app_name": "App{}".format(i), "app_version": "1.0.{}".format(i), "app_key": "key{}".format(i),
+             "version_key": "version{}".format(i), "filename": "App{}.oap".format(i)} for i in range(count)]
+
+
+def test_export_retries_transient_failures_and_keeps_the_list(tmp_path):
+    app_oap_list = _build_app_oap_list(5)
+    expected_list = [dict(app) for app in app_oap_list]
+    failures = {"key2": 1}
+
+    def export_app_oap(file_path, endpoint, auth_token, env_key, app_key, app_version_key):
+        if failures.get(app_key):
+            failures[app_key] -= 1
+            raise ServerError("link expired")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write(app_version_key)
+
+    with mock.patch.object(deploy_apps_to_target_env_with_airgap, "export_app_oap", side_effect=export_app_oap) as export, \
+            mock.patch.object(deploy_apps_to_target_env_with_airgap, "sleep"):
+        export_apps_oap(str(tmp_path), "lt", "token", "env", app_oap_list)
+
+    assert app_oap_list == expected_list
+    assert export.call_count == 6
+    assert sorted(os.listdir(os.path.join(str(tmp_path), "application_oap"))) == ["App{}.oap".format(i) for i in range(5)]
+
+
+def test_export_does_not_retry_permanent_failures(tmp_path):
+    with mock.patch.object(deploy_apps_to_target_env_with_airgap, "export_app_oap", side_effect=NotEnoughPermissionsError("denied")) as export, \
+            pytest.raises(NotEnoughPermissionsError):
+        export_apps_oap(str(tmp_path), "lt", "token", "env", _build_app_oap_list(2))
+
+    assert export.call_count == 2
+
+
+def test_export_reuses_oaps_from_the_store(tmp_path):
+    oap_store = OAPStore(str(tmp_path / "store"))
+
+    def export_app_oap(file_path, endpoint, auth_token, env_key, app_key, app_version_key):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write(app_version_key)
+
+    with mock.patch.object(deploy_apps_to_target_env_with_airgap, "export_app_oap", side_effect=export_app_oap) as export:
+        export_apps_oap(str(tmp_path / "qa"), "lt", "token", "env", _build_app_oap_list(3), oap_store)
+        export_apps_oap(str(tmp_path / "prod"), "lt", "token", "env", _build_app_oap_list(4), oap_store)
+
+    # Only the version that was not exported in the first run is exported again
+    assert export.call_count == 4
+    assert sorted(file for file in os.listdir(os.path.join(str(tmp_path / "prod"), "application_oap")) if file.endswith(".oap")) == \
+        ["App{}.oap".format(i) for i in range(4)]
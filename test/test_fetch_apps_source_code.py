@@ -0,0 +1,189 @@
+import os
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from time import perf_counter
+from unittest import mock
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import pytest
+
+from outsystems.lifetime import lifetime_polling
+from outsystems.pipeline import fetch_apps_source_code
+from outsystems.pipeline.fetch_apps_source_code import fetch_source_code_pipelined, extract_package_content, extract_module_archive, process_csproj_files
+from outsystems.vars.dotnet_vars import MS_BUILD_NAMESPACE, ASSEMBLY_BLACKLIST
+
+
+def test_pipelined_fetch_downloads_each_package_once_created(tmp_path):
+    # Number of status checks until each package is created
+    checks_until_done = {"App1": 1, "App2": 3, "App3": 2}
+    status_checks = {app_name: 0 for app_name in checks_until_done}
+
+    async def request_package(artifact_dir, endpoint, auth_token, **kwargs):
+        if kwargs["app_name"] == "App3":
+            raise ValueError("no access")
+        return {"PackageKey": "pkg-{}".format(kwargs["app_name"])}
+
+    async def get_package_status(artifact_dir, endpoint, auth_token, **kwargs):
+        status_checks[kwargs["app_name"]] += 1
+        done = status_checks[kwargs["app_name"]] >= checks_until_done[kwargs["app_name"]]
+        return {"Status": "Done" if done else "InProgress"}
+
+    with mock.patch.object(fetch_apps_source_code, "get_environment_app_source_code_async", side_effect=request_package), \
+            mock.patch.object(fetch_apps_source_code, "get_environment_app_source_code_status_async", side_effect=get_package_status), \
+            mock.patch.object(fetch_apps_source_code, "download_source_code_package", return_value="pkg.zip") as download, \
+            mock.patch.object(fetch_apps_source_code, "extract_package_content", return_value=2), \
+            mock.patch.object(fetch_apps_source_code, "store_duration") as store_duration, \
+            mock.patch.object(lifetime_polling, "sleep"):
+        results = fetch_source_code_pipelined(str(tmp_path), "lt", "token", "Dev", ["App1", "App2", "App3"], False, False, False, 2)
+
+    assert list(results) == ["App1", "App2", "App3"]
+    assert results["App1"] == (True, "2 application modules processed successfully.")
+    assert results["App2"][0] is True
+    assert results["App3"][0] is False
+    assert status_checks == {"App1": 1, "App2": 3, "App3": 0}
+    assert sorted(call.args[5] for call in download.call_args_list) == ["pkg-App1", "pkg-App2"]
+    # A single polling duration sample is recorded for the whole run
+    store_duration.assert_called_once()
+
+
+def test_pipelined_fetch_shares_one_extraction_process_pool(tmp_path):
+    async def request_package(artifact_dir, endpoint, auth_token, **kwargs):
+        return {"PackageKey": "pkg-{}".format(kwargs["app_name"])}
+
+    async def get_package_status(artifact_dir, endpoint, auth_token, **kwargs):
+        return {"Status": "Done"}
+
+    with mock.patch.object(fetch_apps_source_code, "get_environment_app_source_code_async", side_effect=request_package), \
+            mock.patch.object(fetch_apps_source_code, "get_environment_app_source_code_status_async", side_effect=get_package_status), \
+            mock.patch.object(fetch_apps_source_code, "download_source_code_package", return_value="pkg.zip"), \
+            mock.patch.object(fetch_apps_source_code, "extract_package_content", return_value=2) as extract, \
+            mock.patch.object(fetch_apps_source_code, "ProcessPoolExecutor") as process_pool_class:
+        results = fetch_source_code_pipelined(str(tmp_path), "lt", "token", "Dev", ["App1", "App2", "App3"], False, False, False, 3, 4)
+
+    assert all(succeeded for succeeded, _ in results.values())
+    process_pool_class.assert_called_once_with(max_workers=4)
+    assert {call.kwargs["process_pool"] for call in extract.call_args_list} == {process_pool_class.return_value.__enter__.return_value}
+
+
+def _build_module_archive(files: dict):
+    module_data = BytesIO()
+    with ZipFile(module_data, "w", ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return module_data.getvalue()
+
+
+@pytest.mark.parametrize("max_processes", [1, 2])
+def test_extract_package_content_streams_module_archives(tmp_path, max_processes):
+    package_path = os.path.join(str(tmp_path), "pkg.zip")
+    with ZipFile(package_path, "w") as zf:
+        zf.writestr("Small.v1.zip", _build_module_archive({"Small.sln": "sln"}))
+        zf.writestr("Big.v3.zip", _build_module_archive({"bin/Big.dll": os.urandom(64 * 1024), "Big.sln": "sln"}))
+        zf.writestr("readme.txt", "not a module")
+
+    # A tiny threshold forces the bigger module archive to be spilled to disk
+    with mock.patch.object(fetch_apps_source_code, "get_configuration_value", return_value=1024):
+        module_count = extract_package_content(package_path, False, False, max_processes)
+
+    assert module_count == 2
+    with open(os.path.join(str(tmp_path), "modules", "Small", "Small.sln")) as f:
+        assert f.read() == "sln"
+    assert os.path.getsize(os.path.join(str(tmp_path), "modules", "Big", "bin", "Big.dll")) == 64 * 1024
+
+
+def test_extract_module_archive_spills_archives_above_the_threshold(tmp_path):
+    package_path = os.path.join(str(tmp_path), "pkg.zip")
+    with ZipFile(package_path, "w") as zf:
+        zf.writestr("Small.v1.zip", _build_module_archive({"Small.sln": "sln"}))
+        zf.writestr("Big.v3.zip", _build_module_archive({"bin/Big.dll": os.urandom(64 * 1024), "Big.sln": "sln"}))
+
+    spilled = []
+    rollover = SpooledTemporaryFile.rollover
+
+    def record_rollover(module_file):
+        spilled.append(module_file)
+        rollover(module_file)
+
+    with mock.patch.object(SpooledTemporaryFile, "rollover", autospec=True, side_effect=record_rollover), ZipFile(package_path) as zf:
+        extract_module_archive(zf, zf.getinfo("Small.v1.zip"), os.path.join(str(tmp_path), "Small"), 1024)
+        assert not spilled
+        extract_module_archive(zf, zf.getinfo("Big.v3.zip"), os.path.join(str(tmp_path), "Big"), 1024)
+        assert len(spilled) == 1
+
+    assert os.path.getsize(os.path.join(str(tmp_path), "Big", "bin", "Big.dll")) == 64 * 1024
+
+
+# Builds a synthetic module with 500 assemblies in the bin folder, half of them already referenced by the references proxy project.
+# Returns the path of the references proxy .csproj file.
+def _build_references_proxy_module(module_folder: str):
+    os.makedirs(os.path.join(module_folder, "bin"))
+    os.makedirs(os.path.join(module_folder, "referencesProxy"))
+    dll_names = ["Lib{}".format(i) for i in range(498)] + ["referencesProxy", "System.ComponentModel.Annotations"]
+    for dll_name in dll_names:
+        open(os.path.join(module_folder, "bin", "{}.dll".format(dll_name)), "w").close()
+    with open(os.path.join(module_folder, "Mod.sln"), "w") as f:
+        f.write("\nProject(\"{A}\") = \"Mod\", \"Mod.csproj\", \"{B}\"\n"
+                "Project(\"{A}\") = \"referencesProxy\", \"referencesProxy/referencesProxy.csproj\", \"{C}\"\n")
+    existing_refs = "".join("<Reference Include=\"Lib{0}\"><HintPath>../bin/Lib{0}.dll</HintPath></Reference>".format(i) for i in range(0, 498, 2))
+    csproj_file = os.path.join(module_folder, "referencesProxy", "referencesProxy.csproj")
+    with open(csproj_file, "w") as f:
+        f.write("<Project xmlns=\"{}\"><ItemGroup>{}</ItemGroup></Project>".format(MS_BUILD_NAMESPACE, existing_refs))
+    return csproj_file
+
+
+# Previous implementation of the references proxy rewrite: an XPath lookup over the whole .csproj for every assembly in the bin folder
+def _add_missing_references_per_dll_lookup(module_folder: str, csproj_file: str):
+    ns = "{" + MS_BUILD_NAMESPACE + "}"
+    ET.register_namespace('', MS_BUILD_NAMESPACE)
+    tree = ET.parse(csproj_file)
+    itemgroup_elem = tree.find("./{ns}ItemGroup".format(ns=ns))
+    for file in os.listdir(os.path.join(module_folder, "bin")):
+        if file.endswith(".dll"):
+            dll_name = os.path.splitext(file)[0]
+            dll_relpath = os.path.join(os.path.relpath(module_folder, os.path.dirname(csproj_file)), 'bin', file)
+            dll_exists = tree.find("./{ns}ItemGroup/{ns}Reference/{ns}HintPath[.='{dll}']".format(ns=ns, dll=dll_relpath)) is not None
+            if dll_name == os.path.splitext(os.path.basename(csproj_file))[0] or dll_exists or dll_name in ASSEMBLY_BLACKLIST:
+                continue
+            ref = ET.SubElement(itemgroup_elem, "Reference", {"Include": dll_name})
+            ET.SubElement(ref, "Name").text = dll_name
+            ET.SubElement(ref, "HintPath").text = dll_relpath
+            ET.SubElement(ref, "Private").text = "False"
+    tree.write(csproj_file)
+
+
+def test_process_csproj_files_adds_missing_references_once(tmp_path):
+    module_folder = str(tmp_path)
+    csproj_file = _build_references_proxy_module(module_folder)
+
+    process_csproj_files("Mod", module_folder, True, False)
+
+    ns = "{" + MS_BUILD_NAMESPACE + "}"
+    hintpaths = [elem.text for elem in ET.parse(csproj_file).iterfind("./{ns}ItemGroup/{ns}Reference/{ns}HintPath".format(ns=ns))]
+    assert len(hintpaths) == len(set(hintpaths)) == 498
+    assert "../bin/referencesProxy.dll" not in hintpaths
+    assert "../bin/System.ComponentModel.Annotations.dll" not in hintpaths
+
+
+# Micro-benchmark over the synthetic 500 assemblies module: the indexed rewrite against the previous per-assembly XPath lookup
+# (best of a few runs each, on a fresh copy of the module). Run with "pytest -s" to see the timings.
+def test_process_csproj_files_benchmark(tmp_path):
+    runs = 3
+    indexed_times = []
+    per_dll_lookup_times = []
+    for run in range(runs):
+        module_folder = str(tmp_path / "indexed{}".format(run))
+        _build_references_proxy_module(module_folder)
+        started_on = perf_counter()
+        process_csproj_files("Mod", module_folder, True, False)
+        indexed_times.append(perf_counter() - started_on)
+
+        module_folder = str(tmp_path / "lookup{}".format(run))
+        csproj_file = _build_references_proxy_module(module_folder)
+        started_on = perf_counter()
+        _add_missing_references_per_dll_lookup(module_folder, csproj_file)
+        per_dll_lookup_times.append(perf_counter() - started_on)
+
+    print("\nprocess_csproj_files with 500 assemblies: {:.1f} ms indexed, {:.1f} ms with a lookup per assembly".format(
+        min(indexed_times) * 1000, min(per_dll_lookup_times) * 1000))
+    assert min(indexed_times) < min(per_dll_lookup_times)
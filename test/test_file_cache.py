@@ -0,0 +1,30 @@
+import os
+import stat
+
+from outsystems.file_helpers.cache import store_cache, load_cache
+from outsystems.file_helpers.file import store_data
+
+
+def test_cache_entry_is_only_reused_within_max_age_and_same_endpoint(tmp_path):
+    artifact_dir = str(tmp_path)
+    endpoint = "https://lifetime/lifetimeapi/rest/v2"
+    store_cache(artifact_dir, "environments.cache", [{"Name": "Dev"}], endpoint)
+
+    assert load_cache(artifact_dir, "environments.cache", endpoint, 60) == [{"Name": "Dev"}]
+    assert load_cache(artifact_dir, "environments.cache", endpoint, 0) is None
+    assert load_cache(artifact_dir, "environments.cache", "https://other/lifetimeapi/rest/v2", 60) is None
+
+
+def test_cache_entry_without_metadata_is_not_reused(tmp_path):
+    artifact_dir = str(tmp_path)
+    store_data(artifact_dir, "applications.cache", [{"Name": "App1"}])
+
+    assert load_cache(artifact_dir, "applications.cache", "https://lifetime/lifetimeapi/rest/v2", 60) is None
+
+
+def test_stored_data_follows_the_umask(tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    store_data(str(tmp_path), "manifest.cache", {"Name": "App1"})
+
+    assert stat.S_IMODE(os.stat(str(tmp_path / "manifest.cache")).st_mode) == 0o666 & ~umask
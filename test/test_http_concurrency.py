@@ -0,0 +1,37 @@
+# Python Modules
+import asyncio
+import threading
+
+# Custom Modules
+from outsystems.http_helpers.http_concurrency import run_bounded
+
+
+def test_run_bounded_keeps_order_and_limit():
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def work(value: int):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        threading.Event().wait(0.01)
+        with lock:
+            running["now"] -= 1
+        return value * 2
+
+    results = run_bounded([asyncio.to_thread(work, value) for value in range(20)], 4)
+
+    assert results == [value * 2 for value in range(20)]
+    assert running["max"] <= 4
+
+
+def test_run_bounded_returns_exceptions_in_place():
+    def work(value: int):
+        if value == 1:
+            raise ValueError("failed")
+        return value
+
+    results = run_bounded([asyncio.to_thread(work, value) for value in range(3)], 2, return_exceptions=True)
+
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
@@ -0,0 +1,72 @@
+import io
+from unittest import mock
+
+import requests
+
+from outsystems.bdd_framework import bdd_base
+from outsystems.http_helpers import http_retry
+from outsystems.http_helpers.http_retry import RetryBudget, send_http_request, get_retry_after, is_retryable_response
+
+
+def _response(status_code: int, headers: dict = None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b""
+    response.raw = io.BytesIO()
+    return response
+
+
+def test_retry_after_header_in_seconds():
+    assert get_retry_after(_response(503, {"Retry-After": "7"})) == 7
+    assert get_retry_after(_response(503)) is None
+
+
+def test_post_is_only_retried_when_throttled_unless_flagged_safe():
+    assert not is_retryable_response(_response(502), retry_safe=False)
+    assert is_retryable_response(_response(429), retry_safe=False)
+    assert is_retryable_response(_response(502), retry_safe=True)
+    assert not is_retryable_response(_response(404), retry_safe=True)
+
+
+def test_retry_budget_is_capped():
+    budget = RetryBudget(10)
+    assert budget.consume(6)
+    assert not budget.consume(6)
+    assert budget.remaining() == 4
+
+
+def test_get_is_retried_until_success():
+    session = mock.Mock()
+    session.request.side_effect = [_response(503, {"Retry-After": "0"}), requests.exceptions.ReadTimeout(), _response(200)]
+    with mock.patch.object(http_retry, "get_http_session", return_value=session), \
+            mock.patch.object(http_retry, "get_retry_budget", return_value=RetryBudget(60)), \
+            mock.patch.object(http_retry, "sleep"):
+        response = send_http_request("test", "GET", "https://host/api")
+    assert response.status_code == 200
+    assert session.request.call_count == 3
+
+
+def test_post_is_not_retried_on_server_error():
+    session = mock.Mock()
+    session.request.return_value = _response(503)
+    with mock.patch.object(http_retry, "get_http_session", return_value=session), \
+            mock.patch.object(http_retry, "sleep"):
+        response = send_http_request("test", "POST", "https://host/api")
+    assert response.status_code == 503
+    assert session.request.call_count == 1
+
+
+def test_requests_have_no_read_timeout_unless_configured():
+    session = mock.Mock()
+    session.request.return_value = _response(200)
+    with mock.patch.object(http_retry, "get_http_session", return_value=session):
+        send_http_request("test", "GET", "https://host/api")
+    assert session.request.call_args.kwargs["timeout"] == (30, None)
+
+
+def test_bdd_test_runs_are_not_resent_and_have_no_read_timeout():
+    with mock.patch.object(bdd_base, "send_http_request", return_value=_response(500)) as send_request:
+        assert bdd_base.send_bdd_get_run_request("https://bdd/test", None)["http_status"] == 500
+    assert send_request.call_args.kwargs["retry_safe"] is False
+    assert send_request.call_args.kwargs["timeout"] == (30, None)
@@ -0,0 +1,62 @@
+import hashlib
+from unittest import mock
+
+import requests
+
+from outsystems.http_helpers import http_retry
+from outsystems.http_helpers.http_transfer import download_to_file, UploadFileReader
+
+
+def _streamed_response(status_code: int, chunks: list, headers: dict = None, fail_after_chunks: bool = False):
+    def iter_content(chunk_size=None):
+        yield from chunks
+        if fail_after_chunks:
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+
+    response = mock.Mock(status_code=status_code, headers=headers or {}, text="")
+    response.iter_content.side_effect = iter_content
+    return response
+
+
+def test_download_is_resumed_with_range_request(tmp_path):
+    session = mock.Mock()
+    session.request.side_effect = [_streamed_response(200, [b"abc", b"def"], fail_after_chunks=True),
+                                   _streamed_response(206, [b"ghi"], {"Content-Range": "bytes 6-8/9"})]
+    file_path = str(tmp_path / "package.osp")
+
+    with mock.patch.object(http_retry, "get_http_session", return_value=session), \
+            mock.patch("outsystems.http_helpers.http_transfer.sleep"):
+        result = download_to_file("test", "https://lifetime/download", file_path, {})
+
+    assert result["http_status"] == 200
+    assert result["sha256"] == hashlib.sha256(b"abcdefghi").hexdigest()
+    assert open(file_path, "rb").read() == b"abcdefghi"
+    assert session.request.call_args_list[1].kwargs["headers"]["Range"] == "bytes=6-"
+    assert not (tmp_path / "package.osp.part").exists()
+
+
+def test_failed_download_leaves_no_file(tmp_path):
+    session = mock.Mock()
+    session.request.return_value = _streamed_response(404, [])
+    file_path = str(tmp_path / "package.osp")
+
+    with mock.patch.object(http_retry, "get_http_session", return_value=session):
+        result = download_to_file("test", "https://lifetime/download", file_path, {})
+
+    assert result["http_status"] == 404
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_upload_reader_streams_file_and_rewinds(tmp_path, capsys):
+    file_path = tmp_path / "package.osp"
+    file_path.write_bytes(b"x" * 10)
+
+    with UploadFileReader(str(file_path), max_bytes_per_sec=0, progress_interval_in_secs=0) as reader:
+        assert len(reader) == 10
+        assert reader.read(4) == b"xxxx"
+        reader.seek(0)
+        assert reader.sent_bytes == 0
+        assert reader.read() == b"x" * 10
+        assert reader.read(4) == b""
+
+    assert "Uploaded 10 bytes of 10 bytes (100%)" in capsys.readouterr().out
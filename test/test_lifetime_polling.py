@@ -0,0 +1,69 @@
+from unittest import mock
+
+from outsystems.lifetime import lifetime_polling
+from outsystems.lifetime.lifetime_polling import Poller, get_expected_duration, store_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.sleeps.append(secs)
+        self.now += secs
+
+
+def _poll_until_timeout(poller: Poller):
+    polls = 0
+    while poller.poll():
+        polls += 1
+    return polls
+
+
+def test_poller_backs_off_up_to_max_interval_and_stops_at_deadline():
+    clock = FakeClock()
+    with mock.patch.object(lifetime_polling, "monotonic", clock.monotonic), mock.patch.object(lifetime_polling, "sleep", clock.sleep):
+        polls = _poll_until_timeout(Poller(60, 20))
+
+    assert clock.sleeps[:4] == [2, 4, 8, 16]
+    assert max(clock.sleeps) == 20
+    assert clock.now == 60
+    assert polls == len(clock.sleeps) + 1
+
+
+def test_poller_polls_slowly_until_close_to_expected_duration():
+    clock = FakeClock()
+    with mock.patch.object(lifetime_polling, "monotonic", clock.monotonic), mock.patch.object(lifetime_polling, "sleep", clock.sleep):
+        _poll_until_timeout(Poller(100, 20, expected_duration_in_secs=50))
+
+    assert clock.sleeps[:4] == [20, 20, 2, 4]
+
+
+def test_poller_notifies_status_transitions():
+    transitions = []
+    poller = Poller(60, 20, on_transition=lambda previous_status, status, elapsed_in_secs: transitions.append((previous_status, status)))
+
+    assert poller.observe("running")
+    assert not poller.observe("running")
+    assert poller.observe("finished_successful")
+    assert transitions == [(None, "running"), ("running", "finished_successful")]
+
+
+def test_duration_history_keeps_moving_average(tmp_path):
+    artifact_dir = str(tmp_path)
+    assert get_expected_duration(artifact_dir, "deployment") is None
+    store_duration(artifact_dir, "deployment", 100)
+    store_duration(artifact_dir, "deployment", 200)
+    assert get_expected_duration(artifact_dir, "deployment") == 130
+
+
+def test_duration_history_weight_is_configurable(tmp_path):
+    artifact_dir = str(tmp_path)
+    store_duration(artifact_dir, "deployment", 100)
+    with mock.patch.object(lifetime_polling, "get_configuration_value", return_value=0.5):
+        store_duration(artifact_dir, "deployment", 200)
+    assert get_expected_duration(artifact_dir, "deployment") == 150
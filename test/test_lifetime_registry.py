@@ -0,0 +1,24 @@
+from unittest import mock
+
+from outsystems.file_helpers.cache import store_cache
+from outsystems.lifetime import lifetime_registry
+from outsystems.lifetime.lifetime_registry import find_record, update_records, get_registry_stats
+
+
+def test_stale_cache_is_refreshed_once_on_miss(tmp_path):
+    artifact_dir = str(tmp_path)
+    lifetime_registry.clear_registry()
+    store_cache(artifact_dir, "applications.cache", [{"Name": "App1", "Key": "k1"}], "lt")
+    fetched_apps = [{"Name": "App1", "Key": "k1"}, {"Name": "App2", "Key": "k2"}]
+    fetch = mock.Mock(side_effect=lambda: update_records(artifact_dir, "lt", "applications.cache", fetched_apps))
+    stats_before = get_registry_stats()
+
+    assert find_record(artifact_dir, "lt", "applications.cache", 60, fetch, "Name", "App1")["Key"] == "k1"
+    assert find_record(artifact_dir, "lt", "applications.cache", 60, fetch, "Key", "k2")["Name"] == "App2"
+    assert find_record(artifact_dir, "lt", "applications.cache", 60, fetch, "Name", "App3") is None
+    assert fetch.call_count == 1
+
+    stats = get_registry_stats()
+    assert stats["hits"] - stats_before["hits"] == 1
+    assert stats["misses"] - stats_before["misses"] == 2
+    assert stats["refreshes"] - stats_before["refreshes"] == 1
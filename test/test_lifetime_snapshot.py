@@ -0,0 +1,26 @@
+from unittest import mock
+
+from outsystems.lifetime import lifetime_snapshot
+from outsystems.lifetime.lifetime_snapshot import get_infrastructure_snapshot
+
+
+def test_snapshot_only_looks_up_versions_that_differ_in_target_env():
+    applications = [
+        {"Key": "app1", "AppStatusInEnvs": [{"EnvironmentKey": "qa", "BaseApplicationVersionKey": "v1"}]},
+        {"Key": "app2", "AppStatusInEnvs": [{"EnvironmentKey": "qa", "BaseApplicationVersionKey": "old"}]},
+        {"Key": "app3", "AppStatusInEnvs": [{"EnvironmentKey": "dev", "BaseApplicationVersionKey": "v3"}]},
+    ]
+    app_data_list = [{"Key": "app1", "VersionKey": "v1"}, {"Key": "app2", "VersionKey": "v2"}, {"Key": "app3", "VersionKey": "v3"}]
+
+    async def get_version(artifact_dir, endpoint, auth_token, extra_data, version_key, **kwargs):
+        return {"Version": "1.0.{}".format(version_key)}
+
+    with mock.patch.object(lifetime_snapshot, "get_applications", return_value=applications) as get_applications, \
+            mock.patch.object(lifetime_snapshot, "get_application_version_async", side_effect=get_version) as get_application_version:
+        snapshot = get_infrastructure_snapshot("", "lt", "token", "qa", app_data_list)
+
+    get_applications.assert_called_once()
+    get_application_version.assert_called_once()
+    assert snapshot.get_version_number("app2", "old") == "1.0.old"
+    assert snapshot.get_app_status_in_env("app1", "qa")["BaseApplicationVersionKey"] == "v1"
+    assert snapshot.get_app_status_in_env("app3", "qa") is None
@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from outsystems.file_helpers import oap_store as oap_store_module
+from outsystems.file_helpers.oap_store import OAPStore
+
+
+def _write_oap(file_path: str, size: int):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "wb") as f:
+        f.write(os.urandom(size))
+
+
+def test_store_restores_oap_into_another_run(tmp_path):
+    store_dir = str(tmp_path / "store")
+    exported_oap = str(tmp_path / "qa" / "App_v1_0.oap")
+    _write_oap(exported_oap, 1024)
+
+    OAPStore(store_dir).store("v1", exported_oap)
+    restored_oap = str(tmp_path / "prod" / "App_v1_0.oap")
+
+    assert OAPStore(store_dir).restore("v1", restored_oap)
+    assert os.path.samefile(exported_oap, restored_oap)
+    assert os.path.isfile(restored_oap + ".sha256")
+    assert not OAPStore(store_dir).restore("v2", restored_oap)
+
+
+def _store_oaps(store_dir: str, oap_folder: str, version_keys: list):
+    for version_key in version_keys:
+        OAPStore(store_dir).store(version_key, os.path.join(oap_folder, "{}.oap".format(version_key)))
+
+
+def test_store_keeps_the_entries_of_every_process(tmp_path):
+    store_dir = str(tmp_path / "store")
+    version_keys = ["v{}".format(i) for i in range(40)]
+    for version_key in version_keys:
+        _write_oap(str(tmp_path / "{}.oap".format(version_key)), 16)
+
+    # Each process stores its own OAPs into the same store, with its own view of the manifest
+    with ProcessPoolExecutor(max_workers=4) as process_pool:
+        list(process_pool.map(_store_oaps, [store_dir] * 4, [str(tmp_path)] * 4, [version_keys[i::4] for i in range(4)]))
+
+    oap_store = OAPStore(store_dir)
+    assert all(oap_store.restore(version_key, str(tmp_path / "run" / "{}.oap".format(version_key))) for version_key in version_keys)
+
+
+def test_store_evicts_least_recently_used_oaps(tmp_path):
+    store_dir = str(tmp_path / "store")
+    for version_key in ("v1", "v2"):
+        _write_oap(str(tmp_path / "{}.oap".format(version_key)), 1000)
+    _write_oap(str(tmp_path / "v3.oap"), 1500)
+    oap_store = OAPStore(store_dir)
+
+    with mock.patch.object(oap_store_module, "get_configuration_value", return_value=2600):
+        oap_store.store("v1", str(tmp_path / "v1.oap"))
+        oap_store.store("v2", str(tmp_path / "v2.oap"))
+        # Using v1 makes v2 the least recently used
+        assert oap_store.restore("v1", str(tmp_path / "run" / "v1.oap"))
+        oap_store.store("v3", str(tmp_path / "v3.oap"))
+
+    assert sorted(os.listdir(store_dir)) == ["oap_store.cache", "oap_store.lock", "v1.oap", "v3.oap"]
+    assert not OAPStore(store_dir).restore("v2", str(tmp_path / "run" / "v2.oap"))
@@ -0,0 +1,39 @@
+import os
+import sys
+from time import monotonic
+from unittest import mock
+
+import pytest
+
+from outsystems.exceptions.osptool_error import OSPToolDeploymentError
+from outsystems.osp_tool import osp_base
+from outsystems.osp_tool.osp_base import run_command, find_deployment_errors
+
+
+def test_run_command_drains_both_streams_and_keeps_a_bounded_tail(tmp_path):
+    log_file_path = os.path.join(str(tmp_path), "pkg.deploy.log")
+    # Enough stderr output to fill the pipe, if it was not being read
+    script = "import sys\nfor i in range(20000):\n    sys.stderr.write('error line {}\\n'.format(i))\nprint('Missing Configuration: done')"
+    lines = []
+
+    with mock.patch.object(osp_base, "get_configuration_value", return_value=10):
+        return_code, execution_log = run_command([sys.executable, "-c", script], lines.append, timeout=60, log_file_path=log_file_path)
+
+    assert return_code == 0
+    assert len(lines) == 20001
+    assert len(execution_log.splitlines()) == 10
+    with open(log_file_path) as log_file:
+        assert sum(1 for _ in log_file) == 20001
+    with open(log_file_path) as log_file:
+        assert list(find_deployment_errors(log_file)) == ["Missing Configuration"]
+
+
+def test_run_command_kills_the_process_tree_on_timeout():
+    # The child process spawns a grandchild that would keep the output pipes open
+    script = "import subprocess, sys, time\nsubprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\nprint('started', flush=True)\ntime.sleep(60)"
+    started_on = monotonic()
+
+    with pytest.raises(OSPToolDeploymentError, match="timed out"):
+        run_command([sys.executable, "-c", script], None, timeout=2)
+
+    assert monotonic() - started_on < 30
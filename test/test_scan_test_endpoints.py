@@ -0,0 +1,56 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from outsystems.cicd_probe import cicd_scan
+from outsystems.exceptions.invalid_parameters import InvalidParametersError
+from outsystems.pipeline.scan_test_endpoints import main
+
+MANIFEST = {"ApplicationVersions": [
+    {"ApplicationKey": "k{}".format(i), "ApplicationName": "App{} Tests".format(i), "VersionKey": "v{}".format(i), "VersionNumber": "1.0.0",
+     "IsTestApplication": True} for i in range(4)]}
+
+
+def _scan_response(application_name: str):
+    return [{"EspaceName": application_name.replace(" ", "_"), "BDDFrameworkType": "server",
+             "TestFlows": [{"TestScreens": [{"Name": "Screen1"}, {"Name": "Screen2"}]}]}]
+
+
+def _scan(artifact_dir: str):
+    return main(artifact_dir, None, MANIFEST, "https", "bdd.example.com", "BDDFramework/rest", "TestRunner_API/rest", 1,
+                "https", "probe.example.com", "CI_CDProbe/rest", 2, None, None)
+
+
+def test_scans_run_concurrently_and_are_reused_for_the_same_versions(tmp_path):
+    artifact_dir = str(tmp_path)
+    running = []
+    max_running = []
+    lock = threading.Lock()
+
+    def fake_send_probe_get_request(endpoint, api_endpoint, api_key, params):
+        with lock:
+            running.append(params["ApplicationName"])
+            max_running.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(params["ApplicationName"])
+        return {"http_status": 200, "response": _scan_response(params["ApplicationName"])}
+
+    with mock.patch.object(cicd_scan, "send_probe_get_request", side_effect=fake_send_probe_get_request) as send_probe_get_request:
+        first_test_urls = _scan(artifact_dir)
+        second_test_urls = _scan(artifact_dir)
+
+    assert send_probe_get_request.call_count == 4
+    assert max(max_running) > 1
+    # Each call returns its own results (not accumulated across calls), in the manifest order
+    assert first_test_urls == second_test_urls
+    assert [test_url["TestSuite"] for test_url in first_test_urls] == ["App{}_Tests".format(i) for i in range(4) for _ in range(2)]
+    assert first_test_urls[0]["URL"] == "https://bdd.example.com/BDDFramework/rest/v1/BDDTestRunner/App0_Tests/Screen1"
+
+
+def test_select_changed_requires_a_tested_versions_file(tmp_path):
+    with pytest.raises(InvalidParametersError):
+        main(str(tmp_path), None, MANIFEST, "https", "bdd.example.com", "BDDFramework/rest", "TestRunner_API/rest", 1,
+             "https", "probe.example.com", "CI_CDProbe/rest", 2, None, None, select_changed=True)
@@ -0,0 +1,73 @@
+import os
+
+from outsystems.file_helpers.sourcecode_index import SourceCodeIndex, get_sourcecode_index_key
+
+
+def _write_file(file_path: str, content: str):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as f:
+        f.write(content)
+
+
+def test_index_restores_unchanged_version_into_new_artifacts(tmp_path):
+    index_dir = str(tmp_path / "index")
+    first_run = str(tmp_path / "run1")
+    second_run = str(tmp_path / "run2")
+    running_version = {"ApplicationKey": "app", "VersionKey": "v1", "IsModified": False}
+    index_key = get_sourcecode_index_key("dev", running_version, True, False)
+    _write_file(os.path.join(first_run, "App_v1.source.zip"), "package")
+    _write_file(os.path.join(first_run, "modules", "Mod", "Mod.sln"), "sln")
+
+    SourceCodeIndex(index_dir).store(index_key, os.path.join(first_run, "App_v1.source.zip"), ["Mod"])
+    # The index is persisted, so a later run can reuse it
+    module_count = SourceCodeIndex(index_dir).restore(index_key, second_run)
+
+    assert module_count == 1
+    with open(os.path.join(second_run, "modules", "Mod", "Mod.sln")) as f:
+        assert f.read() == "sln"
+    # The modules are copies, so post-processing the fetched or restored modules in place does not change the stored ones
+    _write_file(os.path.join(first_run, "modules", "Mod", "Mod.sln"), "post-processed")
+    _write_file(os.path.join(second_run, "modules", "Mod", "Mod.sln"), "post-processed")
+    assert SourceCodeIndex(index_dir).restore(index_key, str(tmp_path / "run3")) == 1
+    with open(str(tmp_path / "run3" / "modules" / "Mod" / "Mod.sln")) as f:
+        assert f.read() == "sln"
+    assert os.path.isfile(os.path.join(second_run, "App_v1.source.zip.sha256"))
+    assert SourceCodeIndex(index_dir).restore(get_sourcecode_index_key("dev", running_version, False, False), second_run) is None
+
+
+def test_index_drops_entries_whose_stored_package_changed(tmp_path):
+    index_dir = str(tmp_path / "index")
+    package_file = str(tmp_path / "run1" / "pkg.source.zip")
+    _write_file(package_file, "package")
+    sourcecode_index = SourceCodeIndex(index_dir)
+    sourcecode_index.store("key", package_file, [])
+
+    # The stored copy is a hard link, so changing the fetched package changes it as well
+    _write_file(package_file, "changed")
+
+    assert sourcecode_index.restore("key", str(tmp_path / "run2")) is None
+    assert SourceCodeIndex(index_dir).restore("key", str(tmp_path / "run2")) is None
+
+
+def test_index_drops_entries_whose_stored_modules_are_missing_or_changed(tmp_path):
+    index_dir = str(tmp_path / "index")
+    package_file = str(tmp_path / "run1" / "pkg.source.zip")
+    _write_file(package_file, "package")
+    _write_file(str(tmp_path / "run1" / "modules" / "Mod" / "Mod.sln"), "sln")
+    _write_file(str(tmp_path / "run1" / "modules" / "Other" / "Other.sln"), "sln")
+    sourcecode_index = SourceCodeIndex(index_dir)
+    sourcecode_index.store("changed", package_file, ["Mod"])
+    sourcecode_index.store("missing", package_file, ["Other"])
+
+    # Stored modules changed or removed from the index folder
+    for dir_path, _, file_names in os.walk(index_dir):
+        if os.path.basename(dir_path) == "Mod":
+            _write_file(os.path.join(dir_path, "Mod.sln"), "changed")
+        elif os.path.basename(dir_path) == "Other":
+            os.remove(os.path.join(dir_path, "Other.sln"))
+            os.rmdir(dir_path)
+
+    assert sourcecode_index.restore("changed", str(tmp_path / "run2")) is None
+    assert sourcecode_index.restore("missing", str(tmp_path / "run2")) is None
+    assert not os.path.exists(str(tmp_path / "run2" / "modules"))
+    assert SourceCodeIndex(index_dir).restore("missing", str(tmp_path / "run2")) is None
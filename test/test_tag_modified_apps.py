@@ -0,0 +1,52 @@
+import re
+from unittest import mock
+
+import pytest
+
+from outsystems.exceptions.server_error import ServerError
+from outsystems.pipeline import tag_modified_apps
+
+
+def _app(name: str, is_modified: bool):
+    return {"Name": name, "Key": "{}-key".format(name),
+            "AppStatusInEnvs": [{"EnvironmentKey": "other-env", "IsModified": True, "BaseApplicationVersionKey": "x", "MobileAppsStatus": []},
+                                {"EnvironmentKey": "env-key", "IsModified": is_modified, "BaseApplicationVersionKey": "{}-v1".format(name),
+                                 "MobileAppsStatus": [{"NativePlatform": "Android", "VersionNumber": "2.0.0", "IsModified": True}] if name == "Mobile" else []}]}
+
+
+ALL_APPS = [_app("Portal", True), _app("Core", False), _app("Mobile", True), _app("Broken", True)]
+
+
+def _main(apps: list, set_application_version: mock.Mock):
+    with mock.patch.object(tag_modified_apps, "get_environment_key", return_value="env-key"), \
+            mock.patch.object(tag_modified_apps, "get_applications", return_value=ALL_APPS), \
+            mock.patch.object(tag_modified_apps, "get_application_version", return_value={"Version": "1.0.0"}), \
+            mock.patch.object(tag_modified_apps, "get_application_versions", return_value=[{"Version": "1.0.1"}, {"Version": "1.0.0"}]), \
+            mock.patch.object(tag_modified_apps, "set_application_version", set_application_version):
+        tag_modified_apps.main("Artifacts", "https", "lt.example.com", "lifetimeapi/rest", 2, "token", "QA", apps, None, "Tagged by the pipeline")
+
+
+def test_modified_apps_are_tagged_with_the_next_available_version(capsys):
+    set_application_version = mock.Mock(return_value={})
+
+    _main(["Portal", "Core", "Mobile", "Unknown"], set_application_version)
+
+    calls = sorted(set_application_version.call_args_list, key=lambda call: call.args[3])
+    assert [(call.args[3], call.args[5]) for call in calls] == [("Mobile-key", "1.0.2"), ("Portal-key", "1.0.2")]
+    assert calls[0].args[6] == [{"NativePlatform": "Android", "VersionNumber": "2.0.1", "VersionDescription": "Tagged by the pipeline"}]
+    assert "Tagging Summary" in capsys.readouterr().out
+
+
+def test_tagging_errors_are_reported_after_the_other_apps_are_tagged(capsys):
+    def fake_set_application_version(endpoint, auth_token, env_key, app_key, change_log, app_version, mobile_versions):
+        if app_key == "Broken-key":
+            raise ServerError("Failed to tag an application")
+        return {}
+    set_application_version = mock.Mock(side_effect=fake_set_application_version)
+
+    with pytest.raises(ServerError):
+        _main(["Broken", "Portal"], set_application_version)
+
+    assert set_application_version.call_count == 2
+    output = capsys.readouterr().out
+    assert re.search(r"Broken +\| Failed", output) and re.search(r"Portal +\| Tagged", output)